@@ -15,16 +15,33 @@
 __author__ = "vmriccox"
 
 
+import argparse
+
 from experimental_framework import heat_template_generation, common
 from experimental_framework import benchmarking_unit as bench_unit
+from experimental_framework import sharding
+from experimental_framework.constants import framework_parameters as fp
+
 
+parser = argparse.ArgumentParser(description='VNF benchmarking framework')
+parser.add_argument('--resume', metavar='RESULTS_DIR', default=None,
+                    help='resumes an interrupted run, skipping the benchmarks already completed in RESULTS_DIR')
+args = parser.parse_args()
 
 # Initialization of the utilities tools
 common.init()
 
-common.LOG.info("Generation of all the heat templates required by the experiment ...")
-heat_template_generation.generates_templates(common.TEMPLATE_NAME,
-                                             common.get_deployment_configuration_variables_from_conf_file())
+if args.resume:
+    # The interrupted run is resumed on its own templates, not on a new generation
+    # (e.g. a different sample of the configurations)
+    heat_template_generation.restore_templates(args.resume + '/' + fp.TEMPLATES_RESULTS_DIR,
+                                               common.get_template_dir())
+else:
+    common.LOG.info("Generation of all the heat templates required by the experiment ...")
+    heat_template_generation.generates_templates(common.TEMPLATE_NAME,
+                                                 common.get_deployment_configuration_variables_from_conf_file(),
+                                                 common.get_deployment_configuration_constraints_from_conf_file(),
+                                                 common.get_heat_template_params())
 
 common.LOG.info("Running Benchmarks ...")
 required_benchmarks = common.get_benchmarks_from_conf_file()
@@ -37,8 +54,23 @@ for benchmark in required_benchmarks:
     for param in test_case_params.keys():
         bench['params'][param] = test_case_params[param]
     benchmarks.append(bench)
+
+if common.SHARDS:
+    common.LOG.info("Running Benchmarks on " + str(len(common.SHARDS)) + " shards ...")
+    coordinator = sharding.ShardCoordinator(common.TEMPLATE_NAME, common.get_shard_profiles(),
+                                            common.get_heat_template_params(), common.ITERATIONS, benchmarks,
+                                            common.get_deployment_configuration_costs_from_conf_file(),
+                                            common.get_deployment_configuration_types_from_conf_file(),
+                                            args.resume)
+    coordinator.run()
+    exit(0)
+
 b_unit = bench_unit.BenchmarkingUnit(common.TEMPLATE_NAME, common.get_credentials(), common.get_heat_template_params(),
-                                     common.ITERATIONS, benchmarks)
+                                     common.ITERATIONS, benchmarks,
+                                     common.get_deployment_configuration_costs_from_conf_file(),
+                                     common.get_deployment_configuration_types_from_conf_file(),
+                                     results_directory=args.resume, resume=args.resume is not None,
+                                     cost_budget=common.COST_BUDGET)
 
 try:
     common.LOG.info("Initialization of Benchmarking Unit")
@@ -48,7 +80,7 @@ try:
     b_unit.run_benchmarks()
 finally:
     common.LOG.info("Benchmarking Unit Finalization")
-#     b_unit.finalize()
+    b_unit.finalize()
 
 # Deployment Engine
 # deployment_engine = sd.SmartDeployment()
@@ -0,0 +1,282 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+"""
+Adaptive (Bayesian) search of the deployment configuration maximizing a
+metric, using a Gaussian Process as surrogate model and the Expected
+Improvement as acquisition function.
+"""
+
+import math
+import random
+import time
+
+
+class GaussianProcess:
+    """
+    Gaussian Process regression with squared exponential kernel.
+    The implementation is meant for the small number of observations
+    available during a benchmarking run (tens or hundreds).
+    """
+
+    def __init__(self, length_scale=1.0, noise=0.01):
+        self.length_scale = length_scale
+        self.noise = noise
+        self.x = list()
+        self.chol = list()
+        self.alpha = list()
+        self.y_mean = 0.0
+        self.y_std = 1.0
+
+    def kernel(self, a, b):
+        distance = 0.0
+        for position in range(0, len(a)):
+            distance += (a[position] - b[position]) ** 2
+        return math.exp(-distance / (2.0 * self.length_scale ** 2))
+
+    def fit(self, x, y):
+        """
+        Fits the model on the observations
+        :param x: feature vectors (type: list of list of float)
+        :param y: observed values (type: list of float)
+        :return: None
+        """
+        self.x = x
+        self.y_mean = sum(y) / len(y)
+        variance = sum([(value - self.y_mean) ** 2 for value in y]) / len(y)
+        self.y_std = math.sqrt(variance) or 1.0
+        normalized = [(value - self.y_mean) / self.y_std for value in y]
+
+        size = len(x)
+        matrix = [[self.kernel(x[i], x[j]) for j in range(0, size)]
+                  for i in range(0, size)]
+        for i in range(0, size):
+            matrix[i][i] += self.noise
+        self.chol = GaussianProcess._cholesky(matrix)
+        self.alpha = GaussianProcess._solve_upper(
+            self.chol, GaussianProcess._solve_lower(self.chol, normalized))
+
+    def predict(self, point):
+        """
+        Returns mean and standard deviation of the prediction for a point
+        :param point: feature vector (type: list of float)
+        :return: type: (float, float)
+        """
+        k = [self.kernel(point, x) for x in self.x]
+        mean = sum([k[i] * self.alpha[i] for i in range(0, len(k))])
+        v = GaussianProcess._solve_lower(self.chol, k)
+        variance = max(1.0 - sum([value ** 2 for value in v]), 0.0)
+        return (mean * self.y_std + self.y_mean,
+                math.sqrt(variance) * self.y_std)
+
+    @staticmethod
+    def _cholesky(matrix):
+        size = len(matrix)
+        chol = [[0.0] * size for i in range(0, size)]
+        for i in range(0, size):
+            for j in range(0, i + 1):
+                value = matrix[i][j]
+                for k in range(0, j):
+                    value -= chol[i][k] * chol[j][k]
+                if i == j:
+                    chol[i][j] = math.sqrt(max(value, 1e-12))
+                else:
+                    chol[i][j] = value / chol[j][j]
+        return chol
+
+    @staticmethod
+    def _solve_lower(chol, b):
+        size = len(b)
+        x = [0.0] * size
+        for i in range(0, size):
+            value = b[i]
+            for k in range(0, i):
+                value -= chol[i][k] * x[k]
+            x[i] = value / chol[i][i]
+        return x
+
+    @staticmethod
+    def _solve_upper(chol, b):
+        # Solves the system with the transposed of the lower matrix
+        size = len(b)
+        x = [0.0] * size
+        for i in range(size - 1, -1, -1):
+            value = b[i]
+            for k in range(i + 1, size):
+                value -= chol[k][i] * x[k]
+            x[i] = value / chol[i][i]
+        return x
+
+
+def expected_improvement(mean, std, best, xi=0.01):
+    """
+    Expected improvement of a point over the best value observed so far
+    :param mean: predicted mean (type: float)
+    :param std: predicted standard deviation (type: float)
+    :param best: best value observed so far (type: float)
+    :param xi: exploration parameter (type: float)
+    :return: type: float
+    """
+    if std <= 1e-12:
+        return 0.0
+    improvement = mean - best - xi * abs(best)
+    z = improvement / std
+    cdf = 0.5 * (1.0 + math.erf(z / math.sqrt(2.0)))
+    pdf = math.exp(-0.5 * z ** 2) / math.sqrt(2.0 * math.pi)
+    return improvement * cdf + std * pdf
+
+
+class BayesianSearch:
+    """
+    Selects the next experiment to run on the base of the results collected
+    so far, in order to find the configuration maximizing a metric.
+    """
+
+    def __init__(self, candidates, variable_types=None, max_trials=None,
+                 max_time=None, initial_trials=3, seed=None):
+        """
+        :param candidates: list of (template file name, configuration)
+        :param variable_types: dictionary variable -> type ('numeric' or
+                'string'); if not provided, numeric variables are detected
+                from their values (type: dict)
+        :param max_trials: maximum number of experiments (type: int)
+        :param max_time: maximum duration of the search in seconds
+                (type: float)
+        :param initial_trials: number of random experiments before using
+                the surrogate model (type: int)
+        :param seed: seed of the random generator (type: int)
+        """
+        self.templates = [template for template, configuration in candidates]
+        self.features = BayesianSearch._encode(
+            [configuration for template, configuration in candidates],
+            variable_types or dict())
+        self.max_trials = max_trials
+        self.max_time = max_time
+        self.initial_trials = initial_trials
+        self.random = random.Random(seed)
+        self.start_time = time.time()
+        self.evaluated = set()
+        self.observations = dict()
+
+    @staticmethod
+    def _encode(configurations, variable_types):
+        """
+        Encodes the configurations as feature vectors: numeric variables are
+        scaled in [0, 1], the others are one-hot encoded
+        """
+        variables = set()
+        for configuration in configurations:
+            variables.update(configuration.keys())
+        encoders = list()
+        for variable in sorted(variables):
+            values = sorted(set([configuration.get(variable)
+                                 for configuration in configurations]))
+            if len(values) < 2:
+                continue
+            numeric = variable_types.get(variable) == 'numeric' or \
+                variable not in variable_types
+            if numeric:
+                try:
+                    numbers = [float(value) for value in values]
+                except (TypeError, ValueError):
+                    numeric = False
+            if numeric:
+                low, high = min(numbers), max(numbers)
+                encoders.append((variable, None, low, (high - low) or 1.0))
+            else:
+                for value in values:
+                    encoders.append((variable, value, 0.0, 1.0))
+
+        features = list()
+        for configuration in configurations:
+            feature = list()
+            for variable, value, low, scale in encoders:
+                if value is None:
+                    feature.append((float(configuration[variable]) - low) /
+                                   scale)
+                else:
+                    feature.append(math.sqrt(0.5) if
+                                   configuration.get(variable) == value
+                                   else 0.0)
+            features.append(feature)
+        return features
+
+    def is_finished(self):
+        """
+        Checks the stopping criteria of the search
+        :return: type: bool
+        """
+        if len(self.evaluated) >= len(self.templates):
+            return True
+        if self.max_trials is not None and \
+                len(self.evaluated) >= self.max_trials:
+            return True
+        if self.max_time is not None and \
+                time.time() - self.start_time >= self.max_time:
+            return True
+        return False
+
+    def next_candidate(self):
+        """
+        Returns the template of the next experiment to run
+        :return: template file name or None if the search is finished
+                (type: str)
+        """
+        if self.is_finished():
+            return None
+        remaining = [index for index in range(0, len(self.templates))
+                     if index not in self.evaluated]
+        if len(self.observations) < max(self.initial_trials, 1):
+            index = self.random.choice(remaining)
+        else:
+            observed = sorted(self.observations.keys())
+            model = GaussianProcess()
+            model.fit([self.features[i] for i in observed],
+                      [self.observations[i] for i in observed])
+            best = max(self.observations.values())
+            index = None
+            best_improvement = -1.0
+            for candidate in remaining:
+                mean, std = model.predict(self.features[candidate])
+                improvement = expected_improvement(mean, std, best)
+                if improvement > best_improvement:
+                    index, best_improvement = candidate, improvement
+        self.evaluated.add(index)
+        return self.templates[index]
+
+    def observe(self, template, value):
+        """
+        Records the result of an experiment
+        :param template: template file name (type: str)
+        :param value: observed value of the metric, None if the experiment
+                failed (type: float)
+        :return: None
+        """
+        index = self.templates.index(template)
+        self.evaluated.add(index)
+        if value is not None:
+            self.observations[index] = float(value)
+
+    def get_best(self):
+        """
+        Returns the best template found so far and its metric value
+        :return: type: (str, float) or (None, None)
+        """
+        if not self.observations:
+            return None, None
+        index = max(self.observations, key=self.observations.get)
+        return self.templates[index], self.observations[index]
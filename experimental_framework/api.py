@@ -16,7 +16,8 @@ __author__ = 'vmriccox'
 
 
 import experimental_framework.benchmarking_unit as bench
-from experimental_framework import heat_template_generation, common
+from experimental_framework import benchmark_registry as registry
+from experimental_framework import heat_template_generation, common, sharding
 
 
 class FrameworkApi(object):
@@ -45,12 +46,12 @@ class FrameworkApi(object):
         """
         if not isinstance(test_case, str):
             raise ValueError('The provided test_case parameter has to be a string')
-        benchmark = bench.BenchmarkingUnit.get_required_benchmarks([test_case])[0]
-        return benchmark.get_features()
+        return registry.REGISTRY.get_features(test_case)
 
     @staticmethod
     def execute_framework(test_cases, iterations, base_heat_template, heat_template_parameters,
-                          deployment_configuration, openstack_credentials):
+                          deployment_configuration, openstack_credentials, deployment_costs=None,
+                          deployment_constraints=None):
         """
         Runs the framework
         :param test_cases: Test cases to be ran on the workload (dict() of dict())
@@ -68,6 +69,12 @@ class FrameworkApi(object):
                             The parameters are user defined: they have to correspond to the place holders provided in
                             the heat template. (Use "#" in the syntax,
                             es. - heat template "#param", - config_var "param")
+        :param deployment_costs: Dictionary of the costs of the values of the deployment configuration, used to
+                            schedule the experiments (optional).
+                            The format is: ( dict[string] = dict[string] = float ) )
+        :param deployment_constraints: Dictionary of expressions excluding combinations of values of the deployment
+                            configuration (optional). The excluded configurations are not generated.
+                            The format is: ( dict[string] = string ) )
         :return: the name of the csv file where the results have been stored
         """
 
@@ -93,12 +100,22 @@ class FrameworkApi(object):
 
         # Heat template generation (base_heat_template, deployment_configuration)
         common.LOG.info("Generation of all the heat templates required by the experiment")
-        heat_template_generation.generates_templates(base_heat_template, deployment_configuration)
-
+        heat_template_generation.generates_templates(base_heat_template, deployment_configuration,
+                                                     deployment_constraints, heat_template_parameters)
+
+        # The experiments are split among the testbeds, if more than one is
+        # configured
+        if common.SHARDS:
+            common.LOG.info("Running the experiments on " + str(len(common.SHARDS)) + " shards")
+            coordinator = sharding.ShardCoordinator(base_heat_template, common.get_shard_profiles(),
+                                                    heat_template_parameters, iterations, test_cases,
+                                                    deployment_costs)
+            return coordinator.run()
 
         # Benchmarking Unit (test_cases, iterations, heat_template_parameters)\
         benchmarking_unit = bench.BenchmarkingUnit(base_heat_template, common.get_credentials(),
-                                                   heat_template_parameters, iterations, test_cases)
+                                                   heat_template_parameters, iterations, test_cases,
+                                                   deployment_costs, cost_budget=common.COST_BUDGET)
         try:
             common.LOG.info("Benchmarking Unit initialization")
             benchmarking_unit.initialize()
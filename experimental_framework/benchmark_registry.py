@@ -0,0 +1,158 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+"""
+Discovery of the benchmarks available to the framework
+"""
+
+import ast
+import copy
+import importlib
+import os
+import threading
+
+from experimental_framework import benchmarks as benchmarks_package
+from experimental_framework.benchmarks import benchmark_base_class as base
+
+
+BASE_CLASS_NAME = 'BenchmarkBaseClass'
+
+
+class BenchmarkRegistry:
+    """
+    Finds the benchmarks in the modules of a package by reading their
+    source, so that no module is imported and no benchmark is instantiated
+    to list them. A benchmark is a class deriving (directly or through other
+    benchmarks) from BenchmarkBaseClass; it is named
+    "<module>.<class>" (e.g. rfc2544_throughput_benchmark.RFC2544ThroughputBenchmark).
+    The modules are imported only when a benchmark class is requested and
+    the features of each class are computed once.
+    """
+
+    def __init__(self, package=benchmarks_package):
+        """
+        :param package: package containing the benchmarks (type: module)
+        """
+        self.package_name = package.__name__
+        self.directory = os.path.dirname(os.path.abspath(package.__file__))
+        self.lock = threading.Lock()
+        self.test_cases = None
+        self.classes = dict()
+        self.features = dict()
+
+    def get_available_test_cases(self):
+        """
+        Returns the names of the benchmarks in the package
+        :return: list of str
+        """
+        with self.lock:
+            if self.test_cases is None:
+                self.test_cases = self.discover()
+            return list(self.test_cases)
+
+    def discover(self):
+        """
+        Parses the modules of the package looking for the benchmark classes
+        :return: list of str
+        """
+        classes = dict()
+        for file_name in sorted(os.listdir(self.directory)):
+            module_name, extension = os.path.splitext(file_name)
+            if extension != '.py' or module_name == '__init__':
+                continue
+            with open(os.path.join(self.directory, file_name)) as source_file:
+                try:
+                    tree = ast.parse(source_file.read(), file_name)
+                except SyntaxError:
+                    continue
+            for node in tree.body:
+                if isinstance(node, ast.ClassDef):
+                    classes[(module_name, node.name)] = [BenchmarkRegistry.get_base_name(base_class)
+                                                         for base_class in node.bases]
+
+        # The subclasses of a benchmark are benchmarks as well
+        benchmark_names = set([BASE_CLASS_NAME])
+        test_cases = set()
+        found = True
+        while found:
+            found = False
+            for module_name, class_name in classes.keys():
+                if (module_name, class_name) in test_cases or class_name == BASE_CLASS_NAME:
+                    continue
+                if benchmark_names.intersection(classes[(module_name, class_name)]):
+                    test_cases.add((module_name, class_name))
+                    benchmark_names.add(class_name)
+                    found = True
+        return sorted([module_name + '.' + class_name for module_name, class_name in test_cases])
+
+    @staticmethod
+    def get_base_name(node):
+        """
+        Returns the name of a base class in a class definition
+        (e.g. BenchmarkBaseClass for base.BenchmarkBaseClass)
+        :param node: ast node of the base class
+        :return: str or None
+        """
+        if isinstance(node, ast.Name):
+            return node.id
+        if isinstance(node, ast.Attribute):
+            return node.attr
+        return None
+
+    def get_benchmark_class(self, complete_module_name):
+        """
+        Returns the class of a benchmark, importing its module if required
+        :param complete_module_name: name of the benchmark as returned by get_available_test_cases (str)
+        :return: class of the benchmark
+        """
+        with self.lock:
+            if complete_module_name in self.classes:
+                return self.classes[complete_module_name]
+        strings = complete_module_name.split('.')
+        module = importlib.import_module(self.package_name + '.' + strings[0])
+        if len(strings) > 1:
+            class_ = getattr(module, strings[1], None)
+        else:
+            # Only the module is given: first benchmark defined by the module
+            class_ = None
+            for test_case in self.get_available_test_cases():
+                if test_case.split('.')[0] == strings[0]:
+                    class_ = getattr(module, test_case.split('.')[1], None)
+                    break
+        if not isinstance(class_, type) or not issubclass(class_, base.BenchmarkBaseClass) or \
+                class_ is base.BenchmarkBaseClass:
+            raise ValueError('The benchmark ' + complete_module_name + ' is not available')
+        with self.lock:
+            self.classes[complete_module_name] = class_
+        return class_
+
+    def get_features(self, complete_module_name):
+        """
+        Returns the features of a benchmark (description, parameters, allowed and default values),
+        without instantiating it
+        :param complete_module_name: name of the benchmark as returned by get_available_test_cases (str)
+        :return: dict
+        """
+        class_ = self.get_benchmark_class(complete_module_name)
+        with self.lock:
+            if class_ not in self.features:
+                # get_features does not depend on the state of the instance, so __init__ is skipped
+                self.features[class_] = class_.__new__(class_).get_features()
+            return copy.deepcopy(self.features[class_])
+
+
+REGISTRY = BenchmarkRegistry()
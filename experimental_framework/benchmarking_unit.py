@@ -20,16 +20,24 @@ initialization, execution and finalization
 __author__ = "vmriccox"
 
 
-import os
 import json
 import time
-import inspect
+import threading
+from multiprocessing.pool import ThreadPool
 
-from experimental_framework.benchmarks import benchmark_base_class as base
+from experimental_framework import benchmark_registry as registry
 from experimental_framework import common
 from experimental_framework import data_manager as data
 from experimental_framework import heat_template_generation as heat
 from experimental_framework import deployment_unit as deploy
+from experimental_framework import deployment_pipeline as pipeline
+from experimental_framework import experiment_scheduler as scheduler
+from experimental_framework import adaptive_search as adaptive
+from experimental_framework import retry_policy as retry
+from experimental_framework import resource_pool
+from experimental_framework import progress_journal as journal
+from experimental_framework import convergence
+from experimental_framework.constants import framework_parameters as fp
 
 # TODO: TO be removed for Yardstick
 if common.FINGERPRINT:
@@ -41,11 +49,13 @@ class BenchmarkingUnit:
     Management of the overall Benchmarking process
     """
 
-    def __init__(self, heat_template_name, openstack_credentials, heat_template_parameters, iterations, benchmarks):
+    def __init__(self, heat_template_name, openstack_credentials, heat_template_parameters, iterations, benchmarks,
+                 deployment_costs=None, deployment_types=None, template_files=None, results_directory=None,
+                 resume=False, cost_budget=None):
         # Loads vars from configuration file
         self.template_file_extension = common.TEMPLATE_FILE_EXTENSION
         self.template_dir = common.get_template_dir()
-        self.results_directory = common.RESULT_DIR + str(time.time())
+        self.results_directory = results_directory or common.RESULT_DIR + str(time.time())
         self.fingerprint = common.FINGERPRINT
 
         # Initializes other internal variable from parameters
@@ -58,7 +68,46 @@ class BenchmarkingUnit:
         self.data_manager = data.DataManager(self.results_directory)
         self.heat_template_parameters = heat_template_parameters
         self.template_files = heat.get_all_heat_templates(self.template_dir, self.template_file_extension)
-        common.DEPLOYMENT_UNIT = deploy.DeploymentUnit(openstack_credentials)
+        if template_files is not None:
+            # Only a subset of the templates is executed (e.g. by a shard)
+            self.template_files = [template_file_name for template_file_name in self.template_files
+                                   if template_file_name in template_files]
+        self.duplicate_templates = heat.get_duplicate_templates(self.template_dir)
+        # Maximum cumulative cost of the experiments over all the iterations (None: no limit)
+        self.scheduler = scheduler.ExperimentScheduler(deployment_costs, common.SCHEDULING, cost_budget)
+        self.schedule = None
+        self.search = common.SEARCH
+        self.search_metric = common.SEARCH_METRIC
+        self.deployment_types = deployment_types
+        self.deployment_mode = common.DEPLOYMENT_MODE
+        self.deployment_lookahead = common.DEPLOYMENT_LOOKAHEAD
+        self.execution_mode = common.EXECUTION_MODE
+        self.pipeline = None
+        self.stack_experiments = dict()
+        self.validate_templates = common.VALIDATE_TEMPLATES
+        self.concurrent_experiments = common.CONCURRENT_EXPERIMENTS or 1
+        self.resource_pool = resource_pool.TrafficResourcePool(
+            common.get_traffic_resources() or [dict() for index in range(0, self.concurrent_experiments)])
+        self.benchmark_sets = dict()
+        self.results_lock = threading.Lock()
+        # Units of work completed, used to resume an interrupted run in the same results directory
+        self.resume = resume
+        self.iteration = 0
+        self.journal = journal.ProgressJournal(self.results_directory + '/' + fp.PROGRESS_JOURNAL_FILE_NAME)
+        self.template_digests = dict()
+        # With a target precision the experiments are repeated until their results converge
+        self.convergence = None
+        if common.CONVERGENCE_PRECISION:
+            self.convergence = convergence.ConvergenceMonitor(common.CONVERGENCE_PRECISION, common.CONVERGENCE_METRICS,
+                                                              fp.CONVERGENCE_MIN_ITERATIONS)
+        validation_cache_file = None
+        if common.get_base_dir():
+            validation_cache_file = common.get_base_dir() + fp.VALIDATION_CACHE_FILE_NAME
+        self.retry_policy = retry.RetryPolicy(common.DEPLOYMENT_RETRIES, common.RETRY_DELAY, common.RETRY_MAX_DELAY,
+                                              fp.RETRY_JITTER, common.PHASE_TIMEOUTS,
+                                              common.CIRCUIT_BREAKER_THRESHOLD)
+        common.DEPLOYMENT_UNIT = deploy.DeploymentUnit(openstack_credentials, common.STACK_TIMEOUT,
+                                                       validation_cache_file, self.retry_policy)
 
     def initialize(self):
         """
@@ -76,75 +125,570 @@ class BenchmarkingUnit:
             # Need to generate a unique name for the benchmark
             # (since there is the possibility to have different instances of the same benchmark)
             self.benchmarks.append(benchmark_class(self.get_benchmark_name(benchmark['name']), benchmark['params']))
+        if self.concurrent_experiments > 1 and not self.supports_concurrent_execution():
+            self.concurrent_experiments = 1
+        if self.concurrent_experiments > 1:
+            # Concurrent experiments need their own instances of the benchmarks
+            for index in range(1, self.concurrent_experiments):
+                self.benchmark_sets[index] = [benchmark.__class__(benchmark.get_name(), dict(benchmark.params))
+                                              for benchmark in self.benchmarks]
+            common.LOG.info(str(self.concurrent_experiments) + ' experiments executed concurrently (' +
+                            str(self.resource_pool.capacity) + ' sets of traffic generation resources)')
+        # The experiments excluded by the cost budget are not executed nor reported
+        template_files = self.template_files
+        self.schedule = self.get_experiment_schedule()
+        scheduled = set([template_file_name for template_file_name, cost in self.schedule])
+        self.template_files = [template_file_name for template_file_name in template_files
+                               if template_file_name in scheduled]
+        if self.validate_templates:
+            common.LOG.info('Validation of the heat templates')
+            invalid_templates = common.DEPLOYMENT_UNIT.validate_heat_templates(
+                [self.template_dir + template_file_name for template_file_name in self.template_files])
+            for template_file in sorted(invalid_templates.keys()):
+                common.LOG.error('Invalid heat template ' + template_file + ': ' + invalid_templates[template_file])
+            if invalid_templates:
+                raise ValueError(str(len(invalid_templates)) + ' heat templates are not valid')
         common.LOG.info('Data Manager initialization')
         for template_file_name in self.template_files:
             experiment_name = BenchmarkingUnit.extract_experiment_name(template_file_name)
-            self.data_manager.create_new_experiment(experiment_name)
-            for benchmark in self.benchmarks:
-                self.data_manager.add_benchmark(experiment_name, benchmark.get_name())
+            duplicates = self.get_duplicate_experiment_names(template_file_name)
+            for name in [experiment_name] + duplicates:
+                self.data_manager.create_new_experiment(name)
+                for benchmark in self.benchmarks:
+                    self.data_manager.add_benchmark(name, benchmark.get_name())
+                self.data_manager.add_benchmark(name, fp.DEPLOYMENT_BENCHMARK)
+                if self.convergence:
+                    self.data_manager.add_benchmark(name, fp.CONVERGENCE_BENCHMARK)
 
-            # TODO: YARDSTICK - Remove these instructions
-            # TODO: move fingerprint literal into constant file
-            if common.FINGERPRINT:
-                self.data_manager.add_benchmark(experiment_name, 'fingerprint')
-                self.data_manager.add_benchmark(experiment_name, 'bound')
+                # TODO: YARDSTICK - Remove these instructions
+                # TODO: move fingerprint literal into constant file
+                if common.FINGERPRINT:
+                    self.data_manager.add_benchmark(name, 'fingerprint')
+                    self.data_manager.add_benchmark(name, 'bound')
+            # The results of the experiment are shared with its duplicates
+            self.data_manager.add_aliases(experiment_name, duplicates)
+        if self.resume:
+            self.reload_journal()
+        else:
+            # Copy of the templates, restored to resume the run (see VNFBench.py --resume)
+            heat.save_templates(self.template_dir, self.results_directory + '/' + fp.TEMPLATES_RESULTS_DIR,
+                                template_files)
+        if self.convergence and self.deployment_lookahead:
+            # The stacks deployed in advance would not match the experiments still to be repeated
+            common.LOG.info('Deployment pipeline disabled with the convergence of the experiments')
+            self.deployment_lookahead = 0
 
     def finalize(self):
         """
         Finalizes the Benchmarking Unit
         :return:
         """
+        # Destroy all deployed VMs
+        common.LOG.info('Noisy neighbours: ' + str(common.DEPLOYMENT_UNIT.neighbour_pool.get_statistics()))
+        common.DEPLOYMENT_UNIT.neighbour_pool.destroy()
+        common.DEPLOYMENT_UNIT.destroy_all_deployed_stacks()
+        self.add_deletion_data_points()
         for template_file_name in self.template_files:
             experiment_name = BenchmarkingUnit.extract_experiment_name(template_file_name)
             self.data_manager.close_experiment(experiment_name)
+            for duplicate in self.get_duplicate_experiment_names(template_file_name):
+                self.data_manager.close_experiment(duplicate)
         self.data_manager.generate_result_csv_file()
-        # Destroy all deployed VMs
-        common.DEPLOYMENT_UNIT.destroy_all_deployed_stacks()
+        self.write_retry_statistics()
+        common.LOG.info('Keystone authentications: ' +
+                        str(common.DEPLOYMENT_UNIT.heat_manager.get_auth_statistics()))
+        common.LOG.info('Heat template validations: ' +
+                        str(common.DEPLOYMENT_UNIT.heat_manager.get_validation_statistics()))
+        common.LOG.info('Traffic generation resources leases: ' + str(self.resource_pool.get_statistics()))
 
     def run_benchmarks(self):
         """
         :return:
         """
         common.LOG.info('Run Benchmarking Unit')
-        for iteration in range(0, self.iterations):
-            common.LOG.info('Iteration ' + str(iteration))
-            for template_file_name in self.template_files:
-                experiment_name = BenchmarkingUnit.extract_experiment_name(template_file_name)
-                configuration = self.get_experiment_configuration(template_file_name)
-                metadata = dict()
-                metadata['experiment_name'] = experiment_name
-                self.data_manager.add_metadata(experiment_name, metadata)
-                for benchmark in self.benchmarks:
-                    common.LOG.info('Benchmark ' + benchmark.get_name() + ' started on ' + template_file_name)
-                    benchmark.init()
-                    common.LOG.info('Template ' + experiment_name + ' deployment START')
-                    if common.DEPLOYMENT_UNIT.deploy_heat_template(self.template_dir + template_file_name, experiment_name, self.heat_template_parameters):
-                            common.LOG.info('Template ' + experiment_name + ' deployment COMPLETED')
-                    else:
-                        common.LOG.info('Template ' + experiment_name + ' deployment FAILED')
-                        continue
-                    result = benchmark.run()
-                    self.data_manager.add_data_points(experiment_name, benchmark.get_name(), result)
-
-                    # TODO: YARDSTICK - Remove Fingerprints from release version
-                    if common.FINGERPRINT:
-                        common.LOG.info('Calculating Fingerprints')
-                        fingerprint = al.ApexlakeAnalytics.get_fingerprint(experiment_name)
-                        # TODO: move fingerprint literal into constant file
-                        self.data_manager.add_data_points(experiment_name, 'fingerprint', fingerprint)
-                        bound = al.ApexlakeAnalytics.format_fingerprint(fingerprint)
-                        self.data_manager.add_data_points(experiment_name, 'bound', bound)
-
-                    common.LOG.info('Destroying deployment for experiment ' + experiment_name)
-                    common.DEPLOYMENT_UNIT.destroy_heat_template(experiment_name)
-                    benchmark.finalize()
-                    common.LOG.info('Benchmark ' + benchmark.__class__.__name__ + ' terminated')
-                    self.data_manager.generate_result_csv_file()
-                common.LOG.info('Benchmark Finished')
-                # self.data_manager.add_metadata(experiment_name, metadata)
-                self.data_manager.add_configuration(experiment_name, configuration)
+        schedule = self.schedule
+        if self.search == fp.SEARCH_BAYESIAN:
+            self.run_adaptive_search(schedule)
+        else:
+            if self.deployment_lookahead and self.deployment_mode == fp.DEPLOYMENT_RECREATE:
+                self.start_pipeline(schedule)
+            for iteration in range(0, self.iterations):
+                if self.convergence:
+                    schedule = [experiment for experiment in schedule if not self.convergence.is_converged(
+                        BenchmarkingUnit.extract_experiment_name(experiment[0]))]
+                    if not schedule:
+                        common.LOG.info('All the experiments converged after ' + str(iteration) + ' iterations')
+                        break
+                common.LOG.info('Iteration ' + str(iteration))
+                self.iteration = iteration
+                if self.concurrent_experiments > 1:
+                    self.run_concurrent_experiments(schedule)
+                    continue
+                for template_file_name, cost in schedule:
+                    self.run_experiment(template_file_name, cost)
+            if self.pipeline:
+                self.pipeline.close()
+                self.pipeline = None
+            if self.convergence:
+                self.add_convergence_data_points()
+        if self.deployment_mode == fp.DEPLOYMENT_UPDATE:
+            common.LOG.info('Destroying the deployment shared by the experiments')
+            common.DEPLOYMENT_UNIT.destroy_heat_template(fp.UPDATE_STACK_NAME)
         common.LOG.info('Benchmarking Unit: Experiments completed!')
 
+    def run_concurrent_experiments(self, schedule):
+        """
+        Runs the experiments of the schedule through a pool of threads, each one running an experiment at a time
+        with its own instances of the benchmarks. The experiments wait for the traffic generation resources when
+        all of them are leased.
+        :param schedule: list of (template file name, cost)
+        :return: None
+        """
+        free_sets = [self.benchmarks] + [self.benchmark_sets[index] for index in sorted(self.benchmark_sets.keys())]
+        sets_lock = threading.Lock()
+
+        def run(experiment):
+            with sets_lock:
+                benchmarks = free_sets.pop(0)
+            try:
+                self.run_experiment(experiment[0], experiment[1], benchmarks)
+            finally:
+                with sets_lock:
+                    free_sets.append(benchmarks)
+
+        pool = ThreadPool(self.concurrent_experiments)
+        try:
+            pool.map(run, schedule)
+        finally:
+            pool.close()
+            pool.join()
+
+    def supports_concurrent_execution(self):
+        """
+        Returns True if the experiments can be executed concurrently with the configured deployment and
+        benchmarks (the stack shared in update mode, the deployment pipeline, the adaptive search and the noisy
+        neighbours require the experiments to be executed one at a time)
+        :return: bool
+        """
+        reasons = list()
+        if self.deployment_mode == fp.DEPLOYMENT_UPDATE:
+            reasons.append('deployment mode ' + fp.DEPLOYMENT_UPDATE)
+        if self.deployment_lookahead:
+            reasons.append('deployment pipeline')
+        if self.search == fp.SEARCH_BAYESIAN:
+            reasons.append(fp.SEARCH_BAYESIAN + ' search')
+        for benchmark in self.benchmarks:
+            if not benchmark.supports_concurrent_execution() or benchmark.requires_noisy_neighbours():
+                reasons.append('benchmark ' + benchmark.get_name())
+        if reasons:
+            common.LOG.info('The experiments are executed one at a time (' + ', '.join(reasons) + ')')
+        return not reasons
+
+    def run_experiment(self, template_file_name, cost=0.0, benchmarks=None):
+        """
+        Runs all the benchmarks on the deployment of a template, with the traffic generation resources leased for
+        the whole experiment
+        :param template_file_name: file name of the template (string)
+        :param cost: cost of the experiment (float)
+        :param benchmarks: instances of the benchmarks to be used (default self.benchmarks)
+        :return: dict() benchmark name -> results of the benchmark
+        """
+        benchmarks = benchmarks or self.benchmarks
+        lease = self.resource_pool.lease()
+        try:
+            for benchmark in benchmarks:
+                benchmark.set_resources(lease)
+            results = self.execute_experiment(template_file_name, cost, benchmarks)
+            if self.convergence:
+                self.convergence.add_results(BenchmarkingUnit.extract_experiment_name(template_file_name), results)
+            if self.concurrent_experiments > 1:
+                experiment_name = BenchmarkingUnit.extract_experiment_name(template_file_name)
+                self.data_manager.add_metadata(experiment_name, {'traffic_resources': lease['name'],
+                                                                 'traffic_resources_wait_time': lease['wait_time']})
+            return results
+        finally:
+            self.resource_pool.release(lease)
+
+    def execute_experiment(self, template_file_name, cost, benchmarks):
+        """
+        Runs all the benchmarks on the deployment of a template
+        :param template_file_name: file name of the template (string)
+        :param cost: cost of the experiment (float)
+        :param benchmarks: instances of the benchmarks to be used
+        :return: dict() benchmark name -> results of the benchmark
+        """
+        results = dict()
+        experiment_name = BenchmarkingUnit.extract_experiment_name(template_file_name)
+        configuration = self.get_experiment_configuration(template_file_name)
+        metadata = dict()
+        metadata['experiment_name'] = experiment_name
+        metadata['cost'] = cost
+        self.data_manager.add_metadata(experiment_name, metadata)
+        for duplicate in self.get_duplicate_experiment_names(template_file_name):
+            metadata = dict()
+            metadata['experiment_name'] = duplicate
+            metadata['cost'] = cost
+            metadata['executed_as'] = experiment_name
+            self.data_manager.add_metadata(duplicate, metadata)
+        if self.retry_policy.is_open(self.template_dir + template_file_name):
+            common.LOG.info('Experiment ' + experiment_name + ' skipped after repeated deployment failures')
+            self.retry_policy.record(self.template_dir + template_file_name, 'skipped')
+            self.add_retry_metadata(template_file_name)
+            if self.pipeline:
+                # Releases the stacks deployed in advance for the experiment
+                for index in range(0, len(benchmarks)):
+                    if self.requires_deployment(index):
+                        stack_name, deployed = self.pipeline.get_stack(template_file_name)
+                        if deployed:
+                            common.DEPLOYMENT_UNIT.destroy_heat_template(stack_name)
+            return results
+        stack_name = None
+        deployment_requested = False
+        for index in range(0, len(benchmarks)):
+            benchmark = benchmarks[index]
+            unit = self.journal.get_unit(template_file_name, benchmark.get_name(), self.iteration)
+            if unit:
+                # Completed before the interruption of the run, results already reloaded
+                common.LOG.info('Benchmark ' + benchmark.get_name() + ' on ' + template_file_name +
+                                ' already completed (iteration ' + str(self.iteration) + ')')
+                results[benchmark.get_name()] = unit['data_points'].get(benchmark.get_name())
+                continue
+            common.LOG.info('Benchmark ' + benchmark.get_name() + ' started on ' + template_file_name)
+            if not benchmark.requires_noisy_neighbours():
+                common.DEPLOYMENT_UNIT.neighbour_pool.park()
+            benchmark.init()
+            data_points = dict()
+            # The stack shared with the benchmarks already completed is deployed for the first one to be executed
+            if self.requires_deployment(index) or not deployment_requested:
+                deployment_requested = True
+                if stack_name:
+                    self.destroy_experiment(experiment_name, stack_name)
+                common.LOG.info('Template ' + experiment_name + ' deployment START')
+                start = common.get_time()
+                stack_name, deployed = self.deploy_experiment(template_file_name)
+                data_points[fp.DEPLOYMENT_BENCHMARK] = self.add_deployment_data_point(
+                    experiment_name, benchmark.get_name(), stack_name, deployed, common.get_time() - start)
+                if deployed:
+                    common.LOG.info('Template ' + experiment_name + ' deployment COMPLETED')
+                else:
+                    common.LOG.info('Template ' + experiment_name + ' deployment FAILED')
+                    stack_name = None
+            elif stack_name:
+                common.LOG.info('Template ' + experiment_name + ' deployment REUSED')
+            if not stack_name:
+                continue
+            result = benchmark.run()
+            results[benchmark.get_name()] = result
+            self.data_manager.add_data_points(experiment_name, benchmark.get_name(), result)
+            data_points[benchmark.get_name()] = result
+
+            # TODO: YARDSTICK - Remove Fingerprints from release version
+            if common.FINGERPRINT:
+                common.LOG.info('Calculating Fingerprints')
+                fingerprint = al.ApexlakeAnalytics.get_fingerprint(experiment_name)
+                # TODO: move fingerprint literal into constant file
+                self.data_manager.add_data_points(experiment_name, 'fingerprint', fingerprint)
+                bound = al.ApexlakeAnalytics.format_fingerprint(fingerprint)
+                self.data_manager.add_data_points(experiment_name, 'bound', bound)
+                data_points['fingerprint'] = fingerprint
+                data_points['bound'] = bound
+            self.journal.record(template_file_name, benchmark.get_name(), self.iteration, data_points,
+                                self.get_template_digest(template_file_name))
+
+            if self.execution_mode != fp.EXECUTION_PER_TEMPLATE:
+                self.destroy_experiment(experiment_name, stack_name)
+                stack_name = None
+            benchmark.finalize()
+            common.LOG.info('Benchmark ' + benchmark.__class__.__name__ + ' terminated')
+        if stack_name:
+            self.destroy_experiment(experiment_name, stack_name)
+        common.LOG.info('Benchmark Finished')
+        self.add_retry_metadata(template_file_name)
+        if self.pipeline:
+            self.data_manager.add_metadata(experiment_name, {
+                'deployment_time_saved': self.pipeline.get_saved_time(template_file_name)})
+        # self.data_manager.add_metadata(experiment_name, metadata)
+        self.data_manager.add_configuration(experiment_name, configuration)
+        for duplicate in self.get_duplicate_templates(template_file_name):
+            self.data_manager.add_configuration(BenchmarkingUnit.extract_experiment_name(duplicate),
+                                                self.get_experiment_configuration(duplicate))
+        # The results of the experiment are appended once its configuration is known
+        with self.results_lock:
+            self.data_manager.append_result_csv_file()
+        return results
+
+    def deploy_experiment(self, template_file_name):
+        """
+        Deploys the stack of an experiment according to the deployment mode.
+        In update mode the stack shared by all the experiments is moved to the new template,
+        with the pipeline the stack deployed in advance is used.
+        :param template_file_name: file name of the template (string)
+        :return: (name of the stack, True if the deployment is completed)
+        """
+        template_file = self.template_dir + template_file_name
+        if self.deployment_mode == fp.DEPLOYMENT_UPDATE:
+            return fp.UPDATE_STACK_NAME, bool(common.DEPLOYMENT_UNIT.update_heat_template(
+                template_file, fp.UPDATE_STACK_NAME, self.heat_template_parameters))
+        if self.pipeline:
+            return self.pipeline.get_stack(template_file_name)
+        experiment_name = BenchmarkingUnit.extract_experiment_name(template_file_name)
+        return experiment_name, bool(common.DEPLOYMENT_UNIT.deploy_heat_template(
+            template_file, experiment_name, self.heat_template_parameters))
+
+    def add_deployment_data_point(self, experiment_name, benchmark_name, stack_name, deployed, deployment_time):
+        """
+        Stores the timings of the phases of a deployment under the deployment benchmark of the experiment
+        :param experiment_name: name of the experiment (string)
+        :param benchmark_name: name of the benchmark requiring the deployment (string)
+        :param stack_name: name of the stack (string)
+        :param deployed: True if the deployment is completed (bool)
+        :param deployment_time: time waited by the Benchmarking Unit for the deployment (float)
+        :return: the data point (dict)
+        """
+        self.add_deletion_data_points()
+        self.stack_experiments[stack_name] = experiment_name
+        data_point = common.DEPLOYMENT_UNIT.get_timings(stack_name)
+        data_point['operation'] = 'update' if self.deployment_mode == fp.DEPLOYMENT_UPDATE else 'create'
+        data_point['stack_name'] = stack_name
+        data_point['benchmark'] = benchmark_name
+        data_point['deployed'] = deployed
+        data_point['deployment_time'] = deployment_time
+        self.data_manager.add_data_points(experiment_name, fp.DEPLOYMENT_BENCHMARK, data_point)
+        return data_point
+
+    def add_deletion_data_points(self):
+        """
+        Stores the timings of the deletions completed in background under the deployment benchmark
+        of the experiments they belong to, and records them in the progress journal
+        :return: None
+        """
+        deletions = list()
+        for stack_name, timings in common.DEPLOYMENT_UNIT.pop_deletion_timings():
+            experiment_name = self.stack_experiments.get(stack_name)
+            if not experiment_name:
+                continue
+            data_point = dict(timings)
+            data_point['operation'] = 'delete'
+            data_point['stack_name'] = stack_name
+            self.data_manager.add_data_points(experiment_name, fp.DEPLOYMENT_BENCHMARK, data_point)
+            deletions.append((experiment_name, data_point))
+        if deletions:
+            self.journal.record_deletions(deletions)
+
+    def reload_journal(self):
+        """
+        Reloads in the Data Manager the data points of the units of work completed by the interrupted run,
+        which are not executed again
+        :return: None
+        """
+        units = self.journal.load()
+        for unit in units:
+            # The run is resumed only on the same templates (e.g. not on a new sample of the configurations)
+            if unit['template'] not in self.template_files or \
+                    unit.get('template_digest') != self.get_template_digest(unit['template']):
+                raise ValueError('The template ' + unit['template'] + ' is not the one executed by the ' +
+                                 'interrupted run, restore the templates from the results directory')
+            experiment_name = BenchmarkingUnit.extract_experiment_name(unit['template'])
+            for benchmark_name in unit['data_points']:
+                if self.data_manager.is_benchmark_present(experiment_name, benchmark_name):
+                    self.data_manager.add_data_points(experiment_name, benchmark_name,
+                                                      unit['data_points'][benchmark_name])
+        for experiment_name, data_point in self.journal.get_deletions():
+            if self.data_manager.is_benchmark_present(experiment_name, fp.DEPLOYMENT_BENCHMARK):
+                self.data_manager.add_data_points(experiment_name, fp.DEPLOYMENT_BENCHMARK, data_point)
+        common.LOG.info('Resuming the run: ' + str(len(units)) + ' units of work already completed')
+        if self.deployment_lookahead:
+            # The stacks deployed in advance would not match the units still to be executed
+            common.LOG.info('Deployment pipeline disabled while resuming the run')
+            self.deployment_lookahead = 0
+
+    def get_template_digest(self, template_file_name):
+        """
+        Returns the hash of a template and of its metadata
+        :param template_file_name: file name of the template (string)
+        :return: string
+        """
+        with self.results_lock:
+            if template_file_name not in self.template_digests:
+                self.template_digests[template_file_name] = heat.get_template_file_digest(self.template_dir,
+                                                                                          template_file_name)
+            return self.template_digests[template_file_name]
+
+    def destroy_experiment(self, experiment_name, stack_name):
+        """
+        Destroys the stack of an experiment (in update mode the stack is kept for the next experiment)
+        :param experiment_name: name of the experiment (string)
+        :param stack_name: name of the stack (string)
+        :return: None
+        """
+        if self.deployment_mode != fp.DEPLOYMENT_UPDATE:
+            common.LOG.info('Destroying deployment for experiment ' + experiment_name)
+            common.DEPLOYMENT_UNIT.destroy_heat_template(stack_name)
+
+    def requires_deployment(self, index):
+        """
+        Returns True if the template has to be deployed before running the benchmark in the given position.
+        In per_template mode the stack is shared by the benchmarks, unless they require a fresh deployment.
+        :param index: position of the benchmark in self.benchmarks (int)
+        :return: bool
+        """
+        if index == 0 or self.execution_mode != fp.EXECUTION_PER_TEMPLATE:
+            return True
+        return self.benchmarks[index].requires_fresh_deployment()
+
+    def add_convergence_data_points(self):
+        """
+        Adds to the results the precision achieved by each metric of each experiment and the iterations executed
+        :return: None
+        """
+        converged = 0
+        for template_file_name in self.template_files:
+            experiment_name = BenchmarkingUnit.extract_experiment_name(template_file_name)
+            iterations = self.convergence.get_iterations(experiment_name)
+            is_converged = self.convergence.is_converged(experiment_name)
+            converged += 1 if is_converged else 0
+            self.data_manager.add_data_points(experiment_name, fp.CONVERGENCE_BENCHMARK,
+                                              self.convergence.get_precision(experiment_name))
+            self.data_manager.add_metadata(experiment_name, {'iterations_executed': iterations,
+                                                             'converged': is_converged})
+        with self.results_lock:
+            self.data_manager.append_result_csv_file()
+        common.LOG.info(str(converged) + ' of ' + str(len(self.template_files)) + ' experiments converged within ' +
+                        str(self.convergence.precision) + ' (relative width of the 95% confidence interval)')
+
+    def add_retry_metadata(self, template_file_name):
+        """
+        Adds the retry statistics of the deployments of a template to the metadata of the experiment
+        :param template_file_name: file name of the template (string)
+        :return: None
+        """
+        statistics = self.retry_policy.get_statistics(self.template_dir + template_file_name)
+        metadata = dict()
+        for event in statistics:
+            metadata['deployment_' + event] = statistics[event]
+        experiment_name = BenchmarkingUnit.extract_experiment_name(template_file_name)
+        self.data_manager.add_metadata(experiment_name, metadata)
+
+    def write_retry_statistics(self):
+        """
+        Writes the retry statistics of the deployments in the results directory
+        :return: None
+        """
+        statistics = dict()
+        statistics['total'] = self.retry_policy.get_statistics()
+        for template_file_name in self.template_files:
+            experiment_name = BenchmarkingUnit.extract_experiment_name(template_file_name)
+            statistics[experiment_name] = self.retry_policy.get_statistics(self.template_dir + template_file_name)
+        with open(self.results_directory + '/' + fp.RETRY_STATISTICS_FILE_NAME, 'w') as statistics_file:
+            json.dump(statistics, statistics_file, indent=4, sort_keys=True)
+        common.LOG.info('Deployment retries: ' + str(statistics['total']))
+
+    def start_pipeline(self, schedule):
+        """
+        Starts the deployment in background of the stacks required by the schedule
+        (one for each deployment of each experiment in every iteration)
+        :param schedule: list of (template file name, cost)
+        :return: None
+        """
+        deployments_per_experiment = len([index for index in range(0, len(self.benchmarks))
+                                          if self.requires_deployment(index)])
+        deployments = list()
+        for iteration in range(0, self.iterations):
+            for template_file_name, cost in schedule:
+                deployments.extend([template_file_name] * deployments_per_experiment)
+        common.LOG.info('Deployment pipeline started (lookahead: ' + str(self.deployment_lookahead) + ')')
+        self.pipeline = pipeline.DeploymentPipeline(common.DEPLOYMENT_UNIT, self.template_dir,
+                                                    self.heat_template_parameters, self.deployment_lookahead)
+        self.pipeline.set_schedule(deployments)
+
+    def run_adaptive_search(self, schedule):
+        """
+        Runs the experiments selected one at a time by the Bayesian search,
+        looking for the template which maximizes the search metric
+        :param schedule: list of (template file name, cost) to choose from
+        :return: None
+        """
+        costs = dict(schedule)
+        candidates = list()
+        for template_file_name, cost in schedule:
+            candidates.append((template_file_name, self.get_experiment_configuration(template_file_name)))
+        search = adaptive.BayesianSearch(candidates, self.deployment_types, common.SEARCH_MAX_TRIALS,
+                                         common.SEARCH_MAX_TIME, common.SEARCH_INITIAL_TRIALS, common.SEARCH_SEED)
+        trial = 0
+        template_file_name = search.next_candidate()
+        while template_file_name:
+            trial += 1
+            common.LOG.info('Search trial ' + str(trial) + ': ' + template_file_name)
+            values = list()
+            for iteration in range(0, self.iterations):
+                common.LOG.info('Iteration ' + str(iteration))
+                self.iteration = iteration
+                results = self.run_experiment(template_file_name, costs[template_file_name])
+                value = BenchmarkingUnit.get_metric_value(results, self.search_metric)
+                if value is not None:
+                    values.append(value)
+            value = None
+            if values:
+                value = sum(values) / len(values)
+            search.observe(template_file_name, value)
+            experiment_name = BenchmarkingUnit.extract_experiment_name(template_file_name)
+            self.data_manager.add_metadata(experiment_name, {'search_trial': trial})
+            template_file_name = search.next_candidate()
+        best_template, best_value = search.get_best()
+        common.LOG.info('Search completed after ' + str(trial) + ' trials. Best template: ' + str(best_template) +
+                        ' (' + self.search_metric + ' = ' + str(best_value) + ')')
+
+    @staticmethod
+    def get_metric_value(results, metric):
+        """
+        Returns the average value of a metric over the data points returned by the benchmarks
+        :param results: dict() benchmark name -> data point or list of data points
+        :param metric: name of the metric (string)
+        :return: float or None if the metric is not available
+        """
+        values = list()
+        for result in results.values():
+            data_points = result if isinstance(result, list) else [result]
+            for data_point in data_points:
+                if isinstance(data_point, dict) and metric in data_point.keys():
+                    try:
+                        values.append(float(data_point[metric]))
+                    except (TypeError, ValueError):
+                        pass
+        if not values:
+            return None
+        return sum(values) / len(values)
+
+    def get_experiment_schedule(self):
+        """
+        Returns the templates in the order in which they have to be executed
+        according to the scheduling policy and to the cost budget
+        :return: list of (template file name, cost)
+        """
+        experiments = list()
+        for template_file_name in self.template_files:
+            experiments.append((template_file_name, self.get_experiment_configuration(template_file_name)))
+        schedule = self.scheduler.schedule(experiments, self.iterations)
+        common.LOG.info(str(len(schedule)) + ' experiments scheduled (policy: ' + self.scheduler.policy + ')')
+        return schedule
+
+    def get_duplicate_templates(self, template_file_name):
+        """
+        Returns the file names of the templates identical to the given one, which are not deployed
+        :param template_file_name:
+        :return: list() of strings
+        """
+        return self.duplicate_templates.get(template_file_name, list())
+
+    def get_duplicate_experiment_names(self, template_file_name):
+        """
+        Returns the names of the experiments sharing the results of the given template
+        :param template_file_name:
+        :return: list() of strings
+        """
+        return [BenchmarkingUnit.extract_experiment_name(duplicate)
+                for duplicate in self.get_duplicate_templates(template_file_name)]
+
     def get_experiment_configuration(self, template_file_name):
         """
         Load and return the configuration for the specific experiment (template)
@@ -181,16 +725,7 @@ class BenchmarkingUnit:
         """
         # current = None
         # [pkg_name, class_name] = complete_module_name.rsplit('.', 1)
-        strings = complete_module_name.split('.')
-        pkg = __import__('experimental_framework.benchmarks.' + strings[0], globals(), locals(), [], -1)
-        module = getattr(getattr(pkg, 'benchmarks'), strings[0])
-        members = inspect.getmembers(module)
-        for m in members:
-            if inspect.isclass(m[1]):
-                class_name = m[1]("", dict()).__class__.__name__
-                if isinstance(m[1]("", dict()), base.BenchmarkBaseClass) and \
-                        not class_name == 'BenchmarkBaseClass':
-                    return m[1]
+        return registry.REGISTRY.get_benchmark_class(complete_module_name)
 
     @staticmethod
     def get_required_benchmarks(required_benchmarks):
@@ -210,24 +745,8 @@ class BenchmarkingUnit:
     def get_available_test_cases():
         """
         Returns a list of available test cases from the file system
-        :return:
+        (the benchmarks package, whatever the working directory)
+        :return: list of strings
         """
-        modules = list()
-        ret_val = list()
-
         # bench.BenchmarkingUnit.get_benchmark_class('rfc2544_throughput_benchmark.RFC2544ThroughputBenchmark')
-        for dirname, dirnames, filenames in os.walk('./benchmarks'):
-            for file in filenames:
-                if file.endswith('py'):
-                    modules.append(file.replace(".py", ""))
-                    classes = __import__("benchmarks." + file.replace(".py", ""))
-        cls = list()
-        for mod in modules:
-            members = inspect.getmembers(getattr(classes, mod))
-            for m in members:
-                if inspect.isclass(m[1]):
-                    class_name = m[1]("", dict()).__class__.__name__
-                    if isinstance(m[1]("", dict()), base.BenchmarkBaseClass) and \
-                            not class_name == 'BenchmarkBaseClass':
-                        ret_val.append(mod + "." + class_name)
-        return ret_val
\ No newline at end of file
+        return registry.REGISTRY.get_available_test_cases()
\ No newline at end of file
@@ -28,16 +28,18 @@ class BenchmarkBaseClass(object):
             params = dict()
         if not isinstance(params, dict):
             raise ValueError("Parameters need to be provided in a dict")
-        for param in self.get_features()['parameters']:
+        # The features are computed once for the instance
+        self.features = self.get_features()
+        for param in self.features['parameters']:
             if param not in params.keys():
-                params[param] = self.get_features()['default_values'][param]
-        for param in self.get_features()['parameters']:
-            if params[param] not in \
-                    (self.get_features())['allowed_values'][param]:
+                params[param] = self.features['default_values'][param]
+        for param in self.features['parameters']:
+            if params[param] not in self.features['allowed_values'][param]:
                 raise ValueError('Value of parameter "' + param +
                                  '" is not allowed')
         self.name = name
         self.params = params
+        self.resources = dict()
 
     def get_name(self):
         return self.name
@@ -48,8 +50,46 @@ class BenchmarkBaseClass(object):
         features['parameters'] = list()
         features['allowed_values'] = dict()
         features['default_values'] = dict()
+        features['fresh_deployment'] = False
+        features['noisy_neighbours'] = False
+        features['concurrent_execution'] = False
         return features
 
+    def requires_fresh_deployment(self):
+        """
+        Returns True if the benchmark has to be executed on a stack on which
+        no other benchmark has been executed (fresh_deployment feature)
+        :return: bool
+        """
+        return bool(self.features.get('fresh_deployment', False))
+
+    def requires_noisy_neighbours(self):
+        """
+        Returns True if the benchmark uses the noisy neighbours of the pool
+        of the deployment unit (noisy_neighbours feature). The neighbours are
+        suspended during the other benchmarks.
+        :return: bool
+        """
+        return bool(self.features.get('noisy_neighbours', False))
+
+    def supports_concurrent_execution(self):
+        """
+        Returns True if the benchmark can be executed at the same time as
+        other experiments, using only the traffic generation resources
+        leased to it (concurrent_execution feature)
+        :return: bool
+        """
+        return bool(self.features.get('concurrent_execution', False))
+
+    def set_resources(self, resources):
+        """
+        Assigns the traffic generation resources leased to the benchmark for
+        the next execution (see resource_pool.TrafficResourcePool)
+        :param resources: dict of resources (NICs, coremask, VLANs)
+        :return: None
+        """
+        self.resources = resources
+
     @abc.abstractmethod
     def init(self):
         """
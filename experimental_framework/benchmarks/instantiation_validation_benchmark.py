@@ -76,6 +76,8 @@ class InstantiationValidationBenchmark(base.BenchmarkBaseClass):
         features['default_values'][THROUGHPUT] = '1'
         features['default_values'][VLAN_SENDER] = '-1'
         features['default_values'][VLAN_RECEIVER] = '-1'
+        # The instantiation is validated on a newly deployed VNF
+        features['fresh_deployment'] = True
         return features
 
     def run(self):
@@ -84,12 +86,12 @@ class InstantiationValidationBenchmark(base.BenchmarkBaseClass):
         packet_size = '512'
         traffic_rate_percentage = self.params[THROUGHPUT]
 
-        dpdk_pktgen_vars = common.get_dpdk_pktgen_vars()
+        dpdk_pktgen_vars = common.get_dpdk_pktgen_vars(self.resources)
         bus_address = dpdk_pktgen_vars[cfs.CFSP_DPDK_BUS_SLOT_NIC_2]
         self.interface_name = \
             common.get_interface_name_by_bus_address(bus_address)
 
-        packetgen = dpdk.DpdkPacketGenerator()
+        packetgen = dpdk.DpdkPacketGenerator(self.resources)
         self._configure_lua_file(traffic_rate_percentage, traffic_time)
         packetgen.init_dpdk_pktgen(dpdk_interfaces=1,
                                    pcap_file_0='packet_' + packet_size +
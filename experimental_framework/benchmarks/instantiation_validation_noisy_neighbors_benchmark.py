@@ -49,6 +49,7 @@ class InstantiationValidationNoisyNeighborsBenchmark(
         features['default_values'][NUM_OF_NEIGHBORS] = '1'
         features['default_values'][NUMBER_OF_CORES] = '1'
         features['default_values'][AMOUNT_OF_RAM] = '250M'
+        features['noisy_neighbours'] = True
         return features
 
     def init(self):
@@ -58,17 +59,15 @@ class InstantiationValidationNoisyNeighborsBenchmark(
         heat_param = dict()
         heat_param['cores'] = self.params['number_of_cores']
         heat_param['memory'] = self.params['amount_of_ram']
-        for i in range(0, int(self.params['num_of_neighbours'])):
-            stack_name = self.stack_name + str(i)
-            common.DEPLOYMENT_UNIT.deploy_heat_template(self.template_file,
-                                                        stack_name,
-                                                        heat_param)
-            self.neighbor_stack_names.append(stack_name)
+        # The neighbours are shared with the previous experiments when the
+        # parameters match
+        self.neighbor_stack_names = \
+            common.DEPLOYMENT_UNIT.neighbour_pool.acquire(
+                self.template_file, self.stack_name, heat_param,
+                int(self.params['num_of_neighbours']))
 
     def finalize(self):
         common.replace_in_file(self.lua_file, 'local out_file = "' +
                                self.results_file + '"', 'local out_file = ""')
-        # destroy neighbor stacks
-        for stack_name in self.neighbor_stack_names:
-            common.DEPLOYMENT_UNIT.destroy_heat_template(stack_name)
+        # The neighbor stacks are kept in the pool for the next experiments
         self.neighbor_stack_names = list()
\ No newline at end of file
@@ -39,6 +39,7 @@ class MultiTenancyThroughputBenchmark(base.RFC2544ThroughputBenchmark):
         features['default_values']['num_of_neighbours'] = '1'
         features['default_values']['number_of_cores'] = '1'
         features['default_values']['amount_of_ram'] = '250M'
+        features['noisy_neighbours'] = True
         return features
 
     def init(self):
@@ -50,10 +51,9 @@ class MultiTenancyThroughputBenchmark(base.RFC2544ThroughputBenchmark):
         heat_param = dict()
         heat_param['cores'] = self.params['number_of_cores']
         heat_param['memory'] = self.params['amount_of_ram']
-        for i in range(0, int(self.params['num_of_neighbours'])):
-            stack_name = self.stack_name + str(i)
-            common.DEPLOYMENT_UNIT.deploy_heat_template(self.template_file, stack_name, heat_param)
-            self.neighbor_stack_names.append(stack_name)
+        # The neighbours are shared with the previous experiments when the parameters match
+        self.neighbor_stack_names = common.DEPLOYMENT_UNIT.neighbour_pool.acquire(
+            self.template_file, self.stack_name, heat_param, int(self.params['num_of_neighbours']))
 
     def finalize(self):
         """
@@ -61,7 +61,5 @@ class MultiTenancyThroughputBenchmark(base.RFC2544ThroughputBenchmark):
         return: None
         """
         common.replace_in_file(self.lua_file, 'local out_file = "' + self.results_file + '"', 'local out_file = ""')
-        # destroy neighbor stacks
-        for stack_name in self.neighbor_stack_names:
-            common.DEPLOYMENT_UNIT.destroy_heat_template(stack_name)
+        # The neighbor stacks are kept in the pool for the next experiments
         self.neighbor_stack_names = list()
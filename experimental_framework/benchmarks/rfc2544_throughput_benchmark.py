@@ -15,6 +15,8 @@
 __author__ = 'vmriccox'
 
 
+import shutil
+
 from experimental_framework.benchmarks import benchmark_base_class
 from experimental_framework.packet_generators \
     import dpdk_packet_generator as dpdk
@@ -37,7 +39,28 @@ class RFC2544ThroughputBenchmark(benchmark_base_class.BenchmarkBaseClass):
         self.base_dir = common.get_base_dir() + \
                         fp.EXPERIMENTAL_FRAMEWORK_DIR + fp.DPDK_PKTGEN_DIR
         self.results_file = self.base_dir + 'experiment.res'
-        self.lua_file = self.base_dir + 'rfc2544.lua'
+        self.lua_script = 'rfc2544.lua'
+        self.lua_file = self.base_dir + self.lua_script
+
+    def set_resources(self, resources):
+        """
+        Assigns the traffic generation resources leased to the benchmark.
+        Leased resources come with their own copy of the lua script and
+        their own results file, so that several experiments can be
+        executed at the same time.
+        :param resources: dict of resources (NICs, coremask, VLANs)
+        :return: None
+        """
+        benchmark_base_class.BenchmarkBaseClass.set_resources(self, resources)
+        lease_name = resources.get('name', '')
+        self.results_file = self.base_dir + 'experiment.res'
+        self.lua_script = 'rfc2544.lua'
+        if lease_name:
+            self.results_file = self.base_dir + lease_name + '_experiment.res'
+            self.lua_script = lease_name + '_rfc2544.lua'
+            shutil.copyfile(self.base_dir + 'rfc2544.lua',
+                            self.base_dir + self.lua_script)
+        self.lua_file = self.base_dir + self.lua_script
 
     def init(self):
         """
@@ -69,6 +92,7 @@ class RFC2544ThroughputBenchmark(benchmark_base_class.BenchmarkBaseClass):
         features['default_values'][PACKET_SIZE] = '1280'
         features['default_values'][VLAN_SENDER] = '1007'
         features['default_values'][VLAN_RECEIVER] = '1006'
+        features['concurrent_execution'] = True
         return features
 
     def run(self):
@@ -82,15 +106,19 @@ class RFC2544ThroughputBenchmark(benchmark_base_class.BenchmarkBaseClass):
         ret_val[PACKET_SIZE] = packet_size
 
         # Packetgen management
-        packetgen = dpdk.DpdkPacketGenerator()
+        packetgen = dpdk.DpdkPacketGenerator(self.resources)
         self._configure_lua_file()
+        # The VLANs leased with the resources replace the parameters
         packetgen.init_dpdk_pktgen(dpdk_interfaces=2,
                                    pcap_file_0='packet_' +
                                                packet_size + '.pcap',
                                    pcap_file_1='igmp.pcap',
-                                   lua_script='rfc2544.lua',
-                                   vlan_0=self.params[VLAN_SENDER],
-                                   vlan_1=self.params[VLAN_RECEIVER])
+                                   lua_script=self.lua_script,
+                                   vlan_0=self.resources.get(
+                                       VLAN_SENDER, self.params[VLAN_SENDER]),
+                                   vlan_1=self.resources.get(
+                                       VLAN_RECEIVER,
+                                       self.params[VLAN_RECEIVER]))
         common.LOG.debug('Start the packet generator - packet size: ' +
                          str(packet_size))
         packetgen.send_traffic()
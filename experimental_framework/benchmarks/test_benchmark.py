@@ -32,6 +32,7 @@ class TestBenchmark(base.BenchmarkBaseClass):
         features['parameters'] = list()
         features['allowed_values'] = dict()
         features['default_values'] = dict()
+        features['concurrent_execution'] = True
         return features
 
     def run(self):
@@ -21,6 +21,7 @@ import ConfigParser
 import logging
 import json
 import fileinput
+import time
 from experimental_framework.constants import conf_file_sections as cf
 from experimental_framework.constants import framework_parameters as fp
 
@@ -34,6 +35,31 @@ CONF_FILE = None
 DEPLOYMENT_UNIT = None
 ITERATIONS = None
 FINGERPRINT = None
+SCHEDULING = None
+COST_BUDGET = None
+DESIGN = None
+DESIGN_SAMPLES = None
+DESIGN_SEED = None
+SEARCH = None
+SEARCH_METRIC = None
+SEARCH_MAX_TRIALS = None
+SEARCH_MAX_TIME = None
+SEARCH_INITIAL_TRIALS = None
+SEARCH_SEED = None
+DEPLOYMENT_MODE = None
+STACK_TIMEOUT = None
+DEPLOYMENT_LOOKAHEAD = None
+EXECUTION_MODE = None
+VALIDATE_TEMPLATES = None
+DEPLOYMENT_RETRIES = None
+RETRY_DELAY = None
+RETRY_MAX_DELAY = None
+CIRCUIT_BREAKER_THRESHOLD = None
+PHASE_TIMEOUTS = None
+SHARDS = None
+CONCURRENT_EXPERIMENTS = None
+CONVERGENCE_PRECISION = None
+CONVERGENCE_METRICS = None
 
 BASE_DIR = None
 RESULT_DIR = None
@@ -49,6 +75,9 @@ PKTGEN_COREMASK = None
 PKTGEN_MEMCHANNEL = None
 PKTGEN_BUS_SLOT_NIC_1 = None
 PKTGEN_BUS_SLOT_NIC_2 = None
+PKTGEN_NIC_PAIRS = None
+PKTGEN_COREMASKS = None
+PKTGEN_VLAN_PAIRS = None
 
 
 # ------------------------------------------------------
@@ -66,6 +95,8 @@ def init(api=False):
     init_log()
     if len(CONF_FILE.get_variable_list(cf.CFS_PKTGEN)) > 0:
         init_pktgen()
+    if SHARDS:
+        init_shards()
 
 
 def init_conf_file(api=False):
@@ -82,6 +113,31 @@ def init_general_vars():
     global TEMPLATE_DIR
     global RESULT_DIR
     global ITERATIONS
+    global SCHEDULING
+    global COST_BUDGET
+    global DESIGN
+    global DESIGN_SAMPLES
+    global DESIGN_SEED
+    global SEARCH
+    global SEARCH_METRIC
+    global SEARCH_MAX_TRIALS
+    global SEARCH_MAX_TIME
+    global SEARCH_INITIAL_TRIALS
+    global SEARCH_SEED
+    global DEPLOYMENT_MODE
+    global STACK_TIMEOUT
+    global DEPLOYMENT_LOOKAHEAD
+    global EXECUTION_MODE
+    global VALIDATE_TEMPLATES
+    global DEPLOYMENT_RETRIES
+    global RETRY_DELAY
+    global RETRY_MAX_DELAY
+    global CIRCUIT_BREAKER_THRESHOLD
+    global PHASE_TIMEOUTS
+    global SHARDS
+    global CONCURRENT_EXPERIMENTS
+    global CONVERGENCE_PRECISION
+    global CONVERGENCE_METRICS
 
     TEMPLATE_FILE_EXTENSION = '.yaml'
 
@@ -125,6 +181,167 @@ def init_general_vars():
     else:
         ITERATIONS = 1
 
+    # Validate and assign the scheduling policy of the experiments
+    SCHEDULING = CONF_FILE.get_optional_variable(cf.CFS_GENERAL,
+                                                 cf.CFSG_SCHEDULING,
+                                                 fp.SCHEDULING_DEFAULT)
+    if SCHEDULING not in fp.get_supported_scheduling_policies():
+        raise ValueError('The specified scheduling policy is not supported '
+                         'by the framework')
+
+    # Validate and assign the budget for the cost of the experiments
+    COST_BUDGET = InputValidation.validate_optional_number(
+        CONF_FILE.get_optional_variable(cf.CFS_GENERAL, cf.CFSG_COST_BUDGET),
+        'The parameter ' + cf.CFSG_COST_BUDGET + ' is not a number')
+
+    # Validate and assign the design of experiments
+    DESIGN = CONF_FILE.get_optional_variable(cf.CFS_GENERAL, cf.CFSG_DESIGN,
+                                             fp.DESIGN_FULL_FACTORIAL)
+    if DESIGN not in fp.get_supported_designs():
+        raise ValueError('The specified design of experiments is not '
+                         'supported by the framework')
+    DESIGN_SAMPLES = InputValidation.validate_optional_integer(
+        CONF_FILE.get_optional_variable(cf.CFS_GENERAL,
+                                        cf.CFSG_DESIGN_SAMPLES),
+        'The parameter ' + cf.CFSG_DESIGN_SAMPLES + ' is not an integer')
+    DESIGN_SEED = InputValidation.validate_optional_integer(
+        CONF_FILE.get_optional_variable(cf.CFS_GENERAL, cf.CFSG_DESIGN_SEED),
+        'The parameter ' + cf.CFSG_DESIGN_SEED + ' is not an integer')
+
+    # Validate and assign the adaptive search of the configurations
+    SEARCH = CONF_FILE.get_optional_variable(cf.CFS_GENERAL, cf.CFSG_SEARCH,
+                                             fp.SEARCH_EXHAUSTIVE)
+    if SEARCH not in fp.get_supported_search_strategies():
+        raise ValueError('The specified search strategy is not supported '
+                         'by the framework')
+    SEARCH_METRIC = CONF_FILE.get_optional_variable(cf.CFS_GENERAL,
+                                                    cf.CFSG_SEARCH_METRIC,
+                                                    'throughput')
+    SEARCH_MAX_TRIALS = InputValidation.validate_optional_integer(
+        CONF_FILE.get_optional_variable(cf.CFS_GENERAL,
+                                        cf.CFSG_SEARCH_MAX_TRIALS),
+        'The parameter ' + cf.CFSG_SEARCH_MAX_TRIALS + ' is not an integer')
+    SEARCH_MAX_TIME = InputValidation.validate_optional_number(
+        CONF_FILE.get_optional_variable(cf.CFS_GENERAL,
+                                        cf.CFSG_SEARCH_MAX_TIME),
+        'The parameter ' + cf.CFSG_SEARCH_MAX_TIME + ' is not a number')
+    SEARCH_INITIAL_TRIALS = InputValidation.validate_optional_integer(
+        CONF_FILE.get_optional_variable(cf.CFS_GENERAL,
+                                        cf.CFSG_SEARCH_INITIAL_TRIALS, 3),
+        'The parameter ' + cf.CFSG_SEARCH_INITIAL_TRIALS +
+        ' is not an integer')
+    SEARCH_SEED = InputValidation.validate_optional_integer(
+        CONF_FILE.get_optional_variable(cf.CFS_GENERAL, cf.CFSG_SEARCH_SEED),
+        'The parameter ' + cf.CFSG_SEARCH_SEED + ' is not an integer')
+
+    # Validate and assign the deployment mode of the experiments
+    DEPLOYMENT_MODE = CONF_FILE.get_optional_variable(cf.CFS_GENERAL,
+                                                      cf.CFSG_DEPLOYMENT_MODE,
+                                                      fp.DEPLOYMENT_RECREATE)
+    if DEPLOYMENT_MODE not in fp.get_supported_deployment_modes():
+        raise ValueError('The specified deployment mode is not supported by '
+                         'the framework')
+
+    # Validate and assign the timeout of the stack operations
+    STACK_TIMEOUT = InputValidation.validate_optional_number(
+        CONF_FILE.get_optional_variable(cf.CFS_GENERAL, cf.CFSG_STACK_TIMEOUT),
+        'The parameter ' + cf.CFSG_STACK_TIMEOUT + ' is not a number')
+
+    # Validate and assign the number of stacks deployed in advance
+    DEPLOYMENT_LOOKAHEAD = InputValidation.validate_optional_integer(
+        CONF_FILE.get_optional_variable(cf.CFS_GENERAL,
+                                        cf.CFSG_DEPLOYMENT_LOOKAHEAD, 0),
+        'The parameter ' + cf.CFSG_DEPLOYMENT_LOOKAHEAD +
+        ' is not an integer')
+    if DEPLOYMENT_LOOKAHEAD < 0:
+        raise ValueError('The parameter ' + cf.CFSG_DEPLOYMENT_LOOKAHEAD +
+                         ' cannot be negative')
+
+    # Validate and assign the execution mode of the benchmarks
+    EXECUTION_MODE = CONF_FILE.get_optional_variable(
+        cf.CFS_GENERAL, cf.CFSG_EXECUTION_MODE, fp.EXECUTION_PER_BENCHMARK)
+    if EXECUTION_MODE not in fp.get_supported_execution_modes():
+        raise ValueError('The specified execution mode is not supported by '
+                         'the framework')
+
+    # Validate and assign the validation of all the templates before the
+    # execution of the experiments
+    VALIDATE_TEMPLATES = InputValidation.validate_boolean(
+        CONF_FILE.get_optional_variable(cf.CFS_GENERAL,
+                                        cf.CFSG_VALIDATE_TEMPLATES, False),
+        'The parameter ' + cf.CFSG_VALIDATE_TEMPLATES + ' is not a boolean')
+
+    # Validate and assign the retry policy of the stack operations
+    DEPLOYMENT_RETRIES = InputValidation.validate_optional_integer(
+        CONF_FILE.get_optional_variable(cf.CFS_GENERAL,
+                                        cf.CFSG_DEPLOYMENT_RETRIES,
+                                        fp.RETRY_MAX_RETRIES),
+        'The parameter ' + cf.CFSG_DEPLOYMENT_RETRIES + ' is not an integer')
+    RETRY_DELAY = InputValidation.validate_optional_number(
+        CONF_FILE.get_optional_variable(cf.CFS_GENERAL, cf.CFSG_RETRY_DELAY,
+                                        fp.RETRY_BASE_DELAY),
+        'The parameter ' + cf.CFSG_RETRY_DELAY + ' is not a number')
+    RETRY_MAX_DELAY = InputValidation.validate_optional_number(
+        CONF_FILE.get_optional_variable(cf.CFS_GENERAL,
+                                        cf.CFSG_RETRY_MAX_DELAY,
+                                        fp.RETRY_MAX_DELAY),
+        'The parameter ' + cf.CFSG_RETRY_MAX_DELAY + ' is not a number')
+    CIRCUIT_BREAKER_THRESHOLD = InputValidation.validate_optional_integer(
+        CONF_FILE.get_optional_variable(cf.CFS_GENERAL,
+                                        cf.CFSG_CIRCUIT_BREAKER_THRESHOLD,
+                                        fp.CIRCUIT_BREAKER_THRESHOLD),
+        'The parameter ' + cf.CFSG_CIRCUIT_BREAKER_THRESHOLD +
+        ' is not an integer')
+    PHASE_TIMEOUTS = dict()
+    for phase, variable in [('create', cf.CFSG_CREATE_TIMEOUT),
+                            ('update', cf.CFSG_UPDATE_TIMEOUT),
+                            ('delete', cf.CFSG_DELETE_TIMEOUT)]:
+        PHASE_TIMEOUTS[phase] = InputValidation.validate_optional_number(
+            CONF_FILE.get_optional_variable(cf.CFS_GENERAL, variable),
+            'The parameter ' + variable + ' is not a number')
+
+    # Validate and assign the testbeds (shards) among which the experiments
+    # are split
+    SHARDS = list()
+    for shard in CONF_FILE.get_optional_variable(cf.CFS_GENERAL,
+                                                 cf.CFSG_SHARDS, '').split(','):
+        shard = shard.strip()
+        if not shard:
+            continue
+        if shard in SHARDS:
+            raise ValueError('The shard ' + shard + ' is specified twice')
+        SHARDS.append(shard)
+    if SHARDS and SEARCH == fp.SEARCH_BAYESIAN:
+        raise ValueError('The parameter ' + cf.CFSG_SHARDS + ' is not '
+                         'supported with the ' + fp.SEARCH_BAYESIAN +
+                         ' search')
+
+    # Validate and assign the number of experiments executed at the same
+    # time (each one with its own traffic generation resources)
+    CONCURRENT_EXPERIMENTS = InputValidation.validate_optional_integer(
+        CONF_FILE.get_optional_variable(cf.CFS_GENERAL,
+                                        cf.CFSG_CONCURRENT_EXPERIMENTS, 1),
+        'The parameter ' + cf.CFSG_CONCURRENT_EXPERIMENTS +
+        ' is not an integer')
+    if CONCURRENT_EXPERIMENTS < 1:
+        raise ValueError('The parameter ' + cf.CFSG_CONCURRENT_EXPERIMENTS +
+                         ' has to be positive')
+
+    # Validate and assign the precision after which an experiment is not
+    # repeated anymore (iterations is then the maximum number of iterations)
+    CONVERGENCE_PRECISION = InputValidation.validate_optional_number(
+        CONF_FILE.get_optional_variable(cf.CFS_GENERAL,
+                                        cf.CFSG_CONVERGENCE_PRECISION),
+        'The parameter ' + cf.CFSG_CONVERGENCE_PRECISION +
+        ' is not a number')
+    if CONVERGENCE_PRECISION is not None and CONVERGENCE_PRECISION <= 0:
+        raise ValueError('The parameter ' + cf.CFSG_CONVERGENCE_PRECISION +
+                         ' has to be positive')
+    CONVERGENCE_METRICS = [metric.strip() for metric in
+                           CONF_FILE.get_optional_variable(
+                               cf.CFS_GENERAL, cf.CFSG_CONVERGENCE_METRICS,
+                               '').split(',') if metric.strip()]
+
     # Validate and assign ApexLake Fingerprint
     # TODO: TO be removed for Yardstick
     if cf.CFSG_FINGERPRINT in CONF_FILE.get_variable_list(cf.CFS_GENERAL):
@@ -150,10 +367,52 @@ def init_log():
     LOG.addHandler(file_handler)
 
 
+# ------------------------------------------------------
+# Shards (testbeds) conf variables
+# ------------------------------------------------------
+def init_shards():
+    """
+    Loads the profiles of the shards. Each shard requires an OpenStack
+    section named OpenStack-<shard> and can have a PacketGen section named
+    PacketGen-<shard> (otherwise the PacketGen section is used)
+
+    :return: None
+    """
+    for shard in SHARDS:
+        CONF_FILE.add_section(cf.get_shard_section(cf.CFS_OPENSTACK, shard))
+        CONF_FILE.add_section(cf.get_shard_section(cf.CFS_PKTGEN, shard), True)
+
+
+def get_shard_profiles():
+    """
+    Returns the profiles of the shards, each one with the credentials of its
+    OpenStack project and the section of its packet generator
+
+    :return: list of dict
+    """
+    profiles = list()
+    for shard in SHARDS:
+        profile = dict()
+        profile['name'] = shard
+        profile['credentials'] = get_credentials(cf.get_shard_section(cf.CFS_OPENSTACK, shard))
+        profile['pktgen_section'] = cf.get_shard_section(cf.CFS_PKTGEN, shard)
+        if not CONF_FILE.get_variable_list(profile['pktgen_section']):
+            profile['pktgen_section'] = cf.CFS_PKTGEN
+        profiles.append(profile)
+    return profiles
+
+
 # ------------------------------------------------------
 # Packet Generator conf variables
 # ------------------------------------------------------
-def init_pktgen():
+def init_pktgen(section=cf.CFS_PKTGEN):
+    """
+    Loads the variables of the packet generator from a section of the
+    configuration file
+
+    :param section: PacketGen section or profile of a shard (string)
+    :return: None
+    """
     global PKTGEN
     global PKTGEN_DIR
     global PKTGEN_PROGRAM
@@ -162,85 +421,130 @@ def init_pktgen():
     global PKTGEN_BUS_SLOT_NIC_1
     global PKTGEN_BUS_SLOT_NIC_2
     global PKTGEN_DPDK_DIRECTORY
+    global PKTGEN_NIC_PAIRS
+    global PKTGEN_COREMASKS
+    global PKTGEN_VLAN_PAIRS
 
-    InputValidation.validate_configuration_file_section(cf.CFS_PKTGEN, "Section " + cf.CFS_PKTGEN +
+    InputValidation.validate_configuration_file_section(section, "Section " + section +
                                                         " is not present in the configuration file")
-    pktgen_var_list = CONF_FILE.get_variable_list(cf.CFS_PKTGEN)
+    pktgen_var_list = CONF_FILE.get_variable_list(section)
 
     PKTGEN = 'dpdk_pktgen'  # default value
     if cf.CFSP_PACKET_GENERATOR in pktgen_var_list:
-        InputValidation.validate_configuration_file_parameter(cf.CFS_PKTGEN,
+        InputValidation.validate_configuration_file_parameter(section,
                                                               cf.CFSP_PACKET_GENERATOR,
                                                               "Parameter " + cf.CFSP_PACKET_GENERATOR +
-                                                              " is not present in section " + cf.CFS_PKTGEN)
-        PKTGEN = CONF_FILE.get_variable(cf.CFS_PKTGEN, cf.CFSP_PACKET_GENERATOR)
+                                                              " is not present in section " + section)
+        PKTGEN = CONF_FILE.get_variable(section, cf.CFSP_PACKET_GENERATOR)
 
     if PKTGEN not in fp.get_supported_packet_generators():
         raise ValueError('The specified packet generator is not supported by the framework')
 
     # Check if the packet gen is dpdk_pktgen
     if PKTGEN == cf.CFSP_PG_DPDK:
-        InputValidation.validate_configuration_file_parameter(cf.CFS_PKTGEN,
+        InputValidation.validate_configuration_file_parameter(section,
                                                               cf.CFSP_DPDK_PKTGEN_DIRECTORY,
                                                               "Parameter " + cf.CFSP_DPDK_PKTGEN_DIRECTORY +
-                                                              " is not present in section " + cf.CFS_PKTGEN)
-        PKTGEN_DIR = CONF_FILE.get_variable(cf.CFS_PKTGEN, cf.CFSP_DPDK_PKTGEN_DIRECTORY)
+                                                              " is not present in section " + section)
+        PKTGEN_DIR = CONF_FILE.get_variable(section, cf.CFSP_DPDK_PKTGEN_DIRECTORY)
         PKTGEN_DIR = InputValidation.validate_directory_exist_and_format(PKTGEN_DIR, "The directory " + PKTGEN_DIR +
                                                                          "does not exist")
 
-        InputValidation.validate_configuration_file_parameter(cf.CFS_PKTGEN,
+        InputValidation.validate_configuration_file_parameter(section,
                                                               cf.CFSP_DPDK_PROGRAM_NAME,
                                                               "Parameter " + cf.CFSP_DPDK_PROGRAM_NAME +
-                                                              " is not present in section " + cf.CFS_PKTGEN)
-        PKTGEN_PROGRAM = CONF_FILE.get_variable(cf.CFS_PKTGEN, cf.CFSP_DPDK_PROGRAM_NAME)
+                                                              " is not present in section " + section)
+        PKTGEN_PROGRAM = CONF_FILE.get_variable(section, cf.CFSP_DPDK_PROGRAM_NAME)
 
-        InputValidation.validate_configuration_file_parameter(cf.CFS_PKTGEN,
+        InputValidation.validate_configuration_file_parameter(section,
                                                               cf.CFSP_DPDK_COREMASK,
                                                               "Parameter " + cf.CFSP_DPDK_COREMASK +
-                                                              " is not present in section " + cf.CFS_PKTGEN)
-        PKTGEN_COREMASK = CONF_FILE.get_variable(cf.CFS_PKTGEN, cf.CFSP_DPDK_COREMASK)
+                                                              " is not present in section " + section)
+        PKTGEN_COREMASK = CONF_FILE.get_variable(section, cf.CFSP_DPDK_COREMASK)
         # TODO: coremask to be further validated
 
-        InputValidation.validate_configuration_file_parameter(cf.CFS_PKTGEN,
+        InputValidation.validate_configuration_file_parameter(section,
                                                               cf.CFSP_DPDK_MEMORY_CHANNEL,
                                                               "Parameter " + cf.CFSP_DPDK_MEMORY_CHANNEL +
-                                                              " is not present in section " + cf.CFS_PKTGEN)
-        PKTGEN_MEMCHANNEL = CONF_FILE.get_variable(cf.CFS_PKTGEN, cf.CFSP_DPDK_MEMORY_CHANNEL)
+                                                              " is not present in section " + section)
+        PKTGEN_MEMCHANNEL = CONF_FILE.get_variable(section, cf.CFSP_DPDK_MEMORY_CHANNEL)
         # TODO: memchannel to be further validated
 
         InputValidation.\
-            validate_configuration_file_parameter(cf.CFS_PKTGEN,
+            validate_configuration_file_parameter(section,
                                                   cf.CFSP_DPDK_BUS_SLOT_NIC_1,
                                                   "Parameter " +
                                                   cf.CFSP_DPDK_BUS_SLOT_NIC_1 +
                                                   " is not present in "
-                                                  "section " + cf.CFS_PKTGEN)
+                                                  "section " + section)
         PKTGEN_BUS_SLOT_NIC_1 = \
-            CONF_FILE.get_variable(cf.CFS_PKTGEN, cf.CFSP_DPDK_BUS_SLOT_NIC_1)
+            CONF_FILE.get_variable(section, cf.CFSP_DPDK_BUS_SLOT_NIC_1)
         # TODO: to be further validated
 
         InputValidation.\
-            validate_configuration_file_parameter(cf.CFS_PKTGEN,
+            validate_configuration_file_parameter(section,
                                                   cf.CFSP_DPDK_BUS_SLOT_NIC_2,
                                                   "Parameter " +
                                                   cf.CFSP_DPDK_BUS_SLOT_NIC_2 +
                                                   " is not present in "
-                                                  "section " + cf.CFS_PKTGEN)
+                                                  "section " + section)
         PKTGEN_BUS_SLOT_NIC_2 = \
-            CONF_FILE.get_variable(cf.CFS_PKTGEN, cf.CFSP_DPDK_BUS_SLOT_NIC_2)
+            CONF_FILE.get_variable(section, cf.CFSP_DPDK_BUS_SLOT_NIC_2)
         # TODO: to be further validated
 
         InputValidation.\
-            validate_configuration_file_parameter(cf.CFS_PKTGEN,
+            validate_configuration_file_parameter(section,
                                                   cf.CFSP_DPDK_DPDK_DIRECTORY,
                                                   "Parameter " +
                                                   cf.CFSP_DPDK_DPDK_DIRECTORY +
                                                   " is not present in "
-                                                  "section " + cf.CFS_PKTGEN)
+                                                  "section " + section)
         PKTGEN_DPDK_DIRECTORY = \
-            CONF_FILE.get_variable(cf.CFS_PKTGEN, cf.CFSP_DPDK_DPDK_DIRECTORY)
+            CONF_FILE.get_variable(section, cf.CFSP_DPDK_DPDK_DIRECTORY)
         # TODO: to be further validated
 
+        # Traffic generation resources which can be leased to concurrent
+        # experiments (by default the NICs and the coremask above)
+        PKTGEN_NIC_PAIRS = _parse_pairs(
+            CONF_FILE.get_optional_variable(section, cf.CFSP_DPDK_NIC_PAIRS),
+            cf.CFSP_DPDK_NIC_PAIRS)
+        if not PKTGEN_NIC_PAIRS:
+            PKTGEN_NIC_PAIRS = [(PKTGEN_BUS_SLOT_NIC_1, PKTGEN_BUS_SLOT_NIC_2)]
+        PKTGEN_COREMASKS = [coremask.strip() for coremask in
+                            CONF_FILE.get_optional_variable(
+                                section, cf.CFSP_DPDK_COREMASKS,
+                                PKTGEN_COREMASK).split(',')
+                            if coremask.strip()]
+        PKTGEN_VLAN_PAIRS = _parse_pairs(
+            CONF_FILE.get_optional_variable(section, cf.CFSP_DPDK_VLAN_PAIRS),
+            cf.CFSP_DPDK_VLAN_PAIRS)
+        for vlan_pair in PKTGEN_VLAN_PAIRS:
+            for vlan in vlan_pair:
+                InputValidation.validate_optional_integer(
+                    vlan, 'The VLAN ' + vlan + ' is not an integer')
+
+
+def _parse_pairs(value, variable):
+    """
+    Parses a list of pairs in the format: a_1/b_1, a_2/b_2, ...
+
+    :param value: value of the variable (string or None)
+    :param variable: name of the variable (string)
+    :return: list of (string, string)
+    """
+    pairs = list()
+    if not value:
+        return pairs
+    for pair in value.split(','):
+        if not pair.strip():
+            continue
+        elements = [element.strip() for element in pair.split('/')]
+        if len(elements) != 2 or not elements[0] or not elements[1]:
+            raise ValueError('The pair "' + pair.strip() + '" of the parameter ' + variable +
+                             ' has to be in the format a/b')
+        pairs.append((elements[0], elements[1]))
+    return pairs
+
 
 # ------------------------------------------------------
 # Configuration file access
@@ -264,8 +568,27 @@ class ConfigurationFile:
         InputValidation.validate_file_exist(config_file, 'The provided configuration file does not exist')
         self.config = ConfigParser.ConfigParser()
         self.config.read(config_file)
+        self.sections = list()
         for section in sections:
-            setattr(self, section, ConfigurationFile._config_section_map(section, self.config))
+            self.add_section(section, section in cf.get_optional_sections())
+
+    def add_section(self, section, optional=False):
+        """
+        Loads a further section of the configuration file
+        (e.g. the profile of a shard)
+
+        :param section: section to be loaded (string)
+        :param optional: if True a missing section is loaded as empty (bool)
+        :return: None
+        """
+        if section not in self.sections:
+            self.sections.append(section)
+        if optional and not self.config.has_section(section):
+            setattr(self, section, dict())
+            return
+        if not self.config.has_section(section):
+            raise ValueError('Section ' + section + ' not found in the configuration file')
+        setattr(self, section, ConfigurationFile._config_section_map(section, self.config))
 
     @staticmethod
     def _config_section_map(section, config_file):
@@ -301,6 +624,20 @@ class ConfigurationFile:
         else:
             raise ValueError('Parameter ' + variable_name + ' is not in the ' + section + ' section of the conf file')
 
+    def get_optional_variable(self, section, variable_name, default=None):
+        """
+        Returns the value correspondent to a variable or a default value
+        if the variable is not in the section
+
+        :param section: section to be loaded (string)
+        :param variable_name: name of the variable (string)
+        :param default: value returned if the variable is not present
+        :return: string
+        """
+        if variable_name in self.get_variable_list(section):
+            return self.get_variable(section, variable_name)
+        return default
+
     def get_variable_list(self, section):
         """
         Returns the list of the available variables in a section
@@ -316,18 +653,38 @@ class ConfigurationFile:
 # ------------------------------------------------------
 # Get OpenStack Credentials
 # ------------------------------------------------------
-def get_credentials():
+def get_credentials(section=cf.CFS_OPENSTACK):
     """
     Returns the credentials for OpenStack access from the configuration file
+    :param section: OpenStack section or profile of a shard (string)
     :return: dictionary
     """
     credentials = dict()
-    credentials[cf.CFSO_IP_CONTROLLER] = CONF_FILE.get_variable(cf.CFS_OPENSTACK, cf.CFSO_IP_CONTROLLER)
-    credentials[cf.CFSO_HEAT_URL] = CONF_FILE.get_variable(cf.CFS_OPENSTACK, cf.CFSO_HEAT_URL)
-    credentials[cf.CFSO_USER] = CONF_FILE.get_variable(cf.CFS_OPENSTACK, cf.CFSO_USER)
-    credentials[cf.CFSO_PASSWORD] = CONF_FILE.get_variable(cf.CFS_OPENSTACK, cf.CFSO_PASSWORD)
-    credentials[cf.CFSO_AUTH_URI] = CONF_FILE.get_variable(cf.CFS_OPENSTACK, cf.CFSO_AUTH_URI)
-    credentials[cf.CFSO_PROJECT] = CONF_FILE.get_variable(cf.CFS_OPENSTACK, cf.CFSO_PROJECT)
+    credentials[cf.CFSO_IP_CONTROLLER] = CONF_FILE.get_variable(section, cf.CFSO_IP_CONTROLLER)
+    credentials[cf.CFSO_HEAT_URL] = CONF_FILE.get_variable(section, cf.CFSO_HEAT_URL)
+    credentials[cf.CFSO_USER] = CONF_FILE.get_variable(section, cf.CFSO_USER)
+    credentials[cf.CFSO_PASSWORD] = CONF_FILE.get_variable(section, cf.CFSO_PASSWORD)
+    credentials[cf.CFSO_AUTH_URI] = CONF_FILE.get_variable(section, cf.CFSO_AUTH_URI)
+    credentials[cf.CFSO_PROJECT] = CONF_FILE.get_variable(section, cf.CFSO_PROJECT)
+
+    # Heat backend (the fake one keeps the stacks in memory)
+    credentials[cf.CFSO_HEAT_BACKEND] = CONF_FILE.get_optional_variable(section, cf.CFSO_HEAT_BACKEND,
+                                                                        fp.HEAT_BACKEND_OPENSTACK)
+    if credentials[cf.CFSO_HEAT_BACKEND] not in fp.get_supported_heat_backends():
+        raise ValueError('The specified heat backend is not supported by the framework')
+    if credentials[cf.CFSO_HEAT_BACKEND] == fp.HEAT_BACKEND_FAKE:
+        for variable in [cf.CFSO_FAKE_CREATE_LATENCY, cf.CFSO_FAKE_UPDATE_LATENCY,
+                         cf.CFSO_FAKE_DELETE_LATENCY, cf.CFSO_FAKE_FAILURE_RATE]:
+            credentials[variable] = InputValidation.validate_optional_number(
+                CONF_FILE.get_optional_variable(section, variable, 0),
+                'The parameter ' + variable + ' is not a number')
+        credentials[cf.CFSO_FAKE_SEED] = InputValidation.validate_optional_integer(
+            CONF_FILE.get_optional_variable(section, cf.CFSO_FAKE_SEED),
+            'The parameter ' + cf.CFSO_FAKE_SEED + ' is not an integer')
+        credentials[cf.CFSO_FAKE_LATENCY_DISTRIBUTION] = CONF_FILE.get_optional_variable(
+            section, cf.CFSO_FAKE_LATENCY_DISTRIBUTION, fp.FAKE_HEAT_CONSTANT)
+        if credentials[cf.CFSO_FAKE_LATENCY_DISTRIBUTION] not in fp.get_supported_fake_heat_distributions():
+            raise ValueError('The specified latency distribution is not supported by the framework')
     return credentials
 
 
@@ -425,6 +782,17 @@ def get_interface_name_by_bus_address(bus_address):
     return None
 
 
+def get_time():
+    """
+    Returns the time (seconds) to be used to measure durations, from a
+    monotonic clock when the interpreter provides it
+    :return: float
+    """
+    if hasattr(time, 'monotonic'):
+        return time.monotonic()
+    return time.time()
+
+
 # ------------------------------------------------------
 # Expose variables to other modules
 # ------------------------------------------------------
@@ -437,7 +805,14 @@ def get_template_dir():
     return TEMPLATE_DIR
 
 
-def get_dpdk_pktgen_vars():
+def get_dpdk_pktgen_vars(resources=None):
+    """
+    Returns the variables of the DPDK packet generator
+    :param resources: traffic generation resources leased to the caller,
+            which replace the NICs and the coremask of the configuration
+            file (type: dict)
+    :return: dict
+    """
     if not (PKTGEN == 'dpdk_pktgen'):
         return dict()
     ret_val = dict()
@@ -448,28 +823,132 @@ def get_dpdk_pktgen_vars():
     ret_val[cf.CFSP_DPDK_BUS_SLOT_NIC_1] = PKTGEN_BUS_SLOT_NIC_1
     ret_val[cf.CFSP_DPDK_BUS_SLOT_NIC_2] = PKTGEN_BUS_SLOT_NIC_2
     ret_val[cf.CFSP_DPDK_DPDK_DIRECTORY] = PKTGEN_DPDK_DIRECTORY
+    for variable in [cf.CFSP_DPDK_BUS_SLOT_NIC_1, cf.CFSP_DPDK_BUS_SLOT_NIC_2,
+                     cf.CFSP_DPDK_COREMASK]:
+        if resources and variable in resources:
+            ret_val[variable] = resources[variable]
     return ret_val
 
 
+def get_traffic_resources():
+    """
+    Returns the sets of traffic generation resources which can be leased to
+    concurrent experiments: NIC pair, coremask and (optionally) VLAN pair.
+    The number of sets is the minimum among the number of NIC pairs,
+    coremasks and VLAN pairs available.
+    :return: list of dict (empty without the DPDK packet generator)
+    """
+    if not (PKTGEN == 'dpdk_pktgen'):
+        return list()
+    count = min(len(PKTGEN_NIC_PAIRS), len(PKTGEN_COREMASKS))
+    if PKTGEN_VLAN_PAIRS:
+        count = min(count, len(PKTGEN_VLAN_PAIRS))
+    resources = list()
+    for index in range(0, count):
+        resource = dict()
+        resource[cf.CFSP_DPDK_BUS_SLOT_NIC_1] = PKTGEN_NIC_PAIRS[index][0]
+        resource[cf.CFSP_DPDK_BUS_SLOT_NIC_2] = PKTGEN_NIC_PAIRS[index][1]
+        resource[cf.CFSP_DPDK_COREMASK] = PKTGEN_COREMASKS[index]
+        if PKTGEN_VLAN_PAIRS:
+            resource['vlan_sender'] = PKTGEN_VLAN_PAIRS[index][0]
+            resource['vlan_receiver'] = PKTGEN_VLAN_PAIRS[index][1]
+        resources.append(resource)
+    return resources
+
+
 # ------------------------------------------------------
 # Configuration Variables from Config File
 # ------------------------------------------------------
+def _parse_deployment_configuration_variable(value):
+    """
+    Parses the definition of a variable in the Experiment-VNF section.
+    The format is: @type "value_1", "value_2", ... @costs 'cost_1', ...
+    :param value: definition of the variable (type: str)
+    :return: type, values and costs of the variable (str, list, list)
+    """
+    parts = value.split('@costs', 1)
+    types = re.findall(r'@\w*', parts[0])
+    values = re.findall(r'\"(.+?)\"', parts[0])
+    costs = list()
+    if len(parts) > 1:
+        costs = re.findall(r"\'(.*?)\'", parts[1])
+    var_type = None
+    if len(types) > 0:
+        var_type = types[0][1:]
+    return var_type, values, costs
+
+
 def get_deployment_configuration_variables_from_conf_file():
     variables = dict()
     types = dict()
     all_variables = CONF_FILE.get_variable_list(cf.CFS_EXPERIMENT_VNF)
     for var in all_variables:
         v = CONF_FILE.get_variable(cf.CFS_EXPERIMENT_VNF, var)
-        type = re.findall(r'@\w*', v)
-        values = re.findall(r'\"(.+?)\"', v)
+        type, values, costs = _parse_deployment_configuration_variable(v)
         variables[var] = values
-        try:
-            types[var] = type[0][1:]
-        except IndexError:
+        if type:
+            types[var] = type
+        else:
             LOG.debug("No type has been specified for variable " + var)
     return variables
 
 
+def get_deployment_configuration_types_from_conf_file():
+    """
+    Returns the types (@type annotation) of the variables in the
+    Experiment-VNF section. Variables without type are not included.
+    :return: dict variable -> type (type: str)
+    """
+    types = dict()
+    all_variables = CONF_FILE.get_variable_list(cf.CFS_EXPERIMENT_VNF)
+    for var in all_variables:
+        v = CONF_FILE.get_variable(cf.CFS_EXPERIMENT_VNF, var)
+        var_type, values, costs = _parse_deployment_configuration_variable(v)
+        if var_type:
+            types[var] = var_type
+    return types
+
+
+def get_deployment_configuration_costs_from_conf_file():
+    """
+    Returns the costs associated to the values of the variables in the
+    Experiment-VNF section (@costs annotation).
+    The values without a cost are associated to cost 0.
+    :return: dict variable -> dict value -> cost (type: float)
+    """
+    costs = dict()
+    all_variables = CONF_FILE.get_variable_list(cf.CFS_EXPERIMENT_VNF)
+    for var in all_variables:
+        v = CONF_FILE.get_variable(cf.CFS_EXPERIMENT_VNF, var)
+        var_type, values, value_costs = \
+            _parse_deployment_configuration_variable(v)
+        costs[var] = dict()
+        for index in range(0, len(values)):
+            cost = 0.0
+            if index < len(value_costs):
+                try:
+                    cost = float(value_costs[index])
+                except ValueError:
+                    raise ValueError('The cost "' + value_costs[index] +
+                                     '" of the variable ' + var +
+                                     ' is not a number')
+            costs[var][values[index]] = cost
+    return costs
+
+
+def get_deployment_configuration_constraints_from_conf_file():
+    """
+    Returns the constraints excluding combinations of values of the
+    deployment configuration (Experiment-constraints section)
+    :return: dict name -> expression (type: str)
+    """
+    constraints = dict()
+    for name in CONF_FILE.get_variable_list(cf.CFS_EXPERIMENT_CONSTRAINTS):
+        constraints[name] = \
+            CONF_FILE.get_variable(cf.CFS_EXPERIMENT_CONSTRAINTS, name)
+    return constraints
+
+
 # ------------------------------------------------------
 # benchmarks from Config File
 # ------------------------------------------------------
@@ -525,7 +1004,8 @@ class InputValidation(object):
 
     @staticmethod
     def validate_configuration_file_section(section, message):
-        if section not in cf.get_sections():
+        if section not in cf.get_sections() and \
+                (not CONF_FILE or section not in CONF_FILE.sections):
             raise ValueError(message)
 
     @staticmethod
@@ -539,6 +1019,24 @@ class InputValidation(object):
                 return False
         raise ValueError(message)
 
+    @staticmethod
+    def validate_optional_number(number, message):
+        if number is None:
+            return None
+        try:
+            return float(number)
+        except (TypeError, ValueError):
+            raise ValueError(message)
+
+    @staticmethod
+    def validate_optional_integer(number, message):
+        if number is None:
+            return None
+        try:
+            return int(number)
+        except (TypeError, ValueError):
+            raise ValueError(message)
+
     @staticmethod
     def validate_openstack_credentials(credentials):
         pass
@@ -0,0 +1,215 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+"""
+Constraints excluding combinations of values of the deployment
+configuration.
+
+Each constraint is an expression which is true for the configurations to be
+excluded, es.:
+    vm2-core_pinning_enabled == "shared" and vm2-core_pinning_mode != "isolate"
+Supported operators: ==, !=, <, <=, >, >= (numeric), and, or, not and
+parenthesis. Operands are variable names or values (quoted or not).
+"""
+
+import re
+
+TOKEN_REGEX = re.compile(r'\s*(?:(==|!=|<=|>=|<|>|\(|\))|"([^"]*)"|'
+                         r"'([^']*)'|([\w.\-]+))")
+
+COMPARISONS = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: float(a) < float(b),
+    '<=': lambda a, b: float(a) <= float(b),
+    '>': lambda a, b: float(a) > float(b),
+    '>=': lambda a, b: float(a) >= float(b)
+}
+
+
+class Constraint:
+    """
+    Single constraint parsed from its expression
+    """
+
+    def __init__(self, name, expression, variables):
+        """
+        :param name: name of the constraint (type: str)
+        :param expression: expression of the constraint (type: str)
+        :param variables: names of the variables of the deployment
+                configuration (type: list of str)
+        """
+        self.name = name
+        self.expression = expression
+        self.variables = set()
+        self._names = dict([(variable.lower(), variable)
+                            for variable in variables])
+        self._tokens = Constraint._tokenize(expression)
+        self._position = 0
+        self._evaluate = self._parse_or()
+        if self._position < len(self._tokens):
+            raise ValueError('Unexpected token "' +
+                             self._tokens[self._position][1] +
+                             '" in constraint ' + name)
+
+    def excludes(self, configuration):
+        """
+        Returns True if the configuration has to be excluded
+        :param configuration: dictionary variable -> value, it has to contain
+                all the variables of the constraint (type: dict)
+        :return: type: bool
+        """
+        return self._evaluate(configuration)
+
+    @staticmethod
+    def _tokenize(expression):
+        tokens = list()
+        position = 0
+        expression = expression.strip()
+        while position < len(expression):
+            match = TOKEN_REGEX.match(expression, position)
+            if not match or match.end() == position:
+                raise ValueError('Invalid constraint expression: ' +
+                                 expression)
+            operator, double_quoted, single_quoted, word = match.groups()
+            if operator:
+                tokens.append(('op', operator))
+            elif double_quoted is not None:
+                tokens.append(('value', double_quoted))
+            elif single_quoted is not None:
+                tokens.append(('value', single_quoted))
+            elif word in ['and', 'or', 'not']:
+                tokens.append(('op', word))
+            else:
+                tokens.append(('word', word))
+            position = match.end()
+        return tokens
+
+    def _peek(self):
+        if self._position < len(self._tokens):
+            return self._tokens[self._position]
+        return None, None
+
+    def _next(self):
+        token = self._peek()
+        if token[0] is None:
+            raise ValueError('Incomplete constraint ' + self.name)
+        self._position += 1
+        return token
+
+    def _parse_or(self):
+        operands = [self._parse_and()]
+        while self._peek() == ('op', 'or'):
+            self._next()
+            operands.append(self._parse_and())
+        if len(operands) == 1:
+            return operands[0]
+        return lambda conf: any([operand(conf) for operand in operands])
+
+    def _parse_and(self):
+        operands = [self._parse_not()]
+        while self._peek() == ('op', 'and'):
+            self._next()
+            operands.append(self._parse_not())
+        if len(operands) == 1:
+            return operands[0]
+        return lambda conf: all([operand(conf) for operand in operands])
+
+    def _parse_not(self):
+        if self._peek() == ('op', 'not'):
+            self._next()
+            operand = self._parse_not()
+            return lambda conf: not operand(conf)
+        return self._parse_comparison()
+
+    def _parse_comparison(self):
+        if self._peek() == ('op', '('):
+            self._next()
+            expression = self._parse_or()
+            if self._next() != ('op', ')'):
+                raise ValueError('Missing ")" in constraint ' + self.name)
+            return expression
+        left = self._parse_operand()
+        kind, operator = self._next()
+        if kind != 'op' or operator not in COMPARISONS:
+            raise ValueError('Comparison expected in constraint ' + self.name)
+        right = self._parse_operand()
+        comparison = COMPARISONS[operator]
+        return lambda conf: comparison(left(conf), right(conf))
+
+    def _parse_operand(self):
+        kind, token = self._next()
+        if kind == 'word' and token.lower() in self._names:
+            variable = self._names[token.lower()]
+            self.variables.add(variable)
+            return lambda conf: conf[variable]
+        if kind in ['word', 'value']:
+            return lambda conf: token
+        raise ValueError('Unexpected token "' + token + '" in constraint ' +
+                         self.name)
+
+
+class ConstraintSet:
+    """
+    Set of constraints applied during the enumeration of the configurations.
+    It keeps the count of the configurations which have been excluded.
+    """
+
+    def __init__(self, constraints, variables):
+        """
+        :param constraints: dictionary name -> expression (type: dict)
+        :param variables: names of the variables of the deployment
+                configuration (type: list of str)
+        """
+        self.constraints = [Constraint(name, constraints[name], variables)
+                            for name in sorted(constraints.keys())]
+        self.pruned = 0
+
+    def get_constraints_by_position(self, names):
+        """
+        Groups the constraints by the position of the last of their variables
+        in the enumeration order, so that each constraint is checked as soon
+        as all its variables have a value
+        :param names: variables in the enumeration order (type: list of str)
+        :return: list of lists of Constraint (one list per variable)
+        """
+        positions = [list() for name in names]
+        for constraint in self.constraints:
+            missing = [variable for variable in constraint.variables
+                       if variable not in names]
+            if missing:
+                raise ValueError('The variables ' + ', '.join(missing) +
+                                 ' of constraint ' + constraint.name +
+                                 ' have no values')
+            if not constraint.variables:
+                raise ValueError('The constraint ' + constraint.name +
+                                 ' does not refer to any variable')
+            last = max([names.index(variable)
+                        for variable in constraint.variables])
+            positions[last].append(constraint)
+        return positions
+
+    def excludes(self, configuration):
+        """
+        Returns True if any constraint excludes the configuration
+        :param configuration: dictionary variable -> value (type: dict)
+        :return: type: bool
+        """
+        for constraint in self.constraints:
+            if constraint.excludes(configuration):
+                return True
+        return False
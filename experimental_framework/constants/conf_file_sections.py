@@ -23,6 +23,7 @@ CFS_GENERAL = 'General'
 CFS_OPENSTACK = 'OpenStack'
 CFS_EXPERIMENT_VNF = 'Experiment-VNF'
 CFS_EXPERIMENT_GENERIC = 'Experiment-generic'
+CFS_EXPERIMENT_CONSTRAINTS = 'Experiment-constraints'
 CFS_TESTCASE_PARAMETERS = 'Testcase-parameters'
 CFS_DEPLOYMENT_PARAMETERS = 'Deployment-parameters'
 
@@ -33,6 +34,7 @@ def get_sections():
         CFS_GENERAL,
         CFS_OPENSTACK,
         CFS_EXPERIMENT_VNF,
+        CFS_EXPERIMENT_CONSTRAINTS,
         # CFS_EXPERIMENT_GENERIC,
         CFS_TESTCASE_PARAMETERS,
         CFS_DEPLOYMENT_PARAMETERS
@@ -40,6 +42,13 @@ def get_sections():
     ]
 
 
+def get_optional_sections():
+    return [
+        CFS_EXPERIMENT_CONSTRAINTS
+        # Add here eventually new optional sections in configuration file ...
+    ]
+
+
 def get_sections_api():
     return [
         CFS_PKTGEN,
@@ -49,6 +58,14 @@ def get_sections_api():
         # Add here eventually new sections in configuration file ...
     ]
 
+
+def get_shard_section(section, shard):
+    """
+    Returns the name of the profile of a section for a shard
+    (e.g. OpenStack-testbed1)
+    """
+    return section + '-' + shard
+
 # ------------------------------------------------------
 # General section parameters
 # ------------------------------------------------------
@@ -58,6 +75,33 @@ CFSG_TEMPLATE_NAME = 'template_base_name'
 CFSG_RESULT_DIRECTORY = 'results_directory'
 CFSG_BENCHMARKS = 'benchmarks'
 CFSG_FINGERPRINT = 'fingerprint_on'
+CFSG_SCHEDULING = 'scheduling'
+CFSG_COST_BUDGET = 'cost_budget'
+CFSG_DESIGN = 'design'
+CFSG_DESIGN_SAMPLES = 'design_samples'
+CFSG_DESIGN_SEED = 'design_seed'
+CFSG_SEARCH = 'search'
+CFSG_SEARCH_METRIC = 'search_metric'
+CFSG_SEARCH_MAX_TRIALS = 'search_max_trials'
+CFSG_SEARCH_MAX_TIME = 'search_max_time'
+CFSG_SEARCH_INITIAL_TRIALS = 'search_initial_trials'
+CFSG_SEARCH_SEED = 'search_seed'
+CFSG_DEPLOYMENT_MODE = 'deployment_mode'
+CFSG_STACK_TIMEOUT = 'stack_timeout'
+CFSG_DEPLOYMENT_LOOKAHEAD = 'deployment_lookahead'
+CFSG_EXECUTION_MODE = 'execution_mode'
+CFSG_VALIDATE_TEMPLATES = 'validate_templates'
+CFSG_DEPLOYMENT_RETRIES = 'deployment_retries'
+CFSG_RETRY_DELAY = 'retry_delay'
+CFSG_RETRY_MAX_DELAY = 'retry_max_delay'
+CFSG_CIRCUIT_BREAKER_THRESHOLD = 'circuit_breaker_threshold'
+CFSG_CREATE_TIMEOUT = 'create_timeout'
+CFSG_UPDATE_TIMEOUT = 'update_timeout'
+CFSG_DELETE_TIMEOUT = 'delete_timeout'
+CFSG_SHARDS = 'shards'
+CFSG_CONCURRENT_EXPERIMENTS = 'concurrent_experiments'
+CFSG_CONVERGENCE_PRECISION = 'convergence_precision'
+CFSG_CONVERGENCE_METRICS = 'convergence_metrics'
 
 
 # ------------------------------------------------------
@@ -71,6 +115,9 @@ CFSP_DPDK_COREMASK = 'coremask'
 CFSP_DPDK_MEMORY_CHANNEL = 'memory_channels'
 CFSP_DPDK_BUS_SLOT_NIC_1 = 'bus_slot_nic_1'
 CFSP_DPDK_BUS_SLOT_NIC_2 = 'bus_slot_nic_2'
+CFSP_DPDK_NIC_PAIRS = 'nic_pairs'
+CFSP_DPDK_COREMASKS = 'coremasks'
+CFSP_DPDK_VLAN_PAIRS = 'vlan_pairs'
 
 
 # ------------------------------------------------------
@@ -89,3 +136,10 @@ CFSO_USER = 'user'
 CFSO_PASSWORD = 'password'
 CFSO_AUTH_URI = 'auth_uri'
 CFSO_PROJECT = 'project'
+CFSO_HEAT_BACKEND = 'heat_backend'
+CFSO_FAKE_CREATE_LATENCY = 'fake_create_latency'
+CFSO_FAKE_UPDATE_LATENCY = 'fake_update_latency'
+CFSO_FAKE_DELETE_LATENCY = 'fake_delete_latency'
+CFSO_FAKE_LATENCY_DISTRIBUTION = 'fake_latency_distribution'
+CFSO_FAKE_FAILURE_RATE = 'fake_failure_rate'
+CFSO_FAKE_SEED = 'fake_seed'
@@ -22,13 +22,169 @@ from experimental_framework.constants import conf_file_sections as cfs
 EXPERIMENTAL_FRAMEWORK_DIR = 'experimental_framework/'
 EXPERIMENT_TEMPLATE_NAME = 'experiment'
 TEMPLATE_FILE_EXTENSION = '.yaml'
+DUPLICATE_TEMPLATES_FILE_NAME = EXPERIMENT_TEMPLATE_NAME + '_duplicates.json'
 DPDK_PKTGEN_DIR = 'packet_generators/dpdk_pktgen/'
 PCAP_DIR = 'packet_generators/pcap_files/'
 
+# ------------------------------------------------------
+# Polling of the status of the stacks (seconds)
+# ------------------------------------------------------
+STACK_POLL_INTERVAL = 1
+STACK_POLL_MAX_INTERVAL = 10
+STACK_POLL_BACKOFF = 1.5
+# Maximum number of stacks created or deleted at the same time
+MAX_PARALLEL_STACK_OPERATIONS = 10
+# Default retry policy of the stack operations: retries after the first
+# attempt, delay before the first retry (seconds, doubled at every retry),
+# maximum delay, randomized fraction of the delay and consecutive failed
+# deployments of a template after which it is skipped
+RETRY_MAX_RETRIES = 3
+RETRY_BASE_DELAY = 5
+RETRY_MAX_DELAY = 60
+RETRY_JITTER = 0.5
+CIRCUIT_BREAKER_THRESHOLD = 2
+# HTTP errors of Heat after which an operation can be retried
+RETRYABLE_HTTP_CODES = [401, 408, 409, 429, 500, 502, 503, 504]
+# File of the results directory where the retry statistics are exported
+RETRY_STATISTICS_FILE_NAME = 'retry_statistics.json'
+# Cache of the templates already validated by Heat (in the base directory)
+VALIDATION_CACHE_FILE_NAME = 'heat_validation_cache.json'
+# Journal of the units of work completed (in the results directory)
+PROGRESS_JOURNAL_FILE_NAME = 'progress_journal.json'
+# Copy of the templates executed by a run, used to resume it
+TEMPLATES_RESULTS_DIR = 'templates/'
+# Directory of the results of each shard, within the results directory
+SHARD_RESULTS_DIR = 'shards/'
+# Benchmark under which the timings of the deployments are stored
+DEPLOYMENT_BENCHMARK = 'deployment'
+# Benchmark under which the precision achieved by the experiments is stored
+CONVERGENCE_BENCHMARK = 'convergence'
+# Iterations of an experiment before its convergence is checked
+CONVERGENCE_MIN_ITERATIONS = 2
+
 
 def get_supported_packet_generators():
     return [
         cfs.CFSP_PG_NONE,
         cfs.CFSP_PG_DPDK
         # Add here any other supported packet generator
-    ]
\ No newline at end of file
+    ]
+
+
+# ------------------------------------------------------
+# Scheduling policies for the experiments
+# ------------------------------------------------------
+SCHEDULING_DEFAULT = 'default'
+SCHEDULING_CHEAPEST_FIRST = 'cheapest_first'
+SCHEDULING_MOST_EXPENSIVE_FIRST = 'most_expensive_first'
+SCHEDULING_MINIMUM_CHANGE = 'minimum_change'
+
+
+def get_supported_scheduling_policies():
+    return [
+        SCHEDULING_DEFAULT,
+        SCHEDULING_CHEAPEST_FIRST,
+        SCHEDULING_MOST_EXPENSIVE_FIRST,
+        SCHEDULING_MINIMUM_CHANGE
+        # Add here any other supported scheduling policy
+    ]
+
+
+# ------------------------------------------------------
+# Designs of experiments
+# ------------------------------------------------------
+DESIGN_FULL_FACTORIAL = 'full_factorial'
+DESIGN_FRACTIONAL_FACTORIAL = 'fractional_factorial'
+DESIGN_LATIN_HYPERCUBE = 'latin_hypercube'
+DESIGN_RANDOM = 'random'
+DESIGN_METADATA_KEY = 'design'
+
+
+def get_supported_designs():
+    return [
+        DESIGN_FULL_FACTORIAL,
+        DESIGN_FRACTIONAL_FACTORIAL,
+        DESIGN_LATIN_HYPERCUBE,
+        DESIGN_RANDOM
+        # Add here any other supported design of experiments
+    ]
+
+
+# ------------------------------------------------------
+# Search strategies over the deployment configurations
+# ------------------------------------------------------
+SEARCH_EXHAUSTIVE = 'exhaustive'
+SEARCH_BAYESIAN = 'bayesian'
+
+
+def get_supported_search_strategies():
+    return [
+        SEARCH_EXHAUSTIVE,
+        SEARCH_BAYESIAN
+        # Add here any other supported search strategy
+    ]
+
+
+# ------------------------------------------------------
+# Deployment modes of the experiments
+# ------------------------------------------------------
+DEPLOYMENT_RECREATE = 'recreate'
+DEPLOYMENT_UPDATE = 'update'
+# Name of the stack shared by all the experiments in update mode
+UPDATE_STACK_NAME = EXPERIMENT_TEMPLATE_NAME
+
+
+def get_supported_deployment_modes():
+    return [
+        DEPLOYMENT_RECREATE,
+        DEPLOYMENT_UPDATE
+        # Add here any other supported deployment mode
+    ]
+
+
+# ------------------------------------------------------
+# Execution modes of the benchmarks on an experiment
+# ------------------------------------------------------
+# A new deployment for every benchmark
+EXECUTION_PER_BENCHMARK = 'per_benchmark'
+# One deployment shared by all the benchmarks (except those requiring a
+# fresh deployment in their features)
+EXECUTION_PER_TEMPLATE = 'per_template'
+
+
+def get_supported_execution_modes():
+    return [
+        EXECUTION_PER_BENCHMARK,
+        EXECUTION_PER_TEMPLATE
+        # Add here any other supported execution mode
+    ]
+
+
+# ------------------------------------------------------
+# Heat backends
+# ------------------------------------------------------
+HEAT_BACKEND_OPENSTACK = 'openstack'
+# Stacks kept in memory by the framework (see fake_heat.py)
+HEAT_BACKEND_FAKE = 'fake'
+
+# Distributions of the latency of the actions of the fake heat backend
+FAKE_HEAT_CONSTANT = 'constant'
+FAKE_HEAT_UNIFORM = 'uniform'
+FAKE_HEAT_EXPONENTIAL = 'exponential'
+
+
+def get_supported_heat_backends():
+    return [
+        HEAT_BACKEND_OPENSTACK,
+        HEAT_BACKEND_FAKE
+        # Add here any other supported heat backend
+    ]
+
+
+def get_supported_fake_heat_distributions():
+    return [
+        FAKE_HEAT_CONSTANT,
+        FAKE_HEAT_UNIFORM,
+        FAKE_HEAT_EXPONENTIAL
+        # Add here any other supported latency distribution
+    ]
@@ -0,0 +1,175 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+"""
+Convergence of the results of the experiments across the iterations
+"""
+
+import math
+import threading
+
+# Two-sided 95% quantiles of the Student's t distribution (1 to 30 degrees
+# of freedom), the normal quantile is used beyond
+T_QUANTILES_95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306,
+                  2.262, 2.228, 2.201, 2.179, 2.160, 2.145, 2.131, 2.120,
+                  2.110, 2.101, 2.093, 2.086, 2.080, 2.074, 2.069, 2.064,
+                  2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+NORMAL_QUANTILE_95 = 1.960
+
+
+class RunningStatistics:
+    """
+    Mean and variance of a metric updated one sample at a time
+    (Welford's online algorithm)
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value):
+        """
+        Adds a sample
+        :param value: value of the metric (float)
+        :return: None
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def get_variance(self):
+        """
+        Returns the sample variance (0.0 with less than two samples)
+        :return: float
+        """
+        if self.count < 2:
+            return 0.0
+        return self.m2 / (self.count - 1)
+
+    def get_relative_ci_width(self):
+        """
+        Returns the width of the 95% confidence interval of the mean,
+        relative to the mean
+        :return: float (infinite with less than two samples or a null mean)
+        """
+        if self.count < 2:
+            return float('inf')
+        degrees = self.count - 1
+        quantile = T_QUANTILES_95[degrees - 1] \
+            if degrees <= len(T_QUANTILES_95) else NORMAL_QUANTILE_95
+        width = 2 * quantile * math.sqrt(self.get_variance() / self.count)
+        if width == 0.0:
+            return 0.0
+        if self.mean == 0.0:
+            return float('inf')
+        return width / abs(self.mean)
+
+
+class ConvergenceMonitor:
+    """
+    Keeps the running statistics of the metrics of each experiment and
+    benchmark across the iterations. An experiment has converged when the
+    relative width of the confidence interval of all its metrics is within
+    the target precision.
+    """
+
+    def __init__(self, precision, metrics=None, min_iterations=2):
+        """
+        :param precision: target relative width of the confidence intervals (type: float)
+        :param metrics: metrics to be considered (type: list of str, default all the numeric ones)
+        :param min_iterations: iterations required before checking the convergence (type: int)
+        """
+        if precision <= 0:
+            raise ValueError('The target precision has to be positive')
+        self.precision = precision
+        self.metrics = metrics
+        self.min_iterations = max(min_iterations, 2)
+        self.lock = threading.Lock()
+        self.statistics = dict()
+        self.iterations = dict()
+
+    def add_results(self, experiment_name, results):
+        """
+        Adds the results of an iteration of an experiment
+        :param experiment_name: name of the experiment (type: str)
+        :param results: dict benchmark name -> data point or list of data points
+        :return: None
+        """
+        with self.lock:
+            self.iterations[experiment_name] = self.iterations.get(experiment_name, 0) + 1
+            statistics = self.statistics.setdefault(experiment_name, dict())
+            for benchmark in results.keys():
+                data_points = results[benchmark] if isinstance(results[benchmark], list) else [results[benchmark]]
+                for data_point in data_points:
+                    if not isinstance(data_point, dict):
+                        continue
+                    for metric in data_point.keys():
+                        value = data_point[metric]
+                        if self.metrics and metric not in self.metrics:
+                            continue
+                        if isinstance(value, bool) or not isinstance(value, (int, long, float)):
+                            continue
+                        statistics.setdefault((benchmark, metric), RunningStatistics()).add(float(value))
+
+    def is_converged(self, experiment_name):
+        """
+        Returns True if the experiment does not need to be repeated
+        :param experiment_name: name of the experiment (type: str)
+        :return: bool
+        """
+        with self.lock:
+            if self.iterations.get(experiment_name, 0) < self.min_iterations:
+                return False
+            statistics = self.statistics.get(experiment_name)
+            if not statistics:
+                return False
+            for key in statistics.keys():
+                if statistics[key].get_relative_ci_width() > self.precision:
+                    return False
+            return True
+
+    def get_precision(self, experiment_name):
+        """
+        Returns the precision achieved on the metrics of an experiment
+        :param experiment_name: name of the experiment (type: str)
+        :return: list of dict (benchmark, metric, mean, variance, samples, relative_ci_width)
+        """
+        with self.lock:
+            statistics = self.statistics.get(experiment_name, dict())
+            precision = list()
+            for benchmark, metric in sorted(statistics.keys()):
+                running = statistics[(benchmark, metric)]
+                data_point = dict()
+                data_point['benchmark'] = benchmark
+                data_point['metric'] = metric
+                data_point['mean'] = running.mean
+                data_point['variance'] = running.get_variance()
+                data_point['samples'] = running.count
+                data_point['relative_ci_width'] = running.get_relative_ci_width()
+                precision.append(data_point)
+            return precision
+
+    def get_iterations(self, experiment_name):
+        """
+        Returns the number of iterations of an experiment
+        :param experiment_name: name of the experiment (type: str)
+        :return: int
+        """
+        with self.lock:
+            return self.iterations.get(experiment_name, 0)
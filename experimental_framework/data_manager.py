@@ -108,6 +108,13 @@ class DataManager:
     def __init__(self, experiment_directory):
         self.experiment_directory = experiment_directory
         self.experiments = dict()
+        self.aliases = dict()
+        # Columns of the result CSV files written incrementally (benchmark -> list of titles)
+        self.csv_titles = dict()
+        # Number of data points already in the result CSV files ((experiment, benchmark) -> int)
+        self.csv_rows = dict()
+        # Experiments with data points not yet in the result CSV files (benchmark -> set of experiment names)
+        self.csv_pending = dict()
         os.system("mkdir -p " + self.experiment_directory)
 
     def create_new_experiment(self, experiment_name):
@@ -119,6 +126,20 @@ class DataManager:
         if experiment_name not in self.experiments.keys():
             self.experiments[experiment_name] = Experiment(experiment_name)
 
+    def add_experiment(self, experiment):
+        """
+        Adds an experiment collected by another DataManager
+        (e.g. by the worker of a shard)
+        :param experiment: class Experiment
+        :return: None
+        """
+        if self.is_experiment_present(experiment.name):
+            raise ValueError("The experiment " + experiment.name + " is already present")
+        self.experiments[experiment.name] = experiment
+        for benchmark in experiment.get_benchmarks():
+            if experiment.get_data_points(benchmark):
+                self.csv_pending.setdefault(benchmark, set()).add(experiment.name)
+
     def add_metadata(self, experiment_name, metadata):
         """
         Add metadata to the experiment data.
@@ -154,6 +175,31 @@ class DataManager:
         if experiment_name in self.experiments.keys():
             self.experiments[experiment_name].add_benchmark(benchmark_name)
 
+    def add_aliases(self, experiment_name, aliases):
+        """
+        Registers other experiments that share the results of an experiment
+        (e.g. experiments with identical heat templates).
+        The data points added to the experiment are added to its aliases too.
+
+        :param experiment_name: name of the experiment actually executed
+        :param aliases: list of names of experiments already declared
+        :return: None
+        """
+        if not self.is_experiment_present(experiment_name):
+            raise ValueError("The provided experiment name has not been founded")
+        for alias in aliases:
+            if not self.is_experiment_present(alias):
+                raise ValueError("The provided experiment name has not been founded")
+            self.aliases.setdefault(experiment_name, list()).append(alias)
+
+    def get_aliases(self, experiment_name):
+        """
+        Returns the experiments sharing the results of an experiment
+        :param experiment_name: name of the experiment
+        :return: list
+        """
+        return self.aliases.get(experiment_name, list())
+
     def add_data_points(self, experiment_name, benchmark, data_points):
         """
         Add one or more data points to an experiment
@@ -164,12 +210,16 @@ class DataManager:
         """
         if not self.is_benchmark_present(experiment_name, benchmark):
             raise ValueError("Experiment or benchmark not previously declared")
-        if isinstance(data_points, list):
-            for data_point in data_points:
-                if isinstance(data_point, dict):
-                    self.experiments[experiment_name].add_data_point(benchmark, data_point)
-        elif isinstance(data_points, dict):
-            self.experiments[experiment_name].add_data_point(benchmark, data_points)
+        for name in [experiment_name] + self.get_aliases(experiment_name):
+            if not self.is_benchmark_present(name, benchmark):
+                continue
+            if isinstance(data_points, list):
+                for data_point in data_points:
+                    if isinstance(data_point, dict):
+                        self.experiments[name].add_data_point(benchmark, dict(data_point))
+            elif isinstance(data_points, dict):
+                self.experiments[name].add_data_point(benchmark, dict(data_points))
+            self.csv_pending.setdefault(benchmark, set()).add(name)
 
     def get_metadata(self, experiment_name):
         """
@@ -218,7 +268,7 @@ class DataManager:
         metadata = dict()
         metadata['location'] = json_file
         self.add_metadata(experiment_name, metadata)
-        with open(json_file, 'a') as outfile:
+        with open(json_file, 'w') as outfile:
             json.dump(self.experiments[experiment_name].get_metadata(), outfile)
         # Store also the data points for the experiment into a csv
         self.write_experiment_csv_file(experiment_name, None)
@@ -241,6 +291,50 @@ class DataManager:
                     for row in self._get_data_for_csv(self.experiments[experiment_name], benchmark, titles):
                         metadata.writerow(row)
 
+    def append_result_csv_file(self):
+        """
+        Appends to the CSV files with the results of all the experiments the data points added since the last call.
+        Only the experiments which received data points are visited.
+        The columns of each file are kept as long as they include all the keys of the new data points, otherwise the
+        file is rewritten with the new columns at the end.
+        The final content of the files is given by generate_result_csv_file, which orders the columns as usual.
+        :return: None
+        """
+        pending = self.csv_pending
+        self.csv_pending = dict()
+        for benchmark in sorted(pending.keys()):
+            new_rows = list()
+            for experiment_name in sorted(pending[benchmark]):
+                data_points = self.experiments[experiment_name].get_data_points(benchmark)
+                written = self.csv_rows.get((experiment_name, benchmark), 0)
+                if len(data_points) > written:
+                    new_rows.append((self.experiments[experiment_name], data_points[written:]))
+                    self.csv_rows[(experiment_name, benchmark)] = len(data_points)
+            if not new_rows:
+                continue
+            titles = list(self.csv_titles.get(benchmark, list()))
+            for experiment, data_points in new_rows:
+                for key in experiment.get_configuration().keys() + [key for dp in data_points for key in dp.keys()]:
+                    if key not in titles:
+                        titles.append(key)
+
+            res_file = self.experiment_directory + '/results_' + benchmark + '.csv'
+            if benchmark in self.csv_titles and len(titles) == len(self.csv_titles[benchmark]):
+                with open(res_file, 'ab') as csvfile:
+                    metadata = csv.writer(csvfile, delimiter=';', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+                    for experiment, data_points in new_rows:
+                        for dp in data_points:
+                            metadata.writerow(DataManager._get_row(experiment, dp, titles))
+                continue
+            # New file or new columns
+            self.csv_titles[benchmark] = titles
+            with open(res_file, 'wb') as csvfile:
+                metadata = csv.writer(csvfile, delimiter=';', quotechar='|', quoting=csv.QUOTE_MINIMAL)
+                metadata.writerow(titles)
+                for experiment_name in self.experiments.keys():
+                    for row in self._get_data_for_csv(self.experiments[experiment_name], benchmark, titles):
+                        metadata.writerow(row)
+
     def get_all_benchmarks(self):
         benchmarks = set()
         for experiment in self.experiments.keys():
@@ -332,16 +426,28 @@ class DataManager:
         """
         rows = list()
         for dp in experiment.get_data_points(benchmark):
-            row = list()
-            for title in titles:
-                # First check in data point
-                if title in dp.keys():
-                    row.append(dp[title])
-                elif title in experiment.get_configuration().keys():
-                    row.append(experiment.get_configuration()[title])
-                elif title in experiment.get_metadata().keys():
-                    row.append(experiment.get_metadata()[title])
-                else:
-                    row.append('?')
-            rows.append(row)
-        return rows
\ No newline at end of file
+            rows.append(DataManager._get_row(experiment, dp, titles))
+        return rows
+
+    @staticmethod
+    def _get_row(experiment, dp, titles):
+        """
+        Return the row of a data point to be written on the CSV file (see _get_data_for_csv)
+
+        :param experiment: class Experiment
+        :param dp: data point (dict)
+        :param titles: list(string)
+        :return: list
+        """
+        row = list()
+        for title in titles:
+            # First check in data point
+            if title in dp.keys():
+                row.append(dp[title])
+            elif title in experiment.get_configuration().keys():
+                row.append(experiment.get_configuration()[title])
+            elif title in experiment.get_metadata().keys():
+                row.append(experiment.get_metadata()[title])
+            else:
+                row.append('?')
+        return row
\ No newline at end of file
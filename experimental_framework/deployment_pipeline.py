@@ -0,0 +1,158 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+"""
+Deployment of the upcoming experiments while the current one is measured
+"""
+
+import threading
+import time
+
+from experimental_framework import common
+
+
+class DeploymentPipeline:
+    """
+    Deploys in background the stacks of the next experiments of the schedule
+    so that the benchmarks can be executed back-to-back.
+    At most depth stacks are deployed ahead of the one in use, each with a
+    name which is unique within the pipeline.
+    """
+
+    def __init__(self, deployment_unit, template_dir, parameters, depth):
+        """
+        :param deployment_unit: DeploymentUnit used to deploy the stacks
+        :param template_dir: directory of the heat templates (type: str)
+        :param parameters: parameters of the heat templates (type: dict)
+        :param depth: number of stacks deployed ahead (type: int)
+        """
+        if depth < 1:
+            raise ValueError('The depth of the pipeline has to be positive')
+        self.deployment_unit = deployment_unit
+        self.template_dir = template_dir
+        self.parameters = parameters
+        self.depth = depth
+        self.pending = list()
+        self.deployments = list()
+        self.counter = 0
+        self.saved_time = dict()
+        self.waiting_time = 0.0
+
+    def set_schedule(self, template_file_names):
+        """
+        Sets the templates to be deployed, one for each deployment required
+        by the Benchmarking Unit, in order of execution
+        :param template_file_names: list of template file names
+        :return: None
+        """
+        self.pending = list(template_file_names)
+        self.fill()
+
+    def fill(self):
+        """
+        Starts the deployments of the next templates up to the depth of the
+        pipeline
+        :return: None
+        """
+        while self.pending and len(self.deployments) < self.depth:
+            template_file_name = self.pending.pop(0)
+            strings = template_file_name.split('.')
+            experiment_name = ".".join(strings[:(len(strings)-1)])
+            deployment = dict()
+            deployment['template'] = template_file_name
+            deployment['stack_name'] = experiment_name + '-' + str(self.counter)
+            deployment['deployed'] = False
+            deployment['duration'] = 0.0
+            deployment['thread'] = threading.Thread(
+                target=self.deploy, args=(deployment,))
+            deployment['thread'].daemon = True
+            self.counter += 1
+            self.deployments.append(deployment)
+            deployment['thread'].start()
+
+    def deploy(self, deployment):
+        """
+        Deploys the stack of a scheduled template (executed in background)
+        :param deployment: dict describing the deployment
+        :return: None
+        """
+        start = time.time()
+        try:
+            deployment['deployed'] = bool(
+                self.deployment_unit.deploy_heat_template(
+                    self.template_dir + deployment['template'],
+                    deployment['stack_name'], self.parameters))
+        except Exception as e:
+            common.LOG.info('Deployment of ' + deployment['stack_name'] +
+                            ' failed: ' + str(e))
+        deployment['duration'] = time.time() - start
+
+    def get_stack(self, template_file_name):
+        """
+        Returns the stack deployed for the next scheduled template, waiting
+        for its deployment to be completed
+        :param template_file_name: template required by the Benchmarking Unit
+                (it has to be the next one of the schedule)
+        :return: (name of the stack, True if the deployment is completed)
+        """
+        self.fill()
+        if not self.deployments or \
+                self.deployments[0]['template'] != template_file_name:
+            raise ValueError('The template ' + template_file_name +
+                             ' is not the next one of the pipeline')
+        deployment = self.deployments.pop(0)
+        start = time.time()
+        deployment['thread'].join()
+        waiting = time.time() - start
+        self.waiting_time += waiting
+        saved = max(0.0, deployment['duration'] - waiting)
+        self.saved_time[template_file_name] = \
+            self.saved_time.get(template_file_name, 0.0) + saved
+        common.LOG.info('Stack ' + deployment['stack_name'] +
+                        ' ready (' + str(round(saved, 1)) +
+                        ' s of deployment saved)')
+        self.fill()
+        return deployment['stack_name'], deployment['deployed']
+
+    def get_saved_time(self, template_file_name=None):
+        """
+        Returns the deployment time (seconds) which has been overlapped with
+        the execution of the previous experiments
+        :param template_file_name: template to be considered (None for all)
+        :return: type: float
+        """
+        if template_file_name is None:
+            return sum(self.saved_time.values())
+        return self.saved_time.get(template_file_name, 0.0)
+
+    def close(self):
+        """
+        Stops the pipeline, destroying the stacks deployed in advance
+        which have not been used
+        :return: None
+        """
+        self.pending = list()
+        for deployment in self.deployments:
+            deployment['thread'].join()
+            self.deployment_unit.destroy_heat_template(
+                deployment['stack_name'])
+        self.deployments = list()
+        common.LOG.info('Deployment pipeline: ' +
+                        str(round(self.get_saved_time(), 1)) +
+                        ' s of deployment saved, ' +
+                        str(round(self.waiting_time, 1)) +
+                        ' s waiting for the stacks')
@@ -16,10 +16,16 @@ __author__ = 'vmriccox'
 
 
 import os
+import threading
 import time
+from multiprocessing.pool import ThreadPool
 
 from experimental_framework import heat_manager
+from experimental_framework import neighbour_pool
+from experimental_framework import retry_policy
+from experimental_framework import stack_reaper
 from experimental_framework import common
+from experimental_framework.constants import framework_parameters as fp
 
 
 class DeploymentUnit:
@@ -28,94 +34,539 @@ class DeploymentUnit:
     the benchmark
     """
 
-    def __init__(self, openstack_credentials):
-        self.heat_manager = heat_manager.HeatManager(openstack_credentials)
+    def __init__(self, openstack_credentials, stack_timeout=None,
+                 validation_cache_file=None, policy=None):
+        self.heat_manager = heat_manager.HeatManager(openstack_credentials,
+                                                     validation_cache_file)
         self.deployed_stacks = list()
+        self.stack_timeout = stack_timeout
+        self.retry_policy = policy or retry_policy.RetryPolicy()
+        self.reaper = stack_reaper.StackReaper(self)
+        self.neighbour_pool = neighbour_pool.NeighbourPool(self)
+        self.timings = dict()
+        self.deletion_timings = list()
+        self.timing_lock = threading.Lock()
+
+    def reset_timings(self, stack_name):
+        """
+        Clears the timings of the deployment of a stack
+        :param stack_name: name of the stack (str)
+        :return: None
+        """
+        with self.timing_lock:
+            self.timings[stack_name] = dict()
+
+    def add_timing(self, stack_name, phase, value):
+        """
+        Adds a value (seconds or count) to a phase of the deployment of a stack
+        :param stack_name: name of the stack (str)
+        :param phase: name of the phase (str)
+        :param value: value to be added (float)
+        :return: None
+        """
+        with self.timing_lock:
+            timings = self.timings.setdefault(stack_name, dict())
+            timings[phase] = timings.get(phase, 0) + value
+
+    def get_timings(self, stack_name):
+        """
+        Returns the timings of the last deployment of a stack
+        :param stack_name: name of the stack (str)
+        :return: dict phase -> value
+        """
+        with self.timing_lock:
+            return dict(self.timings.get(stack_name, dict()))
+
+    def add_deletion_timing(self, stack_name, timings):
+        """
+        Records the timings of the deletion of a stack
+        :param stack_name: name of the stack (str)
+        :param timings: dict phase -> value
+        :return: None
+        """
+        with self.timing_lock:
+            self.deletion_timings.append((stack_name, timings))
+
+    def pop_deletion_timings(self):
+        """
+        Returns the timings of the deletions completed since the last call
+        :return: list of (stack name, dict phase -> value)
+        """
+        with self.timing_lock:
+            deletion_timings = self.deletion_timings
+            self.deletion_timings = list()
+            return deletion_timings
+
+    def wait_for_stacks(self, stack_names, in_progress_status, timeout=None):
+        """
+        Waits while the stacks are in a certain status (es. CREATE_IN_PROGRESS)
+        polling Heat with an increasing interval, up to the stack timeout.
+        The status of several stacks is obtained from a single list of the
+        stacks.
+        :param stack_names: names of the stacks to be watched (list of str)
+        :param in_progress_status: status to wait for the end of (str)
+        :param timeout: deadline of the wait in seconds, if shorter than the
+                stack timeout (float)
+        :return: dict stack name -> last status of the stack
+        """
+        def is_waiting(stack_name, state):
+            return bool(state[0] and in_progress_status in state[0])
+
+        states = self.poll_stacks(stack_names, is_waiting, in_progress_status,
+                                  timeout)
+        return dict([(stack_name, states[stack_name][0])
+                     for stack_name in states])
+
+    def wait_for_stack_actions(self, stack_names, action, previous_states,
+                               timeout=None, check_updated_time=False):
+        """
+        Waits for the completion of an action requested on several stacks
+        (e.g. UPDATE, SUSPEND).
+        Heat changes the status of a stack asynchronously, so right after
+        the request the stack can still show the status it had before. The
+        action is seen as started only when the status of the stack begins
+        with the action and, if the status before the request did as well
+        (or check_updated_time is True), when the update time of the stack
+        has changed.
+        :param stack_names: names of the stacks to be watched (list of str)
+        :param action: name of the action, as in the stack status (str)
+        :param previous_states: dict stack name -> (status, update time)
+                before the request of the action
+        :param timeout: deadline of the wait in seconds, if shorter than the
+                stack timeout (float)
+        :param check_updated_time: True if the update time of the stack
+                always changes with the action (bool)
+        :return: dict stack name -> last status of the stack, None if the
+                action has not been seen within the deadline
+        """
+        def is_started(stack_name, state):
+            if not state[0].startswith(action + '_'):
+                return False
+            previous_status, previous_time = \
+                previous_states.get(stack_name, (None, None))
+            if check_updated_time or \
+                    (previous_status or '').startswith(action + '_'):
+                return state[1] != previous_time
+            return True
+
+        def is_waiting(stack_name, state):
+            if not state[0] or state[0] == 'NOT_FOUND':
+                return False
+            if not is_started(stack_name, state):
+                return True
+            return 'IN_PROGRESS' in state[0]
+
+        states = self.poll_stacks(stack_names, is_waiting,
+                                  action + '_IN_PROGRESS', timeout)
+        statuses = dict()
+        for stack_name in states:
+            statuses[stack_name] = None
+            if states[stack_name][0] and \
+                    is_started(stack_name, states[stack_name]):
+                statuses[stack_name] = states[stack_name][0]
+        return statuses
+
+    def get_stack_states(self, stack_names):
+        """
+        Returns the status and the update time of several stacks
+        :param stack_names: names of the stacks (list of str)
+        :return: dict stack name -> (status, update time)
+        """
+        if len(stack_names) == 1:
+            return {stack_names[0]:
+                    self.heat_manager.check_stack_state(stack_names[0])}
+        return self.heat_manager.check_stacks_state(stack_names)
+
+    def poll_stacks(self, stack_names, is_waiting, description, timeout=None):
+        """
+        Polls the stacks with an increasing interval while is_waiting
+        returns True for any of them, up to the stack timeout
+        :param stack_names: names of the stacks to be watched (list of str)
+        :param is_waiting: function (stack name, (status, update time)) ->
+                True while the stack has to be waited for
+        :param description: what is waited for, for the log (str)
+        :param timeout: deadline of the wait in seconds, if shorter than the
+                stack timeout (float)
+        :return: dict stack name -> last (status, update time) of the stack
+        """
+        if not stack_names:
+            return dict()
+        stack_timeout = self.stack_timeout
+        if timeout is not None and \
+                (stack_timeout is None or timeout < stack_timeout):
+            stack_timeout = timeout
+        start = time.time()
+        interval = fp.STACK_POLL_INTERVAL
+        while True:
+            states = self.get_stack_states(stack_names)
+            waiting = [stack_name for stack_name in stack_names
+                       if is_waiting(stack_name, states[stack_name])]
+            if not waiting:
+                return states
+            elapsed = time.time() - start
+            if stack_timeout is not None and elapsed >= stack_timeout:
+                common.LOG.info('Timeout waiting for the stacks ' +
+                                ', '.join(waiting) + ' (' +
+                                description + ')')
+                return states
+            common.LOG.debug(str(states))
+            if stack_timeout is not None:
+                interval = min(interval, stack_timeout - elapsed)
+            time.sleep(interval)
+            interval = min(interval * fp.STACK_POLL_BACKOFF,
+                           fp.STACK_POLL_MAX_INTERVAL)
+
+    def wait_for_stack(self, stack_name, in_progress_status, timeout=None):
+        """
+        Waits while a stack is in a certain status (es. CREATE_IN_PROGRESS)
+        :param stack_name: name of the stack to be watched (str)
+        :param in_progress_status: status to wait for the end of (str)
+        :param timeout: deadline of the wait in seconds (float)
+        :return: last status of the stack (str)
+        """
+        return self.wait_for_stacks([stack_name], in_progress_status,
+                                    timeout)[stack_name]
+
+    def validate_heat_templates(self, template_files):
+        """
+        Validates several heat templates concurrently
+        :param template_files: full path file names of the heat templates
+        :return: dict template file -> error, for the invalid templates
+        """
+        if not template_files:
+            return dict()
+
+        def validate(template_file):
+            try:
+                self.heat_manager.validate_heat_template(template_file)
+                return None
+            except Exception as e:
+                return str(e) or e.__class__.__name__
+
+        errors = DeploymentUnit.run_concurrently(validate, template_files)
+        invalid = dict()
+        for i in range(0, len(template_files)):
+            if errors[i]:
+                invalid[template_files[i]] = errors[i]
+        return invalid
 
     def destroy_heat_template(self, stack_name):
         """
-        Destroys a stack
+        Destroys a stack. The deletion is completed in background by the
+        reaper, new stacks with the same name wait for it.
         :param stack_name: Stack of the name to be destroyed (sting)
         :return: None
         """
         try:
-            if self.heat_manager.check_stack_status(stack_name):
-                if stack_name in self.deployed_stacks:
-                    self.deployed_stacks.remove(stack_name)
-                self.heat_manager.delete_stack(stack_name)
-
-            status = self.heat_manager.check_stack_status(stack_name)
-            while status and 'DELETE_IN_PROGRESS' in status:
-                common.LOG.info(status)
-                time.sleep(1)
-                status = self.heat_manager.check_stack_status(stack_name)
+            if stack_name in self.deployed_stacks:
+                self.deployed_stacks.remove(stack_name)
+            self.reaper.destroy(stack_name)
             return True
-        except:
+        except Exception as e:
+            common.LOG.info('Deletion of stack ' + stack_name + ' failed: ' +
+                            str(e))
             return False
 
+    def destroy_heat_templates(self, stack_names):
+        """
+        Destroys several stacks concurrently (in background, see
+        destroy_heat_template)
+        :param stack_names: names of the stacks to be destroyed (list of str)
+        :return: None
+        """
+        for stack_name in stack_names:
+            self.destroy_heat_template(stack_name)
+
+    def suspend_heat_templates(self, stack_names):
+        """
+        Suspends several stacks concurrently and waits for the suspensions
+        :param stack_names: names of the stacks to be suspended (list of str)
+        :return: dict stack name -> True if the suspension is completed
+        """
+        return self.run_stack_action(stack_names,
+                                     self.heat_manager.suspend_stack,
+                                     'SUSPEND')
+
+    def resume_heat_templates(self, stack_names):
+        """
+        Resumes several suspended stacks concurrently and waits for them
+        :param stack_names: names of the stacks to be resumed (list of str)
+        :return: dict stack name -> True if the resume is completed
+        """
+        return self.run_stack_action(stack_names,
+                                     self.heat_manager.resume_stack,
+                                     'RESUME')
+
+    def run_stack_action(self, stack_names, request, action):
+        """
+        Requests an action on several stacks and waits for its completion
+        (with the deadline of the updates)
+        :param stack_names: names of the stacks (list of str)
+        :param request: function requesting the action on a stack
+        :param action: name of the action, as in the stack status (str)
+        :return: dict stack name -> True if the action is completed
+        """
+        if not stack_names:
+            return dict()
+
+        def request_action(stack_name):
+            try:
+                return request(stack_name)
+            except Exception as e:
+                common.LOG.info(action.capitalize() + ' of stack ' +
+                                stack_name + ' failed: ' + str(e))
+                return False
+
+        previous_states = self.get_stack_states(stack_names)
+        requested = DeploymentUnit.run_concurrently(request_action,
+                                                    stack_names)
+        statuses = self.wait_for_stack_actions(
+            [stack_names[i] for i in range(0, len(stack_names))
+             if requested[i]], action, previous_states,
+            self.retry_policy.get_deadline('update'))
+        completed = dict()
+        for stack_name in stack_names:
+            completed[stack_name] = \
+                statuses.get(stack_name) == action + '_COMPLETE'
+        return completed
+
     def destroy_all_deployed_stacks(self):
         """
-        Destroys all the stacks currently deployed
+        Destroys all the stacks currently deployed and waits for all the
+        deletions still in progress
         :return: None
         """
-        for stack in self.deployed_stacks:
+        for stack in list(self.deployed_stacks):
             if self.heat_manager.is_stack_deployed(stack):
                 self.destroy_heat_template(stack)
+        self.reaper.drain()
 
-    def deploy_heat_template(self, template_file, stack_name, parameters,
-                             attempt=0):
+    def deploy_heat_template(self, template_file, stack_name, parameters):
         """
-        Deploys a heat template and in case of failure retries 3 times
+        Deploys a heat template and in case of failure retries according to
+        the retry policy (delay between the attempts, deadline of the
+        creation, fatal errors, circuit breaker on the template)
         :param template_file: full path file name of the heat template
         :param stack_name: name of the stack to deploy
         :param parameters: parameters to be given to the heat template
-        :param attempt: number of current attempt
         :return: returns True in case the creation is completed
                  returns False in case the creation is failed
         """
-        MAX_RETRY = 3
-
         if not os.path.isfile(template_file):
             raise ValueError('The specified file does not exist ("' +
                              template_file + '")')
 
+        self.reset_timings(stack_name)
+        policy = self.retry_policy
+        if policy.is_open(template_file):
+            common.LOG.info('Template ' + template_file + ' skipped after ' +
+                            'repeated failures')
+            policy.record(template_file, 'skipped')
+            self.add_timing(stack_name, 'skipped', 1)
+            return False
+
+        start = common.get_time()
         self.heat_manager.validate_heat_template(template_file)
+        self.add_timing(stack_name, 'validate_time', common.get_time() - start)
 
-        try:
-            self.heat_manager.create_stack(template_file, stack_name,
-                                           parameters)
-            deployed = True
-        except Exception as e:
-            deployed = False
+        for attempt in range(0, policy.max_retries + 1):
+            if attempt > 0:
+                delay = policy.get_delay(attempt)
+                policy.record(template_file, 'retries')
+                self.add_timing(stack_name, 'retries', 1)
+                self.add_timing(stack_name, 'retry_delay_time', delay)
+                time.sleep(delay)
+            policy.record(template_file, 'attempts')
+
+            start = common.get_time()
+            self.reaper.wait_for([stack_name])
+            self.add_timing(stack_name, 'collision_wait_time',
+                            common.get_time() - start)
 
-        # TODO: Ho commentato questo ma devo verificare che cosi' funziona bene
-        # if deployed and 'COMPLETE' in \
-        #         self.heat_manager.check_stack_status(stack_name):
-        if not deployed and 'COMPLETE' in \
-                self.heat_manager.check_stack_status(stack_name):
+            start = common.get_time()
+            error = None
             try:
-                self.destroy_heat_template(stack_name)
-            except:
-                pass
-
-        status = self.heat_manager.check_stack_status(stack_name)
-        while status and 'CREATE_IN_PROGRESS' in status:
-            time.sleep(1)
-            status = self.heat_manager.check_stack_status(stack_name)
-        if status and ('FAILED' in status or 'NOT_FOUND' in status):
-            if attempt < MAX_RETRY:
-                attempt += 1
-                try:
-                    self.destroy_heat_template(stack_name)
-                except:
-                    pass
-                return self.deploy_heat_template(template_file, stack_name, parameters, attempt)
-            else:
-                try:
+                self.heat_manager.create_stack(template_file, stack_name,
+                                               parameters)
+            except Exception as e:
+                error = e
+            self.add_timing(stack_name, 'create_time', common.get_time() - start)
+
+            if error:
+                common.LOG.info('Creation of stack ' + stack_name +
+                                ' failed: ' + str(error))
+                if getattr(error, 'code', None) == 401:
+                    self.heat_manager.reset_authentication()
+                if not policy.is_retryable(error):
+                    policy.record(template_file, 'fatal_errors')
+                    self.add_timing(stack_name, 'fatal_errors', 1)
+                    break
+                # A stack with the same name can be left by a previous run
+                if 'COMPLETE' in \
+                        self.heat_manager.check_stack_status(stack_name):
+                    start = common.get_time()
                     self.destroy_heat_template(stack_name)
-                finally:
-                    return False
-        if self.heat_manager.check_stack_status(stack_name) and \
-                        'COMPLETE' in self.heat_manager.check_stack_status(stack_name):
-            self.deployed_stacks.append(stack_name)
-            return True
\ No newline at end of file
+                    self.reaper.wait_for([stack_name])
+                    self.add_timing(stack_name, 'cleanup_time',
+                                    common.get_time() - start)
+                continue
+
+            start = common.get_time()
+            status = self.wait_for_stack(stack_name, 'CREATE_IN_PROGRESS',
+                                         policy.get_deadline('create'))
+            self.add_timing(stack_name, 'create_wait_time',
+                            common.get_time() - start)
+            if status and 'CREATE_COMPLETE' in status:
+                policy.record(template_file, 'successes')
+                self.deployed_stacks.append(stack_name)
+                return True
+            if status and 'IN_PROGRESS' in status:
+                policy.record(template_file, 'timeouts')
+                self.add_timing(stack_name, 'timeouts', 1)
+            common.LOG.info('Creation of stack ' + stack_name + ' ended ' +
+                            'with status ' + str(status))
+            self.destroy_heat_template(stack_name)
+
+        policy.record(template_file, 'failures')
+        self.destroy_heat_template(stack_name)
+        return False
+
+    def deploy_heat_templates(self, template_file, stack_names, parameters):
+        """
+        Deploys several stacks from the same heat template concurrently.
+        The creation requests are sent through a bounded pool of threads and
+        the status of all the stacks is watched by a single polling loop.
+        The stacks which fail are deployed again one by one with retries.
+        :param template_file: full path file name of the heat template
+        :param stack_names: names of the stacks to deploy (list of str)
+        :param parameters: parameters to be given to the heat template
+        :return: dict stack name -> True if the creation is completed
+        """
+        if not stack_names:
+            return dict()
+        if not os.path.isfile(template_file):
+            raise ValueError('The specified file does not exist ("' +
+                             template_file + '")')
+        self.heat_manager.validate_heat_template(template_file)
+        self.reaper.wait_for(stack_names)
+
+        def create_stack(stack_name):
+            try:
+                self.heat_manager.create_stack(template_file, stack_name,
+                                               parameters)
+                return True
+            except Exception as e:
+                common.LOG.info('Creation of stack ' + stack_name +
+                                ' failed: ' + str(e))
+                return False
+
+        created = DeploymentUnit.run_concurrently(create_stack, stack_names)
+        statuses = self.wait_for_stacks(
+            [stack_names[i] for i in range(0, len(stack_names))
+             if created[i]], 'CREATE_IN_PROGRESS',
+            self.retry_policy.get_deadline('create'))
+
+        deployed = dict()
+        for stack_name in stack_names:
+            status = statuses.get(stack_name)
+            if status and 'CREATE_COMPLETE' in status:
+                self.deployed_stacks.append(stack_name)
+                deployed[stack_name] = True
+                continue
+            # Fallback to the deployment with retries
+            self.destroy_heat_template(stack_name)
+            deployed[stack_name] = bool(self.deploy_heat_template(
+                template_file, stack_name, parameters))
+        return deployed
+
+    @staticmethod
+    def run_concurrently(function, arguments):
+        """
+        Calls a function on each argument through a bounded pool of threads
+        :param function: function to be called
+        :param arguments: list of arguments (one call per argument)
+        :return: list of the results (in the order of the arguments)
+        """
+        pool = ThreadPool(min(len(arguments), fp.MAX_PARALLEL_STACK_OPERATIONS))
+        try:
+            return pool.map(function, arguments)
+        finally:
+            pool.close()
+            pool.join()
+
+    def update_heat_template(self, template_file, stack_name, parameters):
+        """
+        Moves an existing stack to a new heat template through a Heat
+        stack-update. If the stack does not exist or the update fails, the
+        stack is deleted and created again from the template
+        :param template_file: full path file name of the heat template
+        :param stack_name: name of the stack to update
+        :param parameters: parameters to be given to the heat template
+        :return: returns True in case the update (or creation) is completed
+                 returns False otherwise
+        """
+        if not os.path.isfile(template_file):
+            raise ValueError('The specified file does not exist ("' +
+                             template_file + '")')
+        self.heat_manager.init_heat()
+        self.reset_timings(stack_name)
+        start = common.get_time()
+        self.reaper.wait_for([stack_name])
+        self.add_timing(stack_name, 'collision_wait_time',
+                        common.get_time() - start)
+        previous_state = self.heat_manager.check_stack_state(stack_name)
+        status = previous_state[0]
+        if not status or 'COMPLETE' not in status or \
+                'DELETE' in status:
+            return self.redeploy_heat_template(template_file, stack_name,
+                                               parameters)
+
+        start = common.get_time()
+        self.heat_manager.validate_heat_template(template_file)
+        self.add_timing(stack_name, 'validate_time', common.get_time() - start)
+        start = common.get_time()
+        try:
+            updated = self.heat_manager.update_stack(template_file,
+                                                     stack_name, parameters)
+        except Exception as e:
+            common.LOG.info('Update of stack ' + stack_name + ' failed: ' +
+                            str(e))
+            updated = False
+        self.add_timing(stack_name, 'update_time', common.get_time() - start)
+
+        if updated:
+            start = common.get_time()
+            # The status before the update can still be reported (even
+            # UPDATE_COMPLETE after a previous update)
+            status = self.wait_for_stack_actions(
+                [stack_name], 'UPDATE', {stack_name: previous_state},
+                self.retry_policy.get_deadline('update'), True)[stack_name]
+            self.add_timing(stack_name, 'update_wait_time',
+                            common.get_time() - start)
+            if status == 'UPDATE_COMPLETE':
+                if stack_name not in self.deployed_stacks:
+                    self.deployed_stacks.append(stack_name)
+                return True
+
+        # Fallback to the full delete and create
+        common.LOG.info('Stack ' + stack_name + ' cannot be updated, it will '
+                        'be deleted and created again')
+        return self.redeploy_heat_template(template_file, stack_name,
+                                           parameters)
+
+    def redeploy_heat_template(self, template_file, stack_name, parameters):
+        """
+        Deletes a stack and creates it again, keeping the timings recorded
+        so far for the stack
+        :param template_file: full path file name of the heat template
+        :param stack_name: name of the stack
+        :param parameters: parameters to be given to the heat template
+        :return: True in case the creation is completed
+        """
+        timings = self.get_timings(stack_name)
+        self.destroy_heat_template(stack_name)
+        deployed = self.deploy_heat_template(template_file, stack_name,
+                                             parameters)
+        for phase in timings:
+            self.add_timing(stack_name, phase, timings[phase])
+        return deployed
@@ -0,0 +1,183 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+"""
+Design of experiments: selection of the subset of the configuration space
+to be benchmarked.
+The configurations are identified by their index (starting from 0) in the
+full factorial enumeration, where the first variable changes slowest.
+"""
+
+import itertools
+import math
+import random
+
+from experimental_framework.constants import framework_parameters as fp
+
+
+def get_index(radices, digits):
+    """
+    Returns the index of a configuration in the full factorial enumeration
+    :param radices: number of values of each variable (type: list of int)
+    :param digits: index of the value of each variable (type: list of int)
+    :return: type: int
+    """
+    index = 0
+    for position in range(0, len(radices)):
+        index = index * radices[position] + digits[position]
+    return index
+
+
+def get_digits(radices, index):
+    """
+    Returns the index of the value of each variable for a configuration
+    :param radices: number of values of each variable (type: list of int)
+    :param index: index of the configuration in the full factorial
+            enumeration (type: int)
+    :return: type: list of int
+    """
+    digits = [0] * len(radices)
+    for position in range(len(radices) - 1, -1, -1):
+        index, digits[position] = divmod(index, radices[position])
+    return digits
+
+
+def get_number_of_configurations(radices):
+    """
+    Returns the number of configurations of the full factorial design
+    :param radices: number of values of each variable (type: list of int)
+    :return: type: int
+    """
+    total = 1
+    for radix in radices:
+        total *= radix
+    return total
+
+
+def random_design(radices, samples, seed=None):
+    """
+    Random sampling (without repetitions) of the configuration space
+    :param radices: number of values of each variable (type: list of int)
+    :param samples: number of configurations to select (type: int)
+    :param seed: seed of the random generator (type: int)
+    :return: sorted list of indexes (type: list of int)
+    """
+    generator = random.Random(seed)
+    total = get_number_of_configurations(radices)
+    if samples >= total:
+        return range(0, total)
+    if samples * 2 > total:
+        return sorted(generator.sample(xrange(total), samples))
+    indexes = set()
+    while len(indexes) < samples:
+        digits = [generator.randrange(radix) for radix in radices]
+        indexes.add(get_index(radices, digits))
+    return sorted(indexes)
+
+
+def latin_hypercube_design(radices, samples, seed=None):
+    """
+    Latin hypercube sampling of the configuration space.
+    The range of each variable is divided in as many strata as samples and
+    each stratum is used exactly once. Samples mapped to the same
+    configuration are returned only once.
+    :param radices: number of values of each variable (type: list of int)
+    :param samples: number of samples (type: int)
+    :param seed: seed of the random generator (type: int)
+    :return: sorted list of indexes (type: list of int)
+    """
+    generator = random.Random(seed)
+    strata = list()
+    for radix in radices:
+        permutation = range(0, samples)
+        generator.shuffle(permutation)
+        strata.append(permutation)
+    indexes = set()
+    for sample in range(0, samples):
+        digits = list()
+        for position in range(0, len(radices)):
+            point = (strata[position][sample] + generator.random()) / samples
+            digits.append(min(int(point * radices[position]),
+                              radices[position] - 1))
+        indexes.add(get_index(radices, digits))
+    return sorted(indexes)
+
+
+def fractional_factorial_design(radices, samples=None):
+    """
+    Two level fractional factorial design (2^(k-p)).
+    Only the first and the last value of each variable are used. The first
+    factors are combined in a full factorial design, while the remaining
+    ones are aliased to the interactions of the first ones (highest order
+    interactions first).
+    :param radices: number of values of each variable (type: list of int)
+    :param samples: minimum number of runs (type: int)
+    :return: sorted list of indexes (type: list of int)
+    """
+    factors = [position for position in range(0, len(radices))
+               if radices[position] > 1]
+    base_factors = 0
+    while 2 ** base_factors - 1 < len(factors):
+        base_factors += 1
+    if samples and samples > 1:
+        base_factors = max(base_factors,
+                           int(math.ceil(math.log(samples, 2))))
+    base_factors = min(base_factors, len(factors))
+
+    # Interactions of the base factors used as generators of the others
+    generators = list()
+    for order in range(base_factors, 1, -1):
+        for columns in itertools.combinations(range(0, base_factors), order):
+            generators.append(columns)
+
+    indexes = set()
+    for run in range(0, 2 ** base_factors):
+        levels = [(run >> column) & 1 for column in range(0, base_factors)]
+        for columns in generators[:len(factors) - base_factors]:
+            level = 0
+            for column in columns:
+                level ^= levels[column]
+            levels.append(level)
+        digits = [0] * len(radices)
+        for factor in range(0, len(factors)):
+            position = factors[factor]
+            digits[position] = levels[factor] * (radices[position] - 1)
+        indexes.add(get_index(radices, digits))
+    return sorted(indexes)
+
+
+def get_design_indexes(design, radices, samples=None, seed=None):
+    """
+    Returns the indexes of the configurations selected by a design
+    :param design: one of fp.get_supported_designs() (type: str)
+    :param radices: number of values of each variable (type: list of int)
+    :param samples: number of samples for the sampling designs (type: int)
+    :param seed: seed of the random generator (type: int)
+    :return: sorted list of indexes (type: list of int)
+    """
+    if design == fp.DESIGN_FULL_FACTORIAL:
+        return range(0, get_number_of_configurations(radices))
+    if design == fp.DESIGN_FRACTIONAL_FACTORIAL:
+        return fractional_factorial_design(radices, samples)
+    if not samples or samples < 1:
+        raise ValueError('The design "' + design + '" requires a positive '
+                         'number of samples')
+    if design == fp.DESIGN_LATIN_HYPERCUBE:
+        return latin_hypercube_design(radices, samples, seed)
+    if design == fp.DESIGN_RANDOM:
+        return random_design(radices, samples, seed)
+    raise ValueError('The design "' + str(design) + '" is not supported')
@@ -0,0 +1,141 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+"""
+Scheduling of the experiments to be executed by the Benchmarking Unit
+"""
+
+from experimental_framework import common
+from experimental_framework.constants import framework_parameters as fp
+
+
+class ExperimentScheduler:
+    """
+    Decides the order in which the experiments are executed.
+    The cost of an experiment is the sum of the costs of the values assumed
+    by its configuration variables (@costs annotation in the configuration
+    file).
+    """
+
+    def __init__(self, costs=None, policy=fp.SCHEDULING_DEFAULT,
+                 budget=None):
+        """
+        :param costs: dictionary variable -> dictionary value -> cost
+                (type: dict)
+        :param policy: one of fp.get_supported_scheduling_policies()
+                (type: str)
+        :param budget: maximum cumulative cost of the scheduled experiments
+                over all the iterations of the run (None means no limit)
+                (type: float)
+        """
+        if not policy:
+            policy = fp.SCHEDULING_DEFAULT
+        if policy not in fp.get_supported_scheduling_policies():
+            raise ValueError('The scheduling policy "' + str(policy) +
+                             '" is not supported')
+        self.costs = costs or dict()
+        self.policy = policy
+        self.budget = budget
+
+    def get_cost(self, configuration):
+        """
+        Returns the cumulative cost of a configuration
+        :param configuration: dictionary variable -> value (type: dict)
+        :return: type: float
+        """
+        cost = 0.0
+        for variable in configuration:
+            if variable in self.costs:
+                cost += self.costs[variable].get(configuration[variable], 0.0)
+        return cost
+
+    def schedule(self, experiments, iterations=1):
+        """
+        Returns the experiments in the order in which they have to be
+        executed. Every iteration of an experiment is charged on the budget,
+        the experiments that would exceed it are discarded.
+        Experiments with the same cost keep their original order.
+        :param experiments: list of (template file name, configuration)
+        :param iterations: number of executions of each experiment (int)
+        :return: list of (template file name, cost)
+        """
+        scheduled = [(template, self.get_cost(configuration))
+                     for template, configuration in experiments]
+        if self.policy == fp.SCHEDULING_MINIMUM_CHANGE:
+            ranks = ExperimentScheduler.get_gray_code_ranks(
+                [configuration for template, configuration in experiments])
+            order = sorted(range(0, len(scheduled)),
+                           key=lambda index: ranks[index])
+            scheduled = [scheduled[index] for index in order]
+        elif self.policy == fp.SCHEDULING_CHEAPEST_FIRST:
+            scheduled.sort(key=lambda experiment: experiment[1])
+        elif self.policy == fp.SCHEDULING_MOST_EXPENSIVE_FIRST:
+            scheduled.sort(key=lambda experiment: experiment[1],
+                           reverse=True)
+
+        if self.budget is None:
+            return scheduled
+        ret_val = list()
+        total_cost = 0.0
+        for template, cost in scheduled:
+            if total_cost + cost * iterations > self.budget:
+                common.LOG.info('Experiment ' + template + ' skipped: cost ' +
+                                str(cost) + ' (' + str(iterations) +
+                                ' iterations) exceeds the remaining budget')
+                continue
+            total_cost += cost * iterations
+            ret_val.append((template, cost))
+        return ret_val
+
+    @staticmethod
+    def get_gray_code_ranks(configurations):
+        """
+        Returns the position of each configuration in a reflected mixed radix
+        Gray code walk over the configuration space.
+        Consecutive configurations of the walk differ in the value of one
+        variable only, so executing the experiments in this order minimizes
+        the changes between consecutive deployments.
+        :param configurations: list of dictionaries variable -> value
+        :return: list of int (one rank per configuration)
+        """
+        variables = set()
+        for configuration in configurations:
+            variables.update(configuration.keys())
+        variables = sorted(variables)
+
+        # Values are numbered in order of appearance
+        value_indexes = dict([(variable, dict()) for variable in variables])
+        for configuration in configurations:
+            for variable in variables:
+                value = configuration.get(variable)
+                if value not in value_indexes[variable]:
+                    value_indexes[variable][value] = \
+                        len(value_indexes[variable])
+
+        ranks = list()
+        for configuration in configurations:
+            rank = 0
+            for variable in variables:
+                radix = len(value_indexes[variable])
+                digit = value_indexes[variable][configuration.get(variable)]
+                # The direction of a digit is reversed every time the
+                # prefix of the walk moves by one step
+                if rank % 2 == 1:
+                    digit = radix - 1 - digit
+                rank = rank * radix + digit
+            ranks.append(rank)
+        return ranks
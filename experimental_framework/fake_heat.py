@@ -0,0 +1,233 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+"""
+In-process replacement of the Heat service, keeping the stacks in memory.
+It allows to run the framework without OpenStack (e.g. to measure the
+overhead of the orchestration or to compare scheduling strategies).
+"""
+
+import random
+import threading
+import time
+import uuid
+
+from heatclient import exc as heatExc
+
+from experimental_framework.constants import framework_parameters as fp
+
+
+class FakeStack(object):
+    """
+    Stack kept in memory, with the same attributes used by the framework
+    on the stacks returned by the heat client
+    """
+
+    def __init__(self, stack_name):
+        self.id = str(uuid.uuid4())
+        self.stack_name = stack_name
+        self.stack_status = None
+        self.final_status = None
+        self.completion_time = 0
+        self.updated_time = None
+
+    def start(self, action, latency, failed):
+        """
+        Starts an action on the stack, which will be completed after the
+        given latency
+        :param action: CREATE, UPDATE or DELETE (str)
+        :param latency: duration of the action in seconds (float)
+        :param failed: True if the action has to fail (bool)
+        :return: None
+        """
+        self.stack_status = action + '_IN_PROGRESS'
+        if action != 'CREATE':
+            self.updated_time = time.time()
+        self.final_status = action + ('_FAILED' if failed else '_COMPLETE')
+        self.completion_time = time.time() + latency
+
+    def refresh(self):
+        """
+        Completes the action in progress if its latency is elapsed
+        :return: None
+        """
+        if self.final_status and time.time() >= self.completion_time:
+            self.stack_status = self.final_status
+            self.final_status = None
+
+
+class FakeStackManager:
+    """
+    Implements the operations of the stack manager of the heat client used
+    by the framework (create, update, delete, get, list, validate)
+    """
+
+    def __init__(self, latencies=None, distribution=fp.FAKE_HEAT_CONSTANT,
+                 failure_rate=0.0, seed=None):
+        """
+        :param latencies: dict action -> average latency in seconds
+                (type: dict)
+        :param distribution: one of fp.get_supported_fake_heat_distributions
+                (type: str)
+        :param failure_rate: probability of an action to fail (type: float)
+        :param seed: seed of the random generator (type: int)
+        """
+        if distribution not in fp.get_supported_fake_heat_distributions():
+            raise ValueError('The latency distribution "' +
+                             str(distribution) + '" is not supported')
+        self.latencies = latencies or dict()
+        self.distribution = distribution
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stacks = list()
+
+    def get_latency(self, action):
+        """
+        Returns a random latency for an action according to the distribution
+        :param action: CREATE, UPDATE or DELETE (str)
+        :return: type: float
+        """
+        mean = self.latencies.get(action, 0.0)
+        if mean <= 0:
+            return 0.0
+        if self.distribution == fp.FAKE_HEAT_UNIFORM:
+            return self.random.uniform(0, 2 * mean)
+        if self.distribution == fp.FAKE_HEAT_EXPONENTIAL:
+            return self.random.expovariate(1.0 / mean)
+        return mean
+
+    def start(self, stack, action):
+        stack.start(action, self.get_latency(action),
+                    self.random.random() < self.failure_rate)
+
+    def find(self, stack_id):
+        """
+        Returns a stack by ID or name (deleted stacks only by ID)
+        :param stack_id: ID or name of the stack (str)
+        :return: FakeStack or None
+        """
+        for stack in self.stacks:
+            stack.refresh()
+        for stack in self.stacks:
+            if stack.id == stack_id:
+                return stack
+        for stack in self.stacks:
+            if stack.stack_name == stack_id and \
+                    stack.stack_status != 'DELETE_COMPLETE':
+                return stack
+        return None
+
+    def list(self):
+        with self.lock:
+            for stack in self.stacks:
+                stack.refresh()
+            # The deleted stacks are forgotten, as Heat does not list them
+            self.stacks = [stack for stack in self.stacks
+                           if stack.stack_status != 'DELETE_COMPLETE']
+            return list(self.stacks)
+
+    def get(self, stack_id):
+        with self.lock:
+            stack = self.find(stack_id)
+            if not stack:
+                raise heatExc.HTTPNotFound('The Stack (' + str(stack_id) +
+                                           ') could not be found.')
+            return stack
+
+    def create(self, stack_name=None, files=None, template=None,
+               parameters=None):
+        with self.lock:
+            if self.find(stack_name):
+                raise heatExc.HTTPConflict('The Stack (' + str(stack_name) +
+                                           ') already exists.')
+            stack = FakeStack(stack_name)
+            self.start(stack, 'CREATE')
+            self.stacks.append(stack)
+            return {'stack': {'id': stack.id}}
+
+    def update(self, stack_id, files=None, template=None, parameters=None):
+        with self.lock:
+            stack = self.find(stack_id)
+            if not stack or stack.stack_status.startswith('DELETE'):
+                raise heatExc.HTTPNotFound('The Stack (' + str(stack_id) +
+                                           ') could not be found.')
+            if stack.final_status:
+                raise heatExc.HTTPConflict('The Stack (' + str(stack_id) +
+                                           ') has an action in progress.')
+            self.start(stack, 'UPDATE')
+
+    def delete(self, stack_id):
+        with self.lock:
+            stack = self.find(stack_id)
+            if not stack or stack.stack_status == 'DELETE_COMPLETE':
+                raise heatExc.HTTPNotFound('The Stack (' + str(stack_id) +
+                                           ') could not be found.')
+            self.start(stack, 'DELETE')
+
+    def action(self, stack_id, action):
+        """
+        Starts an action without changes of the template (suspend, resume)
+        :param stack_id: ID or name of the stack (str)
+        :param action: SUSPEND or RESUME (str)
+        :return: None
+        """
+        with self.lock:
+            stack = self.find(stack_id)
+            if not stack or stack.stack_status.startswith('DELETE'):
+                raise heatExc.HTTPNotFound('The Stack (' + str(stack_id) +
+                                           ') could not be found.')
+            if stack.final_status:
+                raise heatExc.HTTPConflict('The Stack (' + str(stack_id) +
+                                           ') has an action in progress.')
+            self.start(stack, action)
+
+    def validate(self, template=None):
+        if not template:
+            raise heatExc.HTTPBadRequest('The template is empty')
+        return {'Description': '', 'Parameters': dict()}
+
+
+class FakeActionManager:
+    """
+    Implements the actions of the heat client used by the framework
+    (suspend, resume)
+    """
+
+    def __init__(self, stacks):
+        """
+        :param stacks: FakeStackManager keeping the stacks
+        """
+        self.stacks = stacks
+
+    def suspend(self, stack_id):
+        self.stacks.action(stack_id, 'SUSPEND')
+
+    def resume(self, stack_id):
+        self.stacks.action(stack_id, 'RESUME')
+
+
+class FakeHeatClient:
+    """
+    Replacement of the heat client
+    """
+
+    def __init__(self, latencies=None, distribution=fp.FAKE_HEAT_CONSTANT,
+                 failure_rate=0.0, seed=None):
+        self.stacks = FakeStackManager(latencies, distribution, failure_rate,
+                                       seed)
+        self.actions = FakeActionManager(self.stacks)
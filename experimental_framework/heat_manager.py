@@ -15,16 +15,33 @@
 __author__ = 'vmriccox'
 
 
+import datetime
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+
 from keystoneclient.v2_0 import client as keystoneClient
+from keystoneclient import session as keystoneSession
 from heatclient import client as heatClient
+from heatclient import exc as heatExc
 from heatclient.common import template_utils
 
 from experimental_framework import common
+from experimental_framework import fake_heat
+from experimental_framework.constants import framework_parameters as fp
+
+# Seconds before the expiration of the token when it is refreshed
+TOKEN_REFRESH_MARGIN = 300
+# Lifetime assumed for tokens without expiration date (seconds)
+DEFAULT_TOKEN_LIFETIME = 3600
 
 
 class HeatManager:
 
-    def __init__(self, credentials):
+    def __init__(self, credentials, validation_cache_file=None):
         self.ip_controller = credentials['ip_controller']
         self.heat_url = credentials['heat_url']
         self.user = credentials['user']
@@ -32,21 +49,113 @@ class HeatManager:
         self.auth_uri = credentials['auth_uri']
         self.project_id = credentials['project']
         self.heat = None
+        self.stack_ids = dict()
+        self.backend = credentials.get('heat_backend', fp.HEAT_BACKEND_OPENSTACK)
+        self.fake_heat = None
+        if self.backend == fp.HEAT_BACKEND_FAKE:
+            latencies = dict()
+            latencies['CREATE'] = credentials.get('fake_create_latency') or 0.0
+            latencies['UPDATE'] = credentials.get('fake_update_latency') or 0.0
+            latencies['DELETE'] = credentials.get('fake_delete_latency') or 0.0
+            self.fake_heat = fake_heat.FakeHeatClient(
+                latencies,
+                credentials.get('fake_latency_distribution') or fp.FAKE_HEAT_CONSTANT,
+                credentials.get('fake_failure_rate') or 0.0,
+                credentials.get('fake_seed'))
+
+        # The authentication is shared by all the calls and refreshed only
+        # when the token is close to its expiration
+        self.session = keystoneSession.Session()
+        self.auth_token = None
+        self.token_expiration = 0
+        self.auth_lock = threading.Lock()
+        self.auth_count = 0
+        self.auth_time = 0.0
+
+        # Digests of the templates already validated, shared across the
+        # runs through the validation cache file (if any)
+        self.validation_cache_file = validation_cache_file
+        self.validated_templates = None
+        self.validation_lock = threading.Lock()
+        self.validation_count = 0
+        self.validation_hits = 0
 
         # TODO: verify that init_heat is useless in the constructor
         # self.init_heat()
 
     def init_heat(self):
+        """
+        Initializes the heat client.
+        The client and its token are reused until the token is close to its
+        expiration, then a new authentication is performed.
+        With the fake backend the in-memory client is used.
+        :return: None
+        """
+        with self.auth_lock:
+            if self.fake_heat:
+                self.heat = self.fake_heat
+                return
+            if self.heat and time.time() < \
+                    self.token_expiration - TOKEN_REFRESH_MARGIN:
+                return
+            self._authenticate()
+            self.heat = heatClient.Client('1', endpoint=self.heat_url,
+                                          token=self.auth_token)
+
+    def _authenticate(self):
+        """
+        Authenticates on keystone and stores the token and its expiration
+        :return: None
+        """
+        start = time.time()
         keystone = keystoneClient.Client(username=self.user, password=self.password,
-                                         tenant_name=self.project_id, auth_url=self.auth_uri)
-        auth_token = keystone.auth_token
-        self.heat = heatClient.Client('1', endpoint=self.heat_url, token=auth_token)
+                                         tenant_name=self.project_id, auth_url=self.auth_uri,
+                                         session=self.session)
+        self.auth_token = keystone.auth_token
+        self.auth_count += 1
+        self.auth_time += time.time() - start
+
+        lifetime = DEFAULT_TOKEN_LIFETIME
+        expires = getattr(keystone.auth_ref, 'expires', None)
+        if expires:
+            now = datetime.datetime.now(expires.tzinfo)
+            lifetime = (expires - now).total_seconds()
+        self.token_expiration = start + lifetime
+        common.LOG.debug('Keystone authentication completed, token valid '
+                         'for ' + str(int(lifetime)) + ' seconds')
+
+    def reset_authentication(self):
+        """
+        Forces a new authentication at the next call (e.g. if the token has
+        been revoked)
+        :return: None
+        """
+        with self.auth_lock:
+            self.token_expiration = 0
+
+    def get_auth_statistics(self):
+        """
+        Returns the counters of the keystone authentications
+        :return: dict with number of authentications, total and average
+                latency in seconds
+        """
+        statistics = dict()
+        statistics['auth_count'] = self.auth_count
+        statistics['auth_time'] = self.auth_time
+        statistics['auth_latency'] = 0.0
+        if self.auth_count:
+            statistics['auth_latency'] = self.auth_time / self.auth_count
+        return statistics
 
     def print_stacks(self, name=None):
-        for stack in self.heat.stacks.list():
-            if (name and stack.stack_name == name) or not name:
-                common.LOG.info("Stack Name: " + stack.stack_name)
-                common.LOG.info("Stack Status: " + stack.stack_status)
+        if name:
+            stack = self.get_stack(name)
+            stacks = [stack] if stack else []
+        else:
+            stacks = self.heat.stacks.list()
+        for stack in stacks:
+            common.LOG.info("Stack Name: " + stack.stack_name)
+            common.LOG.info("Stack Status: " + stack.stack_status)
 
     def create_stack(self, template_file, stack_name, parameters):
         self.init_heat()
@@ -57,15 +166,83 @@ class HeatManager:
             'template': template,
             'files': dict(list(tpl_files.items()))
         }
-        self.heat.stacks.create(stack_name=stack_name, files=fields['files'],
+        response = self.heat.stacks.create(stack_name=stack_name, files=fields['files'],
+                                           template=template, parameters=parameters)
+        try:
+            self.stack_ids[stack_name] = response['stack']['id']
+        except (KeyError, TypeError):
+            self.stack_ids.pop(stack_name, None)
+        self.print_stacks(stack_name)
+
+    def update_stack(self, template_file, stack_name, parameters):
+        """
+        Updates an existing stack with a new template
+        :param template_file: full path file name of the heat template
+        :param stack_name: name of the stack to update (type: str)
+        :param parameters: parameters to be given to the heat template
+        :return: True if the update has been requested, False if the stack
+                does not exist
+        """
+        tpl_files, template = template_utils.get_template_contents(template_file)
+        stack = self.get_stack(stack_name)
+        if not stack:
+            return False
+        self.heat.stacks.update(stack.id, files=dict(list(tpl_files.items())),
                                 template=template, parameters=parameters)
         self.print_stacks(stack_name)
+        return True
 
-    def is_stack_deployed(self, stack_name):
+    def suspend_stack(self, stack_name):
+        """
+        Suspends the resources of a stack (e.g. the VMs are stopped)
+        :param stack_name: name of the stack to suspend (type: str)
+        :return: True if the suspension has been requested, False if the
+                stack does not exist
+        """
+        stack = self.get_stack(stack_name)
+        if not stack:
+            return False
+        self.heat.actions.suspend(stack.id)
+        return True
+
+    def resume_stack(self, stack_name):
+        """
+        Resumes the resources of a suspended stack
+        :param stack_name: name of the stack to resume (type: str)
+        :return: True if the resume has been requested, False if the
+                stack does not exist
+        """
+        stack = self.get_stack(stack_name)
+        if not stack:
+            return False
+        self.heat.actions.resume(stack.id)
+        return True
+
+    def get_stack(self, stack_name):
+        """
+        Returns a stack looking it up by ID (if known) or by name, without
+        listing all the stacks of the tenant
+        :param stack_name: Name of the stack (type: str)
+        :return: the stack or None if it does not exist
+        """
         self.init_heat()
-        if stack_name in self.heat.stacks.list():
-            return True
-        return False
+        stack_id = self.stack_ids.get(stack_name, stack_name)
+        try:
+            stack = self.heat.stacks.get(stack_id)
+        except heatExc.HTTPNotFound:
+            stack = None
+        if stack and stack.stack_status != 'DELETE_COMPLETE':
+            self.stack_ids[stack_name] = stack.id
+            return stack
+        # Deleted stacks can still be retrieved by ID, while a new stack
+        # with the same name could have been created in the meanwhile
+        self.stack_ids.pop(stack_name, None)
+        if stack_id != stack_name:
+            return self.get_stack(stack_name)
+        return None
+
+    def is_stack_deployed(self, stack_name):
+        return self.check_stack_status(stack_name) != 'NOT_FOUND'
 
     def check_stack_status(self, stack_name):
         """
@@ -74,23 +251,157 @@ class HeatManager:
         :param stack_name: Name of the stack to be checked (type: str)
         :return: (type: str)
         """
-        for stack in self.heat.stacks.list():
-            if stack.stack_name == stack_name:
-                return stack.stack_status
+        stack = self.get_stack(stack_name)
+        if stack:
+            return stack.stack_status
         return 'NOT_FOUND'
 
+    def check_stacks_status(self, stack_names):
+        """
+        Returns the status of several stacks from a single list of the
+        stacks of the tenant
+        :param stack_names: Names of the stacks to be checked (type: list)
+        :return: dict stack name -> status (type: dict)
+        """
+        states = self.check_stacks_state(stack_names)
+        return dict([(stack_name, states[stack_name][0]) for stack_name in stack_names])
+
+    def check_stack_state(self, stack_name):
+        """
+        Returns the status of a stack and the time of its last update
+        (e.g. to recognize a new update of a stack already updated)
+        :param stack_name: Name of the stack to be checked (type: str)
+        :return: tuple (status, update time), ('NOT_FOUND', None) if the
+                stack does not exist
+        """
+        stack = self.get_stack(stack_name)
+        if stack:
+            return stack.stack_status, getattr(stack, 'updated_time', None)
+        return 'NOT_FOUND', None
+
+    def check_stacks_state(self, stack_names):
+        """
+        Returns the status and the time of the last update of several stacks
+        from a single list of the stacks of the tenant
+        :param stack_names: Names of the stacks to be checked (type: list)
+        :return: dict stack name -> tuple (status, update time) (type: dict)
+        """
+        self.init_heat()
+        states = dict([(stack_name, ('NOT_FOUND', None)) for stack_name in stack_names])
+        for stack in self.heat.stacks.list():
+            if stack.stack_name in states:
+                states[stack.stack_name] = (stack.stack_status, getattr(stack, 'updated_time', None))
+                self.stack_ids[stack.stack_name] = stack.id
+        return states
+
     def validate_heat_template(self, heat_template_file):
+        """
+        Validates a heat template through Heat. The templates already
+        validated (same content and same Heat endpoint) are not sent again.
+        :param heat_template_file: full path file name of the heat template
+        :return: None (raises ValueError if the template is not valid)
+        """
+        with open(heat_template_file, 'r') as template_file:
+            template = template_file.read()
+        digest = self.get_template_digest(template)
+        with self.validation_lock:
+            if digest in self.get_validated_templates():
+                self.validation_hits += 1
+                return
         self.init_heat()
-        if not self.heat.stacks.validate(template=open(heat_template_file, 'r').read()):
+        self.validation_count += 1
+        if not self.heat.stacks.validate(template=template):
             raise ValueError('The provided heat template "' + heat_template_file + '" is not in the correct format')
+        with self.validation_lock:
+            self.validated_templates[digest] = time.time()
+            self.store_validated_templates()
+
+    def get_template_digest(self, template):
+        """
+        Returns the key of a template in the validation cache
+        :param template: content of the template (type: str)
+        :return: SHA1 of the template and of the Heat endpoint (type: str)
+        """
+        sha = hashlib.sha1()
+        sha.update(self.backend + '\n' + self.heat_url + '\n')
+        sha.update(template)
+        return sha.hexdigest()
+
+    def get_validated_templates(self):
+        """
+        Returns the digests of the templates already validated, loading them
+        from the validation cache file the first time
+        :return: dict digest -> time of the validation (type: dict)
+        """
+        if self.validated_templates is None:
+            self.validated_templates = self.load_validated_templates()
+        return self.validated_templates
+
+    def load_validated_templates(self):
+        """
+        Reads the digests of the validated templates from the validation
+        cache file (if any)
+        :return: dict digest -> time of the validation (type: dict)
+        """
+        if not self.validation_cache_file or \
+                not os.path.isfile(self.validation_cache_file):
+            return dict()
+        try:
+            with open(self.validation_cache_file) as cache_file:
+                return json.load(cache_file)
+        except ValueError:
+            common.LOG.info('The validation cache ' + self.validation_cache_file +
+                            ' is corrupted and will be rebuilt')
+            return dict()
+
+    def store_validated_templates(self):
+        """
+        Writes the digests of the validated templates on the validation
+        cache file (if any).
+        The cache can be shared by several processes (shards): under the
+        lock of the cache the digests stored by the other processes since
+        the cache was loaded are merged before replacing the file.
+        :return: None
+        """
+        if not self.validation_cache_file:
+            return
+        with open(self.validation_cache_file + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                validated_templates = self.load_validated_templates()
+                validated_templates.update(self.validated_templates)
+                self.validated_templates = validated_templates
+                temp_file = self.validation_cache_file + '.' + str(os.getpid()) + '.tmp'
+                with open(temp_file, 'w') as cache_file:
+                    json.dump(self.validated_templates, cache_file)
+                os.rename(temp_file, self.validation_cache_file)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get_validation_statistics(self):
+        """
+        Returns the counters of the validations of the templates
+        :return: dict with number of validations sent to Heat and number of
+                validations found in the cache
+        """
+        statistics = dict()
+        statistics['validation_count'] = self.validation_count
+        statistics['validation_hits'] = self.validation_hits
+        return statistics
 
     def delete_stack(self, stack_name):
-        self.init_heat()
+        """
+        Requests the deletion of a stack
+        :param stack_name: name of the stack to delete (type: str)
+        :return: True if the deletion has been requested, False if the
+                stack does not exist (any other error is raised)
+        """
+        stack = self.get_stack(stack_name)
+        if not stack:
+            return False
         try:
-            for stack in self.heat.stacks.list():
-                if stack.stack_name == stack_name:
-                    self.heat.stacks.delete(stack.id)
-                    return True
-        except:
-            pass
-        return False
\ No newline at end of file
+            self.heat.stacks.delete(stack.id)
+        except heatExc.HTTPNotFound:
+            # Deleted in the meanwhile
+            return False
+        return True
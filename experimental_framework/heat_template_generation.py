@@ -19,199 +19,447 @@ __author__ = "vmriccox"
 Generation of the heat templates from the base template
 """
 
+import hashlib
 import json
 import os
 import shutil
 from experimental_framework import common
+from experimental_framework import experiment_design as design
+from experimental_framework import configuration_constraints as cc
 from experimental_framework.constants import framework_parameters as fp
 
 
-class TreeNode:
+template_name = fp.EXPERIMENT_TEMPLATE_NAME
+
+
+def get_configuration_variables(deployment_configuration):
     """
-    This class represent the node of the configuration tree.\
-    Each node represents a single configuration value for a single
-    configuration parameter.
+    Returns the variables of the deployment configuration and their values in
+    the order used to enumerate the configurations.
+    Variables without values are ignored.
+    :param deployment_configuration: dictionary of variables and list of
+            values (type: dict)
+    :return: names (type: list of str) and values (type: list of list)
     """
+    names = [variable for variable in deployment_configuration
+             if len(deployment_configuration[variable]) > 0]
+    values = [list(deployment_configuration[name]) for name in names]
+    return names, values
 
-    def __init__(self):
-        self.up = None
-        self.down = []
-        self.variable_name = ''
-        self.variable_value = 0
 
-    def add_child(self, node):
-        """
-        Adds a node as a child for the current node
-        :param node: node to be added as a child (type: TreeNode)
-        :return: None
-        """
-        node.up = self
-        self.down.append(node)
+def iter_configurations(deployment_configuration, constraints=None):
+    """
+    Enumerates lazily all the configurations of the deployment.
+    The configurations are numbered in lexicographic order of the positions
+    of their values: the variables are taken in the order of
+    get_configuration_variables and their values in the given order, with
+    the first variable changing slowest and the last one fastest.
+    Only one configuration at a time is kept in memory.
+    The partial configurations excluded by the constraints are never
+    expanded: their configurations are counted in constraints.pruned and
+    their experiment numbers are skipped.
+    :param deployment_configuration: dictionary of variables and list of
+            values (type: dict)
+    :param constraints: constraints to be applied (type: ConstraintSet)
+    :return: generator of (counter, configuration) where counter is the
+            number of the experiment starting from 1 (type: int) and
+            configuration is the dictionary variable -> value (type: dict)
+    """
+    names, values = get_configuration_variables(deployment_configuration)
+    checks = [list() for name in names]
+    if constraints:
+        checks = constraints.get_constraints_by_position(names)
+    # Number of configurations for each combination of the values of the
+    # variables up to a position (e.g. skipped when a constraint fails)
+    sizes = [1] * len(names)
+    for position in range(len(names) - 2, -1, -1):
+        sizes[position] = sizes[position + 1] * len(values[position + 1])
+
+    def move_to_next(position):
+        # Moves to the next value of the variable in the given position and
+        # returns the position of the first variable that has changed
+        while position >= 0:
+            indexes[position] += 1
+            if indexes[position] < len(values[position]):
+                break
+            indexes[position] = 0
+            position -= 1
+        return position
+
+    indexes = [0] * len(names)
+    configuration = dict()
+    counter = 1
+    position = 0
+    while position >= 0:
+        # Assign and validate the values of the variables that have changed
+        while 0 <= position < len(names):
+            configuration[names[position]] = \
+                values[position][indexes[position]]
+            excluded = False
+            for constraint in checks[position]:
+                if constraint.excludes(configuration):
+                    excluded = True
+                    break
+            if excluded:
+                constraints.pruned += sizes[position]
+                counter += sizes[position]
+                position = move_to_next(position)
+            else:
+                position += 1
+        if position < 0:
+            return
+        yield counter, dict(configuration)
+        counter += 1
 
-    def get_parent(self):
-        """
-        Returns the parent node of the current one
-        :return type: TreeNode
-        """
-        return self.up
+        # Move to the next configuration (the last variable changes faster)
+        position = move_to_next(len(names) - 1)
 
-    def get_children(self):
-        """
-        Returns the children of the current node
-        :return type: list of TreeNode
-        """
-        if len(self.down) == 0:
-            # return [self]
-            return []
-        return self.down
 
-    def get_variable_name(self):
-        """
-        Returns the name of the variable correspondent to the current node
-        :return type: str
-        """
-        return self.variable_name
+def iter_design_configurations(deployment_configuration, design_name,
+                               samples=None, seed=None, constraints=None):
+    """
+    Enumerates lazily the configurations selected by a design of experiments.
+    Each configuration keeps the experiment number it has in the full
+    factorial enumeration.
+    :param deployment_configuration: dictionary of variables and list of
+            values (type: dict)
+    :param design_name: one of fp.get_supported_designs() (type: str)
+    :param samples: number of samples for the sampling designs (type: int)
+    :param seed: seed of the random generator (type: int)
+    :param constraints: constraints to be applied (type: ConstraintSet)
+    :return: generator of (counter, configuration)
+    """
+    if design_name == fp.DESIGN_FULL_FACTORIAL:
+        for counter, configuration in \
+                iter_configurations(deployment_configuration, constraints):
+            yield counter, configuration
+        return
+    names, values = get_configuration_variables(deployment_configuration)
+    if constraints:
+        # Checks that the constraints refer to valid variables
+        constraints.get_constraints_by_position(names)
+    radices = [len(variable_values) for variable_values in values]
+    for index in design.get_design_indexes(design_name, radices, samples,
+                                           seed):
+        digits = design.get_digits(radices, index)
+        configuration = dict()
+        for position in range(0, len(names)):
+            configuration[names[position]] = values[position][digits[position]]
+        if constraints and constraints.excludes(configuration):
+            constraints.pruned += 1
+            continue
+        yield index + 1, configuration
+
+
+def get_template_file_name(counter):
+    """
+    Returns the name of the file of the template for a given experiment
+    :param counter: number of the experiment (type: int)
+    :return: type: str
+    """
+    return template_name + "_" + str(counter) + fp.TEMPLATE_FILE_EXTENSION
 
-    def get_variable_value(self):
+
+class TemplateRenderer:
+    """
+    Renders the heat templates of the experiments from a base template.
+    The base template is read and parsed only once: the offsets of the
+    "#VARIABLE" place holders are located at initialization and each
+    experiment is rendered in memory and written with a single write.
+    """
+
+    def __init__(self, base_template, variables):
         """
-        Returns the value of the variable correspondent to the current node
-        :return type: str or int
+        :param base_template: full path of the base heat template (type: str)
+        :param variables: names of the variables that can be found in the
+                base template as place holders (type: list of str)
         """
-        return self.variable_value
+        with open(base_template, 'r') as template_file:
+            self.base_template = template_file.read()
+        self.placeholders = TemplateRenderer.find_placeholders(
+            self.base_template, variables)
 
-    def set_variable_name(self, name):
+    @staticmethod
+    def find_placeholders(text, variables):
         """
-        Sets the name of the variable for the current node
-        :param name: Name of the variable (type: str)
-        :return None
+        Returns the offsets of the place holders in a text.
+        When more variable names match at the same offset, the longest one
+        is used.
+        :param text: text where to look for the place holders (type: str)
+        :param variables: names of the variables (type: list of str)
+        :return: type: list of (offset, variable name)
         """
-        self.variable_name = name
-
-    def set_variable_value(self, value):
+        names = sorted(variables, key=len, reverse=True)
+        placeholders = list()
+        offset = text.find('#')
+        while offset >= 0:
+            next_offset = offset + 1
+            for name in names:
+                if name and text.startswith(name, offset + 1):
+                    placeholders.append((offset, name))
+                    next_offset += len(name)
+                    break
+            offset = text.find('#', next_offset)
+        return placeholders
+
+    def render(self, configuration):
         """
-        Sets the value of the variable for the current node
-        :param value: value of the variable (type: str)
-        :return None
+        Returns the content of the heat template for a configuration
+        :param configuration: dictionary variable -> value (type: dict)
+        :return: type: str
         """
-        self.variable_value = value
-
-    def get_path(self):
+        if not configuration:
+            return self.base_template
+        chunks = list()
+        previous = 0
+        for offset, name in self.placeholders:
+            if name not in configuration:
+                continue
+            common.InputValidation.validate_string(
+                configuration[name],
+                'The text to replace in the file must be a string')
+            chunks.append(self.base_template[previous:offset])
+            chunks.append(configuration[name])
+            previous = offset + len(name) + 1
+        chunks.append(self.base_template[previous:])
+
+        # Keep the same format produced by common.replace_in_file
+        lines = ''.join(chunks).split('\n')
+        if len(lines) > 1 and not lines[-1]:
+            lines.pop()
+        return '\n'.join([line.rstrip() for line in lines]) + '\n'
+
+    def write(self, configuration, new_template, metadata=None):
         """
-        Returns all the path from the current node to the root of the tree.
-        :return type: list of TreeNode
+        Writes the heat template and its metadata file for a configuration
+        :param configuration: dictionary variable -> value (type: dict)
+        :param new_template: full path of the template to write (type: str)
+        :param metadata: additional values to be stored in the metadata
+                file (type: dict)
+        :return: None
         """
-        ret_val = []
-        if not self.up:
-            ret_val.append(self)
-            return ret_val
-        for node in self.up.get_path():
-            ret_val.append(node)
-        ret_val.append(self)
-        return ret_val
-
-    def __str__(self):
-        return str(self.variable_name) + " --> " + str(self.variable_value)
-
-    def __repr__(self):
-        return str(self.variable_name) + " = " + str(self.variable_value)
+        TemplateRenderer.write_template(self.render(configuration),
+                                        new_template)
+        TemplateRenderer.write_metadata(configuration, new_template, metadata)
 
     @staticmethod
-    def _get_leaves(node, leaves):
+    def write_template(content, new_template):
         """
-        Returns all the leaves of a tree.
-        It changes the "leaves" list.
-        :param node: root of the tree (type: TreeNode)
-        :param leaves: partial list of leaves (type: list of TreeNode)
-        :return type: None
+        Writes the content of a heat template
+        :param content: rendered heat template (type: str)
+        :param new_template: full path of the template to write (type: str)
+        :return: None
         """
-        children = node.get_children()
-        if len(children) == 0:
-            leaves.append(node)
-            return
-        for child in children:
-            TreeNode._get_leaves(child, leaves)
+        with open(new_template, 'w') as outfile:
+            outfile.write(content)
 
     @staticmethod
-    def get_leaves(node):
+    def write_metadata(configuration, new_template, metadata=None):
         """
-        Returns all the leaves of a tree.
-        :param node: root of the tree (TreeNode)
-        :return type: list
+        Writes the metadata file of a heat template
+        :param configuration: dictionary variable -> value (type: dict)
+        :param new_template: full path of the template (type: str)
+        :param metadata: additional values to be stored in the metadata
+                file (type: dict)
+        :return: None
         """
-        leaves = list()
-        TreeNode._get_leaves(node, leaves)
-        return leaves
+        if metadata:
+            configuration = dict(configuration)
+            configuration.update(metadata)
+        metadata = json.dumps(configuration)
+        with open(new_template + ".json", 'w') as outfile:
+            outfile.write(metadata)
 
 
-template_name = fp.EXPERIMENT_TEMPLATE_NAME
+def get_template_digest(content, heat_template_parameters=None):
+    """
+    Returns the hash identifying a rendered template deployed with a set of
+    parameters
+    :param content: rendered heat template (type: str)
+    :param heat_template_parameters: parameters given to the heat template
+            (type: dict)
+    :return: type: str
+    """
+    digest = hashlib.sha1(content)
+    digest.update(json.dumps(heat_template_parameters or dict(),
+                             sort_keys=True))
+    return digest.hexdigest()
+
+
+def render_templates(renderer, configurations, template_dir, metadata=None,
+                     heat_template_parameters=None):
+    """
+    Writes the heat template and the metadata file for each of the
+    configurations provided.
+    The configurations are consumed one at a time, so any iterable (e.g. the
+    generator returned by iter_configurations) can be used.
+    Configurations producing a template identical to a previous one (same
+    content and parameters) do not get a heat template but only their
+    metadata file, and they are registered as duplicates of the first one
+    (see get_duplicate_templates).
+    :param renderer: renderer of the base template (type: TemplateRenderer)
+    :param configurations: iterable of (counter, configuration)
+    :param template_dir: directory where to write the templates (type: str)
+    :param metadata: additional values to be stored in all the metadata
+            files (type: dict)
+    :param heat_template_parameters: parameters given to the heat templates
+            (type: dict)
+    :return: number of templates created and number of duplicates
+            (type: (int, int))
+    """
+    created = 0
+    digests = dict()
+    duplicates = dict()
+    for counter, configuration in configurations:
+        file_name = get_template_file_name(counter)
+        new_template = template_dir + file_name
+        content = renderer.render(configuration)
+        digest = get_template_digest(content, heat_template_parameters)
+        if digest in digests:
+            duplicates.setdefault(digests[digest], list()).append(file_name)
+            TemplateRenderer.write_metadata(configuration, new_template,
+                                            metadata)
+            common.LOG.debug("Heat Template " + str(counter) +
+                             " is a duplicate of " + digests[digest])
+            continue
+        digests[digest] = file_name
+        TemplateRenderer.write_template(content, new_template)
+        TemplateRenderer.write_metadata(configuration, new_template, metadata)
+        common.LOG.debug("Heat Templates and Metadata file " + str(counter) +
+                         " created")
+        created += 1
+
+    with open(template_dir + fp.DUPLICATE_TEMPLATES_FILE_NAME, 'w') as outfile:
+        outfile.write(json.dumps(duplicates))
+    return created, sum([len(names) for names in duplicates.values()])
+
+
+def get_template_file_digest(template_dir, template_file_name):
+    """
+    Returns the hash of a generated template and of its metadata file
+    :param template_dir: directory of the templates (type: str)
+    :param template_file_name: file name of the template (type: str)
+    :return: type: str
+    """
+    digest = hashlib.sha1()
+    for file_name in [template_file_name, template_file_name + '.json']:
+        if os.path.isfile(template_dir + file_name):
+            with open(template_dir + file_name) as template_file:
+                digest.update(template_file.read())
+    return digest.hexdigest()
+
+
+def save_templates(template_dir, destination_dir, template_files=None):
+    """
+    Copies the generated templates, with their metadata and the list of the
+    duplicate templates, in another directory
+    :param template_dir: directory of the templates (type: str)
+    :param destination_dir: directory of the copy (type: str)
+    :param template_files: templates to be copied (type: list of str,
+            default all the generated templates)
+    :return: None
+    """
+    if not os.path.isdir(destination_dir):
+        os.makedirs(destination_dir)
+    for file_name in os.listdir(template_dir):
+        if not file_name.startswith(template_name + '_'):
+            continue
+        if template_files is not None and \
+                file_name != fp.DUPLICATE_TEMPLATES_FILE_NAME and \
+                file_name not in template_files and \
+                file_name[:-len('.json')] not in template_files:
+            continue
+        shutil.copy(template_dir + file_name, destination_dir)
+
+
+def restore_templates(source_dir, template_dir):
+    """
+    Replaces the generated templates with the ones saved by save_templates
+    (e.g. to resume a run with the same experiments)
+    :param source_dir: directory of the copy (type: str)
+    :param template_dir: directory of the templates (type: str)
+    :return: None
+    """
+    if not os.path.isdir(source_dir):
+        raise ValueError('The templates of the run are not available in ' +
+                         source_dir)
+    common.LOG.info("Restoring the heat templates from " + source_dir)
+    os.system("rm " + template_dir + template_name + "_*")
+    for file_name in os.listdir(source_dir):
+        shutil.copy(source_dir + file_name, template_dir)
 
 
-def generates_templates(base_heat_template, deployment_configuration):
+def get_duplicate_templates(template_dir):
+    """
+    Returns the templates which have not been generated because identical
+    to another one
+    :param template_dir: directory of the templates (type: str)
+    :return: dict template file name -> list of the file names of its
+            duplicates (type: dict)
+    """
+    duplicates_file = template_dir + fp.DUPLICATE_TEMPLATES_FILE_NAME
+    if not os.path.isfile(duplicates_file):
+        return dict()
+    with open(duplicates_file) as json_file:
+        return json.load(json_file)
+
+
+def generates_templates(base_heat_template, deployment_configuration,
+                        deployment_constraints=None,
+                        heat_template_parameters=None):
     """
     Generates the heat templates for the experiments
+    :param base_heat_template: name of the base heat template (type: str)
+    :param deployment_configuration: dictionary of variables and list of
+            values (type: dict)
+    :param deployment_constraints: dictionary name -> expression of the
+            constraints excluding configurations (type: dict)
+    :param heat_template_parameters: parameters given to the heat templates,
+            used to identify the duplicate templates (type: dict)
     :return: None
     """
     # Load useful parameters from file
     template_dir = common.get_template_dir()
-    template_file_extension = fp.TEMPLATE_FILE_EXTENSION
     template_base_name = base_heat_template
-
-    variables = deployment_configuration
+    design_name = common.DESIGN or fp.DESIGN_FULL_FACTORIAL
 
     # Delete the templates eventually generated in previous running of the
     # framework
     common.LOG.info("Removing the heat templates previously generated")
     os.system("rm " + template_dir + template_name + "_*")
 
-    # Creation of the tree with all the new configurations
-    common.LOG.info("Creation of the tree with all the new configurations")
-    tree = TreeNode()
-    for variable in variables:
-        leaves = TreeNode.get_leaves(tree)
-        common.LOG.debug("LEAVES: " + str(leaves))
-        common.LOG.debug("VALUES: " + str(variables[variable]))
-
-        for value in variables[variable]:
-            for leaf in leaves:
-                new_node = TreeNode()
-                new_node.set_variable_name(variable)
-                new_node.set_variable_value(value)
-                leaf.add_child(new_node)
-
-    common.LOG.debug("CONFIGURATION TREE: " + str(tree))
-
-    common.LOG.info("Heat Template and metadata file creation")
-    leaves = TreeNode.get_leaves(tree)
-    counter = 1
-    for leaf in leaves:
-        heat_template_vars = leaf.get_path()
-        if os.path.isabs(template_base_name):
-            base_template = template_base_name
-        else:
-            base_template = template_dir + template_base_name
-        new_template = template_dir + template_name
-        new_template += "_" + str(counter) + template_file_extension
-        shutil.copy(base_template, new_template)
-
-        metadata = dict()
-        for var in heat_template_vars:
-            if var.get_variable_name():
-                common.replace_in_file(new_template, "#" +
-                                       var.get_variable_name(),
-                                       var.get_variable_value())
-                metadata[var.get_variable_name()] = var.get_variable_value()
-
-        # Save the metadata on a JSON file
-        with open(new_template + ".json", 'w') as outfile:
-            json.dump(metadata, outfile)
-
-        common.LOG.debug("Heat Templates and Metadata file " + str(counter) +
-                         " created")
-        counter += 1
+    if os.path.isabs(template_base_name):
+        base_template = template_base_name
+    else:
+        base_template = template_dir + template_base_name
+
+    # The configurations are enumerated lazily and rendered as a stream
+    common.LOG.info("Heat Template and metadata file creation (design: " +
+                    design_name + ")")
+    renderer = TemplateRenderer(base_template, deployment_configuration.keys())
+    constraints = None
+    if deployment_constraints:
+        constraints = cc.ConstraintSet(deployment_constraints,
+                                       deployment_configuration.keys())
+    configurations = iter_design_configurations(deployment_configuration,
+                                                design_name,
+                                                common.DESIGN_SAMPLES,
+                                                common.DESIGN_SEED,
+                                                constraints)
+    # The design which selected each experiment is recorded in its metadata
+    metadata = {fp.DESIGN_METADATA_KEY: design_name}
+    counter, duplicates = render_templates(renderer, configurations,
+                                           template_dir, metadata,
+                                           heat_template_parameters)
 
     # Creation of the template files
-    common.LOG.info(str(counter - 1) + " Heat Templates and Metadata files "
-                                       "created")
+    common.LOG.info(str(counter) + " Heat Templates and Metadata files "
+                                   "created")
+    common.LOG.info(str(duplicates) + " configurations with a duplicate "
+                                      "Heat Template")
+    if constraints:
+        common.LOG.info(str(constraints.pruned) + " configurations pruned by "
+                                                  "the constraints")
 
 
 def get_all_heat_templates(template_dir, template_file_extension):
@@ -0,0 +1,131 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+"""
+Noisy neighbour stacks shared by the experiments
+"""
+
+from experimental_framework import common
+
+
+class NeighbourPool:
+    """
+    Keeps the noisy neighbour stacks deployed across the experiments and the
+    iterations, as long as they are requested with the same template and
+    parameters (e.g. cores and memory). When only the number of neighbours
+    changes, the stacks are added or removed incrementally.
+    Between the benchmarks which use them the neighbours are suspended, so
+    that they do not interfere with the other benchmarks.
+    The pool is emptied by the Benchmarking Unit at finalization.
+    """
+
+    def __init__(self, deployment_unit):
+        """
+        :param deployment_unit: DeploymentUnit used to manage the stacks
+        """
+        self.deployment_unit = deployment_unit
+        self.key = None
+        self.stack_names = list()
+        self.suspended = False
+        self.statistics = dict([(event, 0) for event in
+                                ['deployed', 'reused', 'destroyed']])
+
+    def acquire(self, template_file, stack_name, parameters, count):
+        """
+        Returns the requested number of running neighbours, deploying only
+        the ones which are not already in the pool
+        :param template_file: full path file name of the heat template
+        :param stack_name: prefix of the names of the stacks (str)
+        :param parameters: parameters to be given to the heat template (dict)
+        :param count: number of neighbours (int)
+        :return: names of the stacks deployed (list of str)
+        """
+        key = (template_file, stack_name, tuple(sorted(parameters.items())))
+        if key != self.key:
+            self.destroy()
+            self.key = key
+        if self.suspended:
+            self.resume()
+
+        required = [stack_name + str(index) for index in range(0, count)]
+        surplus = [name for name in self.stack_names if name not in required]
+        if surplus:
+            self.remove(surplus)
+        self.statistics['reused'] += len(self.stack_names)
+        missing = [name for name in required if name not in self.stack_names]
+        if missing:
+            deployed = self.deployment_unit.deploy_heat_templates(
+                template_file, missing, parameters)
+            for name in missing:
+                if deployed.get(name):
+                    self.stack_names.append(name)
+                    self.statistics['deployed'] += 1
+        common.LOG.info('Noisy neighbours: ' + str(len(self.stack_names)) +
+                        ' running (' + str(len(missing)) + ' deployed)')
+        return [name for name in required if name in self.stack_names]
+
+    def park(self):
+        """
+        Suspends the neighbours, which are not required by the next
+        benchmark. The neighbours which cannot be suspended are destroyed.
+        :return: None
+        """
+        if self.suspended or not self.stack_names:
+            return
+        suspended = self.deployment_unit.suspend_heat_templates(
+            self.stack_names)
+        self.remove([name for name in self.stack_names
+                     if not suspended.get(name)])
+        self.suspended = True
+
+    def resume(self):
+        """
+        Resumes the suspended neighbours. The neighbours which cannot be
+        resumed are destroyed (they are deployed again if required).
+        :return: None
+        """
+        resumed = self.deployment_unit.resume_heat_templates(self.stack_names)
+        self.remove([name for name in self.stack_names
+                     if not resumed.get(name)])
+        self.suspended = False
+
+    def remove(self, stack_names):
+        """
+        Destroys some neighbours of the pool
+        :param stack_names: names of the stacks (list of str)
+        :return: None
+        """
+        for name in stack_names:
+            self.stack_names.remove(name)
+        self.deployment_unit.destroy_heat_templates(stack_names)
+        self.statistics['destroyed'] += len(stack_names)
+
+    def destroy(self):
+        """
+        Destroys all the neighbours of the pool
+        :return: None
+        """
+        self.remove(list(self.stack_names))
+        self.key = None
+        self.suspended = False
+
+    def get_statistics(self):
+        """
+        Returns the number of neighbours deployed, reused and destroyed
+        :return: dict event -> count
+        """
+        return dict(self.statistics)
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import os
+import shutil
 import base_packet_generator
 import experimental_framework.common as common
 from experimental_framework.constants import conf_file_sections as conf_file
@@ -21,11 +22,17 @@ from experimental_framework.constants import framework_parameters as fp
 
 class DpdkPacketGenerator(base_packet_generator.BasePacketGenerator):
 
-    def __init__(self):
+    def __init__(self, resources=None):
+        """
+        :param resources: traffic generation resources leased to the caller
+                          (NICs and coremask), by default the ones of the
+                          configuration file (type: dict)
+        """
         base_packet_generator.BasePacketGenerator.__init__(self)
         self.command = ''
         self.directory = ''
         self.dpdk_interfaces = -1
+        self.resources = resources or dict()
 
     def send_traffic(self):
         '''
@@ -34,7 +41,7 @@ class DpdkPacketGenerator(base_packet_generator.BasePacketGenerator):
         '''
         current_dir = os.path.dirname(os.path.realpath(__file__))
         DpdkPacketGenerator._chdir(self.directory)
-        dpdk_vars = common.get_dpdk_pktgen_vars()
+        dpdk_vars = common.get_dpdk_pktgen_vars(self.resources)
         self._init_physical_nics(self.dpdk_interfaces, dpdk_vars)
         common.run_command(self.command)
         self._finalize_physical_nics(self.dpdk_interfaces, dpdk_vars)
@@ -65,7 +72,7 @@ class DpdkPacketGenerator(base_packet_generator.BasePacketGenerator):
                              'is required')
 
         self.dpdk_interfaces = dpdk_interfaces
-        vars = common.get_dpdk_pktgen_vars()
+        vars = common.get_dpdk_pktgen_vars(self.resources)
 
         lua_directory = common.get_base_dir()
         lua_directory += fp.EXPERIMENTAL_FRAMEWORK_DIR
@@ -82,6 +89,17 @@ class DpdkPacketGenerator(base_packet_generator.BasePacketGenerator):
                                                    lua_directory,
                                                    vars)
 
+        # Concurrent packet generators use their own copy of the pcap files
+        # (the VLAN tag is changed in place) and their own DPDK files
+        lease_name = self.resources.get('name', '')
+        if lease_name:
+            pcap_file_0 = DpdkPacketGenerator._copy_file(pcap_directory,
+                                                         pcap_file_0,
+                                                         lease_name)
+            if pcap_file_1:
+                pcap_file_1 = DpdkPacketGenerator.\
+                    _copy_file(pcap_directory, pcap_file_1, lease_name)
+
         self.directory = vars[conf_file.CFSP_DPDK_PKTGEN_DIRECTORY]
         self.program_name = vars[conf_file.CFSP_DPDK_PROGRAM_NAME]
 
@@ -91,7 +109,7 @@ class DpdkPacketGenerator(base_packet_generator.BasePacketGenerator):
                                 '-n ' + vars[conf_file.
                                              CFSP_DPDK_MEMORY_CHANNEL],
                                 '--proc-type auto',
-                                '--file-prefix pg',
+                                '--file-prefix pg' + lease_name,
                                 '-- -T',
                                 '-P',
                                 '-m "' + core_nics + '"',
@@ -133,6 +151,19 @@ class DpdkPacketGenerator(base_packet_generator.BasePacketGenerator):
         raise ValueError("This framework only supports two ports to generate "
                          "traffic")
 
+    @staticmethod
+    def _copy_file(directory, file_name, lease_name):
+        """
+        Copies a file for the exclusive use of a lease
+        :param directory: directory of the file (type: str)
+        :param file_name: name of the file (type: str)
+        :param lease_name: name of the lease (type: str)
+        :return: name of the copy (type: str)
+        """
+        copy_name = lease_name + '_' + file_name
+        shutil.copyfile(directory + file_name, directory + copy_name)
+        return copy_name
+
     @staticmethod
     def _change_vlan(pcap_directory, pcap_file, vlan):
         common.LOG.info("Changing VLAN Tag on Packet: " + pcap_file +
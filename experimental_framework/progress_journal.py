@@ -0,0 +1,158 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+"""
+Journal of the progress of a run, used to resume it after an interruption
+"""
+
+import json
+import os
+import threading
+
+from experimental_framework import common
+
+
+class ProgressJournal:
+    """
+    Records on file each completed unit of work (execution of a benchmark on
+    a template in an iteration) with its data points.
+    Every unit is a JSON line appended and synced to disk as soon as the
+    unit is completed, so that an interrupted run loses at most the unit in
+    progress.
+    The data points produced outside of the units (the timings of the
+    deletions completed in background) are recorded in lines of their own.
+    """
+
+    def __init__(self, journal_file):
+        """
+        :param journal_file: full path of the journal file (type: str)
+        """
+        self.journal_file = journal_file
+        self.lock = threading.Lock()
+        self.units = dict()
+        self.deletions = list()
+
+    @staticmethod
+    def get_key(template_file_name, benchmark_name, iteration):
+        return template_file_name, benchmark_name, iteration
+
+    def load(self):
+        """
+        Loads the units completed by a previous run.
+        A truncated last line (interruption while writing) is ignored.
+        :return: list of the units (dict) in order of completion
+        """
+        units = list()
+        if not os.path.isfile(self.journal_file):
+            return units
+        with open(self.journal_file) as journal:
+            for line in journal:
+                try:
+                    unit = ProgressJournal.to_str(json.loads(line))
+                except ValueError:
+                    common.LOG.info('Incomplete entry of the progress journal ignored')
+                    continue
+                if 'deletions' in unit:
+                    self.deletions.extend(unit['deletions'])
+                    continue
+                key = ProgressJournal.get_key(unit['template'], unit['benchmark'], unit['iteration'])
+                if key in self.units:
+                    continue
+                self.units[key] = unit
+                units.append(unit)
+        return units
+
+    @staticmethod
+    def to_str(value):
+        """
+        Converts the unicode strings returned by the json module into str,
+        as the ones produced by the benchmarks
+        :param value: value loaded from the journal
+        :return: the value with str instead of unicode
+        """
+        if isinstance(value, unicode):
+            return value.encode('utf-8')
+        if isinstance(value, list):
+            return [ProgressJournal.to_str(element) for element in value]
+        if isinstance(value, dict):
+            return dict([(ProgressJournal.to_str(key), ProgressJournal.to_str(value[key])) for key in value])
+        return value
+
+    def get_deletions(self):
+        """
+        Returns the deletion data points recorded by a previous run (see load)
+        :return: list of (experiment name, data point)
+        """
+        with self.lock:
+            return [(deletion[0], deletion[1]) for deletion in self.deletions]
+
+    def get_unit(self, template_file_name, benchmark_name, iteration):
+        """
+        Returns a completed unit
+        :param template_file_name: file name of the template (type: str)
+        :param benchmark_name: name of the benchmark (type: str)
+        :param iteration: iteration (type: int)
+        :return: dict or None if the unit has not been completed
+        """
+        with self.lock:
+            return self.units.get(ProgressJournal.get_key(template_file_name, benchmark_name, iteration))
+
+    def record(self, template_file_name, benchmark_name, iteration, data_points, template_digest=None):
+        """
+        Records a completed unit
+        :param template_file_name: file name of the template (type: str)
+        :param benchmark_name: name of the benchmark (type: str)
+        :param iteration: iteration (type: int)
+        :param data_points: dict benchmark name -> data point or list of data points
+                (the benchmark, the deployment and any other benchmark fed by the unit)
+        :param template_digest: hash of the template and of its metadata, used to check
+                that a resumed run executes the same templates (type: str)
+        :return: None
+        """
+        unit = dict()
+        unit['template'] = template_file_name
+        unit['template_digest'] = template_digest
+        unit['benchmark'] = benchmark_name
+        unit['iteration'] = iteration
+        unit['data_points'] = data_points
+        with self.lock:
+            self.append(unit)
+            self.units[ProgressJournal.get_key(template_file_name, benchmark_name, iteration)] = unit
+
+    def record_deletions(self, deletions):
+        """
+        Records the timings of deletions completed in background
+        :param deletions: list of (experiment name, data point)
+        :return: None
+        """
+        entry = dict()
+        entry['deletions'] = [list(deletion) for deletion in deletions]
+        with self.lock:
+            self.append(entry)
+            self.deletions.extend(entry['deletions'])
+
+    def append(self, entry):
+        """
+        Appends an entry to the journal file and syncs it to disk (to be called with the lock)
+        :param entry: dict
+        :return: None
+        """
+        line = json.dumps(entry, default=str)
+        with open(self.journal_file, 'a') as journal:
+            journal.write(line + '\n')
+            journal.flush()
+            os.fsync(journal.fileno())
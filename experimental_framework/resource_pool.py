@@ -0,0 +1,93 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+"""
+Leases of the traffic generation resources to the experiments
+"""
+
+import threading
+
+from experimental_framework import common
+
+
+class TrafficResourcePool:
+    """
+    Pool of sets of traffic generation resources (NIC pair, coremask,
+    VLAN pair, see common.get_traffic_resources).
+    Each experiment leases a set for its whole execution, so that several
+    experiments can send traffic at the same time from the same host.
+    When all the sets are leased the experiments wait in order of request.
+    """
+
+    def __init__(self, resources):
+        """
+        :param resources: sets of resources (type: list of dict)
+        """
+        if not resources:
+            raise ValueError('At least one set of traffic resources is required')
+        self.condition = threading.Condition()
+        self.available = list()
+        for index in range(0, len(resources)):
+            lease = dict(resources[index])
+            # With a single set the files of the packet generator are used
+            # as they are, otherwise each set has its own copies
+            lease['name'] = 'lease' + str(index) if len(resources) > 1 else ''
+            self.available.append(lease)
+        self.capacity = len(resources)
+        self.queue = list()
+        self.statistics = dict([(event, 0) for event in ['leases', 'waits', 'wait_time']])
+
+    def lease(self):
+        """
+        Returns a set of resources, waiting for one to be released if all the sets are leased
+        :return: the set of resources (type: dict)
+        """
+        ticket = object()
+        start = common.get_time()
+        with self.condition:
+            self.queue.append(ticket)
+            if not self.available or self.queue[0] is not ticket:
+                common.LOG.info('Waiting for the traffic generation resources (' +
+                                str(len(self.queue)) + ' experiments in queue)')
+                self.statistics['waits'] += 1
+            while not self.available or self.queue[0] is not ticket:
+                self.condition.wait()
+            self.queue.pop(0)
+            lease = self.available.pop(0)
+            self.statistics['leases'] += 1
+            self.statistics['wait_time'] += common.get_time() - start
+            lease['wait_time'] = common.get_time() - start
+            self.condition.notify_all()
+            return lease
+
+    def release(self, lease):
+        """
+        Returns a set of resources to the pool
+        :param lease: set of resources returned by lease (type: dict)
+        :return: None
+        """
+        with self.condition:
+            self.available.append(lease)
+            self.condition.notify_all()
+
+    def get_statistics(self):
+        """
+        Returns the number of leases, of leases which had to wait and the total waiting time
+        :return: dict event -> value
+        """
+        with self.condition:
+            return dict(self.statistics)
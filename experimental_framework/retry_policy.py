@@ -0,0 +1,154 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+"""
+Retry and timeout policy of the stack operations
+"""
+
+import random
+import threading
+
+from experimental_framework.constants import framework_parameters as fp
+
+
+class RetryPolicy:
+    """
+    Decides if and when a failed stack operation is retried:
+     - exponential backoff with jitter between the attempts
+     - deadline for each phase (create, update, delete)
+     - classification of the errors in retryable and fatal
+     - circuit breaker, which skips a configuration (template) after
+       a number of consecutive failed deployments
+    It also collects the statistics of the retries.
+    """
+
+    def __init__(self, max_retries=fp.RETRY_MAX_RETRIES,
+                 base_delay=fp.RETRY_BASE_DELAY,
+                 max_delay=fp.RETRY_MAX_DELAY,
+                 jitter=fp.RETRY_JITTER, deadlines=None,
+                 breaker_threshold=fp.CIRCUIT_BREAKER_THRESHOLD, seed=None):
+        """
+        :param max_retries: retries after the first attempt (type: int)
+        :param base_delay: delay before the first retry in seconds, doubled
+                at every retry (type: float)
+        :param max_delay: maximum delay between two attempts (type: float)
+        :param jitter: fraction of the delay which is randomized
+                (type: float between 0 and 1)
+        :param deadlines: dict phase -> maximum duration in seconds of the
+                wait for the phase (None means no deadline) (type: dict)
+        :param breaker_threshold: number of consecutive failed deployments
+                of a template after which it is skipped (None or 0 disables
+                the circuit breaker) (type: int)
+        :param seed: seed of the random generator of the jitter (type: int)
+        """
+        if max_retries < 0:
+            raise ValueError('The number of retries cannot be negative')
+        if jitter < 0 or jitter > 1:
+            raise ValueError('The jitter has to be between 0 and 1')
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.deadlines = deadlines or dict()
+        self.breaker_threshold = breaker_threshold
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.failures = dict()
+        self.statistics = dict()
+
+    def get_delay(self, attempt):
+        """
+        Returns the delay before an attempt
+        :param attempt: number of the attempt (0 is the first one)
+        :return: seconds (type: float)
+        """
+        if attempt <= 0:
+            return 0.0
+        delay = min(self.base_delay * 2 ** (attempt - 1), self.max_delay)
+        with self.lock:
+            return delay * (1 - self.jitter * self.random.random())
+
+    def get_deadline(self, phase):
+        """
+        Returns the maximum duration of the wait for a phase
+        :param phase: create, update or delete (type: str)
+        :return: seconds or None if there is no deadline
+        """
+        return self.deadlines.get(phase)
+
+    @staticmethod
+    def is_retryable(error):
+        """
+        Classifies an error raised by a stack operation.
+        HTTP errors are retryable only for the codes in
+        fp.RETRYABLE_HTTP_CODES (e.g. service unavailable, conflicts with
+        operations in progress), errors in the input (e.g. malformed
+        templates or parameters) are fatal, any other error (e.g. network)
+        is retryable.
+        :param error: the exception raised
+        :return: True if the operation can be retried
+        """
+        code = getattr(error, 'code', None)
+        if isinstance(code, int):
+            return code in fp.RETRYABLE_HTTP_CODES
+        if isinstance(error, (ValueError, TypeError, KeyError)):
+            return False
+        return True
+
+    def is_open(self, key):
+        """
+        Returns True if the circuit breaker of a template is open, i.e. the
+        template failed too many times and has to be skipped
+        :param key: template (type: str)
+        :return: bool
+        """
+        if not self.breaker_threshold:
+            return False
+        with self.lock:
+            return self.failures.get(key, 0) >= self.breaker_threshold
+
+    def record(self, key, event, value=1):
+        """
+        Updates the statistics of a template
+        :param key: template (type: str)
+        :param event: attempts, retries, timeouts, fatal_errors, failures,
+                successes or skipped (type: str)
+        :param value: value to be added (type: int)
+        :return: None
+        """
+        with self.lock:
+            statistics = self.statistics.setdefault(key, dict())
+            statistics[event] = statistics.get(event, 0) + value
+            if event == 'successes':
+                self.failures[key] = 0
+            elif event == 'failures':
+                self.failures[key] = self.failures.get(key, 0) + 1
+
+    def get_statistics(self, key=None):
+        """
+        Returns the statistics of a template or the total of all templates
+        :param key: template (None for the total)
+        :return: dict event -> count
+        """
+        with self.lock:
+            if key is not None:
+                return dict(self.statistics.get(key, dict()))
+            total = dict()
+            for statistics in self.statistics.values():
+                for event in statistics:
+                    total[event] = total.get(event, 0) + statistics[event]
+            return total
@@ -0,0 +1,227 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+"""
+Execution of the experiments split across several testbeds (shards)
+"""
+
+import json
+import multiprocessing
+import os
+import Queue
+import time
+
+from experimental_framework import common
+from experimental_framework import benchmarking_unit as bench
+from experimental_framework import data_manager as data
+from experimental_framework import heat_template_generation as heat
+from experimental_framework import experiment_scheduler as scheduler
+from experimental_framework.constants import framework_parameters as fp
+
+
+class ShardCoordinator:
+    """
+    Splits the generated templates among the shards, each one with its own
+    OpenStack project and packet generator (see common.get_shard_profiles).
+    Every shard is executed by a worker process with its own Benchmarking
+    Unit (and Deployment Unit); at the end the results of the shards are
+    merged in a single results directory.
+    """
+
+    def __init__(self, heat_template_name, profiles, heat_template_parameters, iterations, benchmarks,
+                 deployment_costs=None, deployment_types=None, resume_directory=None):
+        """
+        :param heat_template_name: name of the base heat template (type: str)
+        :param profiles: profiles of the shards (type: list of dict)
+        :param heat_template_parameters: parameters of the heat templates (type: dict)
+        :param iterations: number of iterations (type: int)
+        :param benchmarks: benchmarks to be executed (type: list of dict)
+        :param deployment_costs: costs of the values of the deployment configuration (type: dict)
+        :param deployment_types: types of the variables of the deployment configuration (type: dict)
+        :param resume_directory: results directory of an interrupted run to be resumed (type: str)
+        """
+        if not profiles:
+            raise ValueError('At least one shard is required')
+        self.template_name = heat_template_name
+        self.profiles = profiles
+        self.heat_template_parameters = heat_template_parameters
+        self.iterations = iterations
+        self.benchmarks = benchmarks
+        self.deployment_costs = deployment_costs
+        self.deployment_types = deployment_types
+        self.template_dir = common.get_template_dir()
+        self.results_directory = resume_directory or common.RESULT_DIR + str(time.time())
+        self.resume = resume_directory is not None
+        # The cost budget is charged on the whole run, before splitting the templates
+        self.scheduler = scheduler.ExperimentScheduler(deployment_costs, common.SCHEDULING, common.COST_BUDGET)
+        self.data_manager = None
+
+    def split_templates(self):
+        """
+        Assigns the templates to the shards, balancing the cumulative cost of their experiments
+        (each template goes to the shard with the lowest cost, the most expensive first).
+        The templates which exceed the cost budget of the run (all the iterations on all the shards) are not
+        assigned to any shard.
+        :return: dict shard name -> list of template file names
+        """
+        template_files = heat.get_all_heat_templates(self.template_dir, common.TEMPLATE_FILE_EXTENSION)
+        experiments = list()
+        for template_file_name in template_files:
+            with open(self.template_dir + template_file_name + '.json') as json_file:
+                experiments.append((template_file_name, json.load(json_file)))
+        experiments = self.scheduler.schedule(experiments, self.iterations)
+        experiments.sort(key=lambda experiment: experiment[1], reverse=True)
+
+        shards = dict([(profile['name'], list()) for profile in self.profiles])
+        loads = dict([(profile['name'], 0.0) for profile in self.profiles])
+        names = [profile['name'] for profile in self.profiles]
+        for template_file_name, cost in experiments:
+            shard = min(names, key=lambda name: (loads[name], len(shards[name])))
+            shards[shard].append(template_file_name)
+            loads[shard] += cost
+        for name in names:
+            common.LOG.info('Shard ' + name + ': ' + str(len(shards[name])) + ' templates (cost ' +
+                            str(loads[name] * self.iterations) + ' over ' + str(self.iterations) + ' iterations)')
+        return shards
+
+    def run(self):
+        """
+        Runs the shards in parallel and merges their results
+        :return: the results directory (type: str)
+        """
+        if not self.resume:
+            heat.save_templates(self.template_dir, self.results_directory + '/' + fp.TEMPLATES_RESULTS_DIR)
+        shards = self.split_templates()
+        queue = multiprocessing.Queue()
+        workers = list()
+        for profile in self.profiles:
+            if not shards[profile['name']]:
+                common.LOG.info('Shard ' + profile['name'] + ' has no templates to be executed')
+                continue
+            results_directory = self.get_shard_results_directory(profile['name'])
+            worker = multiprocessing.Process(target=run_shard,
+                                             args=(profile, shards[profile['name']], results_directory, queue,
+                                                   self.template_name, self.heat_template_parameters,
+                                                   self.iterations, self.benchmarks, self.deployment_costs,
+                                                   self.deployment_types, self.resume))
+            worker.name = 'shard-' + profile['name']
+            worker.start()
+            workers.append(worker)
+
+        # The results are collected before joining the workers, which cannot
+        # terminate until their results have been consumed
+        results = dict()
+        while len(results) < len(workers):
+            try:
+                shard, experiments, error = queue.get(True, fp.STACK_POLL_INTERVAL)
+            except Queue.Empty:
+                if not [worker for worker in workers if worker.is_alive()]:
+                    break
+                continue
+            if error:
+                common.LOG.error('Shard ' + shard + ' failed: ' + error)
+            results[shard] = experiments
+        for worker in workers:
+            worker.join()
+            if worker.name[len('shard-'):] not in results:
+                common.LOG.error('Worker ' + worker.name + ' terminated without results (exit code ' +
+                                 str(worker.exitcode) + ')')
+
+        self.merge(results)
+        return self.results_directory
+
+    def merge(self, results):
+        """
+        Stores the results of all the shards in the results directory
+        :param results: dict shard name -> dict experiment name -> class Experiment
+        :return: None
+        """
+        self.data_manager = data.DataManager(self.results_directory)
+        for shard in sorted(results.keys()):
+            for experiment_name in sorted(results[shard].keys()):
+                experiment = results[shard][experiment_name]
+                experiment.add_experiment_metadata({'shard': shard})
+                self.data_manager.add_experiment(experiment)
+        for experiment_name in self.data_manager.get_list_experiment_names():
+            self.data_manager.close_experiment(experiment_name)
+        self.data_manager.generate_result_csv_file()
+        self.write_retry_statistics(results.keys())
+        common.LOG.info('Results of ' + str(len(results)) + ' shards merged in ' + self.results_directory)
+
+    def write_retry_statistics(self, shards):
+        """
+        Writes the retry statistics of all the shards in the results directory
+        :param shards: names of the shards (list of str)
+        :return: None
+        """
+        statistics = dict()
+        statistics['total'] = dict()
+        for shard in shards:
+            statistics_file_name = self.get_shard_results_directory(shard) + '/' + fp.RETRY_STATISTICS_FILE_NAME
+            if not os.path.isfile(statistics_file_name):
+                continue
+            with open(statistics_file_name) as statistics_file:
+                shard_statistics = json.load(statistics_file)
+            for key in shard_statistics:
+                if key != 'total':
+                    statistics[key] = shard_statistics[key]
+                    continue
+                for event in shard_statistics[key]:
+                    statistics['total'][event] = statistics['total'].get(event, 0) + shard_statistics[key][event]
+        with open(self.results_directory + '/' + fp.RETRY_STATISTICS_FILE_NAME, 'w') as statistics_file:
+            json.dump(statistics, statistics_file, indent=4, sort_keys=True)
+
+    def get_shard_results_directory(self, shard):
+        """
+        Returns the directory where a shard stores its own results
+        :param shard: name of the shard (str)
+        :return: str
+        """
+        return self.results_directory + '/' + fp.SHARD_RESULTS_DIR + shard
+
+
+def run_shard(profile, template_files, results_directory, queue, heat_template_name, heat_template_parameters,
+              iterations, benchmarks, deployment_costs, deployment_types, resume=False):
+    """
+    Executes the experiments of a shard (in the worker process of the shard)
+    and sends the results to the coordinator
+    :param profile: profile of the shard (type: dict)
+    :param template_files: templates assigned to the shard (type: list of str)
+    :param results_directory: directory of the results of the shard (type: str)
+    :param queue: queue where the results are sent (type: multiprocessing.Queue)
+    :param resume: True to skip the units of work completed by an interrupted run of the shard (type: bool)
+    :return: None
+    """
+    experiments = dict()
+    error = None
+    try:
+        common.LOG.info('Shard ' + profile['name'] + ' started on ' + str(len(template_files)) + ' templates')
+        if common.CONF_FILE and common.CONF_FILE.get_variable_list(profile['pktgen_section']):
+            common.init_pktgen(profile['pktgen_section'])
+        # The cost budget has already been charged by the coordinator on the templates of the shard
+        b_unit = bench.BenchmarkingUnit(heat_template_name, profile['credentials'], heat_template_parameters,
+                                        iterations, benchmarks, deployment_costs, deployment_types,
+                                        template_files, results_directory, resume)
+        try:
+            b_unit.initialize()
+            b_unit.run_benchmarks()
+        finally:
+            b_unit.finalize()
+            experiments = b_unit.data_manager.experiments
+    except Exception as e:
+        error = str(e)
+    queue.put((profile['name'], experiments, error))
@@ -0,0 +1,211 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+"""
+Deletion of the stacks in background
+"""
+
+import atexit
+import threading
+import time
+
+from experimental_framework import common
+from experimental_framework.constants import framework_parameters as fp
+
+
+class StackReaper:
+    """
+    Deletes the stacks in a background thread, so that the Benchmarking Unit
+    does not wait for Heat to complete the deletions.
+    The stacks requested while a deletion is in progress are deleted
+    together and watched by a single polling loop. The stacks whose deletion
+    fails are deleted again according to the retry policy of the
+    deployment unit.
+    Every request of deletion of a stack has its own generation, so that a
+    stack created again with the same name and requested for deletion while
+    the previous batch is still in progress is released only by its own
+    deletion.
+    """
+
+    def __init__(self, deployment_unit):
+        """
+        :param deployment_unit: DeploymentUnit used to delete the stacks
+        """
+        self.deployment_unit = deployment_unit
+        self.condition = threading.Condition()
+        self.queue = list()
+        self.deleting = set()
+        self.generations = dict()
+        self.failed = list()
+        self.thread = None
+
+    def destroy(self, stack_name):
+        """
+        Requests the deletion of a stack, without waiting for it
+        :param stack_name: name of the stack (str)
+        :return: None
+        """
+        with self.condition:
+            if stack_name in self.deleting:
+                return
+            self.deleting.add(stack_name)
+            self.generations[stack_name] = self.generations.get(stack_name, 0) + 1
+            self.queue.append(stack_name)
+            if not self.thread:
+                self.thread = threading.Thread(target=self.run)
+                self.thread.daemon = True
+                self.thread.start()
+                atexit.register(self.drain)
+            self.condition.notify_all()
+
+    def wait_for(self, stack_names):
+        """
+        Waits for the deletion of the given stacks (if requested), so that
+        new stacks with the same names can be created
+        :param stack_names: names of the stacks (list of str)
+        :return: None
+        """
+        with self.condition:
+            while [stack_name for stack_name in stack_names
+                   if stack_name in self.deleting]:
+                self.condition.wait(fp.STACK_POLL_INTERVAL)
+
+    def drain(self):
+        """
+        Waits for all the requested deletions to be completed
+        :return: None
+        """
+        with self.condition:
+            if self.deleting:
+                common.LOG.info('Waiting for the deletion of ' +
+                                str(len(self.deleting)) + ' stacks')
+            while self.deleting:
+                self.condition.wait(fp.STACK_POLL_INTERVAL)
+
+    def run(self):
+        """
+        Main loop of the background thread
+        :return: None
+        """
+        while True:
+            with self.condition:
+                while not self.queue:
+                    self.condition.wait()
+                stack_names = self.queue
+                self.queue = list()
+                generations = dict([(stack_name, self.generations[stack_name])
+                                    for stack_name in stack_names])
+            try:
+                self.delete(stack_names, generations)
+            except Exception as e:
+                common.LOG.info('Deletion of stacks ' +
+                                ', '.join(stack_names) + ' failed: ' + str(e))
+                self.failed.extend(stack_names)
+                # The stacks already released by delete are ignored
+                self.release(stack_names, generations)
+
+    def release(self, stack_names, generations):
+        """
+        Marks the deletion of the stacks as terminated, unless the stacks have
+        been requested for deletion again in the meanwhile
+        :param stack_names: names of the stacks (list of str)
+        :param generations: generation of the request of deletion of each
+                            stack (dict stack name -> int)
+        :return: None
+        """
+        with self.condition:
+            for stack_name in stack_names:
+                if self.generations.get(stack_name) == \
+                        generations[stack_name]:
+                    self.deleting.discard(stack_name)
+            self.condition.notify_all()
+
+    def delete(self, stack_names, generations):
+        """
+        Deletes the stacks and waits for the deletions to be completed,
+        retrying with an increasing interval the ones which fail. Each stack
+        is released as soon as its deletion terminates.
+        :param stack_names: names of the stacks (list of str)
+        :param generations: generation of the request of deletion of each
+                            stack (dict stack name -> int)
+        :return: None
+        """
+        heat_manager = self.deployment_unit.heat_manager
+        policy = self.deployment_unit.retry_policy
+        start = common.get_time()
+
+        def request_deletion(stack_name):
+            try:
+                heat_manager.delete_stack(stack_name)
+                return None
+            except Exception as e:
+                common.LOG.info('Deletion of stack ' + stack_name +
+                                ' failed: ' + str(e))
+                if getattr(e, 'code', None) == 401:
+                    heat_manager.reset_authentication()
+                return e
+
+        for attempt in range(0, policy.max_retries + 1):
+            time.sleep(policy.get_delay(attempt))
+            errors = self.deployment_unit.run_concurrently(request_deletion,
+                                                           stack_names)
+            # The stacks with fatal errors are not retried
+            fatal = [stack_names[i] for i in range(0, len(stack_names))
+                     if errors[i] and not policy.is_retryable(errors[i])]
+            if fatal:
+                self.record(fatal, start, attempt, False)
+                self.failed.extend(fatal)
+                self.release(fatal, generations)
+                stack_names = [stack_name for stack_name in stack_names
+                               if stack_name not in fatal]
+                if not stack_names:
+                    return
+            statuses = self.deployment_unit.wait_for_stacks(
+                stack_names, 'DELETE_IN_PROGRESS',
+                policy.get_deadline('delete'))
+            deleted = [stack_name for stack_name in stack_names
+                       if statuses[stack_name] in
+                       ['NOT_FOUND', 'DELETE_COMPLETE']]
+            self.record(deleted, start, attempt, True)
+            self.release(deleted, generations)
+            stack_names = [stack_name for stack_name in stack_names
+                           if stack_name not in deleted]
+            if not stack_names:
+                return
+            common.LOG.info('Deletion of stacks ' + ', '.join(stack_names) +
+                            ' not completed (attempt ' + str(attempt + 1) +
+                            ')')
+        self.record(stack_names, start, policy.max_retries, False)
+        self.failed.extend(stack_names)
+        self.release(stack_names, generations)
+
+    def record(self, stack_names, start, retries, deleted):
+        """
+        Records the timings of the deletion of the stacks
+        :param stack_names: names of the stacks (list of str)
+        :param start: time of the beginning of the deletion
+        :param retries: number of retries of the deletion (int)
+        :param deleted: True if the deletion is completed (bool)
+        :return: None
+        """
+        elapsed = common.get_time() - start
+        for stack_name in stack_names:
+            timings = dict()
+            timings['delete_time'] = elapsed
+            timings['delete_retries'] = retries
+            timings['deleted'] = deleted
+            self.deployment_unit.add_deletion_timing(stack_name, timings)
@@ -0,0 +1,149 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+import math
+import time
+import unittest
+
+from experimental_framework import adaptive_search as adaptive
+
+
+class TestGaussianProcess(unittest.TestCase):
+
+    def setUp(self):
+        self.matrix = [[4.0, 12.0, -16.0], [12.0, 37.0, -43.0], [-16.0, -43.0, 98.0]]
+        self.chol = [[2.0, 0.0, 0.0], [6.0, 1.0, 0.0], [-8.0, 5.0, 3.0]]
+
+    def test_cholesky_for_success(self):
+        chol = adaptive.GaussianProcess._cholesky(self.matrix)
+        for i in range(0, 3):
+            for j in range(0, 3):
+                self.assertAlmostEqual(self.chol[i][j], chol[i][j])
+
+    def test_solve_lower_for_success(self):
+        solution = adaptive.GaussianProcess._solve_lower(self.chol, [2.0, 13.0, -6.0])
+        for expected, value in zip([1.0, 7.0, -11.0], solution):
+            self.assertAlmostEqual(expected, value)
+
+    def test_solve_upper_for_success(self):
+        # System with the transposed of the lower matrix
+        solution = adaptive.GaussianProcess._solve_upper(self.chol, [1.0, 2.0, 3.0])
+        for expected, value in zip([13.5, -3.0, 1.0], solution):
+            self.assertAlmostEqual(expected, value)
+
+    def test_predict_at_training_points(self):
+        model = adaptive.GaussianProcess(noise=1e-6)
+        x = [[0.0], [0.5], [1.0]]
+        y = [10.0, 30.0, 20.0]
+        model.fit(x, y)
+        for point, value in zip(x, y):
+            mean, std = model.predict(point)
+            self.assertAlmostEqual(value, mean, places=2)
+            self.assertTrue(std < 0.01 * model.y_std)
+
+    def test_predict_far_from_training_points(self):
+        model = adaptive.GaussianProcess(length_scale=0.1)
+        model.fit([[0.0], [0.1]], [10.0, 20.0])
+        mean, std = model.predict([5.0])
+        # The prior is returned: mean and standard deviation of the observations
+        self.assertAlmostEqual(15.0, mean)
+        self.assertAlmostEqual(5.0, std)
+
+
+class TestExpectedImprovement(unittest.TestCase):
+
+    def test_expected_improvement_for_success(self):
+        # With the mean equal to the best value (xi = 0) the improvement is std * pdf(0)
+        self.assertAlmostEqual(2.0 / math.sqrt(2.0 * math.pi), adaptive.expected_improvement(10.0, 2.0, 10.0, 0.0))
+        self.assertTrue(adaptive.expected_improvement(12.0, 1.0, 10.0) > adaptive.expected_improvement(8.0, 1.0, 10.0))
+
+    def test_expected_improvement_without_uncertainty(self):
+        self.assertEqual(0.0, adaptive.expected_improvement(20.0, 0.0, 10.0))
+        self.assertEqual(0.0, adaptive.expected_improvement(5.0, 0.0, 10.0))
+
+
+class TestBayesianSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.candidates = list()
+        for index in range(0, 8):
+            configuration = {'vcpus': str(2 ** (index % 4)), 'vnic_type': ['normal', 'direct'][index / 4],
+                             'ram': '1024'}
+            self.candidates.append(('experiment_' + str(index) + '.yaml', configuration))
+
+    def test_encode_for_success(self):
+        features = adaptive.BayesianSearch._encode([configuration for template, configuration in self.candidates],
+                                                   {'vcpus': 'numeric', 'vnic_type': 'string'})
+        # ram is constant, vcpus is scaled in [0, 1], vnic_type is one-hot encoded (direct, normal)
+        self.assertEqual([0.0, 0.0, math.sqrt(0.5)], features[0])
+        self.assertEqual([1.0, math.sqrt(0.5), 0.0], features[7])
+        self.assertAlmostEqual(1.0 / 7, features[1][0])
+
+    def test_encode_detects_numeric_variables(self):
+        features = adaptive.BayesianSearch._encode([{'vcpus': '1'}, {'vcpus': '3'}], dict())
+        self.assertEqual([[0.0], [1.0]], features)
+
+    def test_encode_non_numeric_values_are_one_hot(self):
+        # Declared numeric but with values which are not numbers
+        features = adaptive.BayesianSearch._encode([{'cpu': 'low'}, {'cpu': 'high'}], {'cpu': 'numeric'})
+        self.assertEqual([[0.0, math.sqrt(0.5)], [math.sqrt(0.5), 0.0]], features)
+
+    def test_next_candidate_stops_at_max_trials(self):
+        search = adaptive.BayesianSearch(self.candidates, max_trials=3, initial_trials=2, seed=1)
+        templates = list()
+        template = search.next_candidate()
+        while template:
+            templates.append(template)
+            search.observe(template, float(len(templates)))
+            template = search.next_candidate()
+        self.assertEqual(3, len(set(templates)))
+        self.assertTrue(search.is_finished())
+
+    def test_next_candidate_stops_at_max_time(self):
+        search = adaptive.BayesianSearch(self.candidates, max_time=5.0, seed=1)
+        self.assertFalse(search.is_finished())
+        search.start_time = time.time() - 10
+        self.assertTrue(search.is_finished())
+        self.assertEqual(None, search.next_candidate())
+
+    def test_next_candidate_stops_when_all_evaluated(self):
+        search = adaptive.BayesianSearch(self.candidates[:2], seed=1)
+        self.assertTrue(search.next_candidate())
+        self.assertTrue(search.next_candidate())
+        self.assertEqual(None, search.next_candidate())
+
+    def test_next_candidate_is_reproducible(self):
+        def run(seed):
+            search = adaptive.BayesianSearch(self.candidates, {'vcpus': 'numeric'}, max_trials=6, seed=seed)
+            templates = list()
+            template = search.next_candidate()
+            while template:
+                templates.append(template)
+                configuration = dict(self.candidates)[template]
+                search.observe(template, float(configuration['vcpus']) * (2 if configuration['vnic_type'] ==
+                                                                          'direct' else 1))
+                template = search.next_candidate()
+            return templates, search.get_best()
+        self.assertEqual(run(7), run(7))
+
+    def test_observe_failed_experiments(self):
+        search = adaptive.BayesianSearch(self.candidates, seed=1)
+        self.assertEqual((None, None), search.get_best())
+        search.observe('experiment_1.yaml', None)
+        search.observe('experiment_2.yaml', 3.0)
+        self.assertEqual(('experiment_2.yaml', 3.0), search.get_best())
+        self.assertEqual(set([1, 2]), search.evaluated)
@@ -0,0 +1,119 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+import unittest
+
+from experimental_framework import configuration_constraints as cc
+from experimental_framework import heat_template_generation as heat
+
+
+VARIABLES = ['vcpus', 'ram', 'pinning']
+
+
+class TestConstraint(unittest.TestCase):
+
+    def test_excludes_for_success(self):
+        constraint = cc.Constraint('c', 'pinning == "shared" and vcpus > 2', VARIABLES)
+        self.assertTrue(constraint.excludes({'vcpus': '4', 'ram': '1', 'pinning': 'shared'}))
+        self.assertFalse(constraint.excludes({'vcpus': '2', 'ram': '1', 'pinning': 'shared'}))
+        self.assertFalse(constraint.excludes({'vcpus': '4', 'ram': '1', 'pinning': 'isolate'}))
+        self.assertEqual(set(['pinning', 'vcpus']), constraint.variables)
+
+    def test_and_has_precedence_over_or(self):
+        # vcpus == 1 or (ram == 2 and pinning == shared)
+        constraint = cc.Constraint('c', 'vcpus == 1 or ram == 2 and pinning == shared', VARIABLES)
+        self.assertTrue(constraint.excludes({'vcpus': '1', 'ram': '1', 'pinning': 'isolate'}))
+        self.assertFalse(constraint.excludes({'vcpus': '2', 'ram': '2', 'pinning': 'isolate'}))
+        self.assertTrue(constraint.excludes({'vcpus': '2', 'ram': '2', 'pinning': 'shared'}))
+
+    def test_parenthesis_for_success(self):
+        constraint = cc.Constraint('c', '(vcpus == 1 or ram == 2) and pinning == shared', VARIABLES)
+        self.assertFalse(constraint.excludes({'vcpus': '1', 'ram': '1', 'pinning': 'isolate'}))
+        self.assertTrue(constraint.excludes({'vcpus': '1', 'ram': '1', 'pinning': 'shared'}))
+
+    def test_not_has_precedence_over_and(self):
+        constraint = cc.Constraint('c', 'not vcpus == 1 and ram == 2', VARIABLES)
+        self.assertTrue(constraint.excludes({'vcpus': '2', 'ram': '2', 'pinning': 'shared'}))
+        self.assertFalse(constraint.excludes({'vcpus': '1', 'ram': '2', 'pinning': 'shared'}))
+        self.assertFalse(constraint.excludes({'vcpus': '2', 'ram': '1', 'pinning': 'shared'}))
+        double = cc.Constraint('c', 'not not vcpus == 1', VARIABLES)
+        self.assertTrue(double.excludes({'vcpus': '1', 'ram': '2', 'pinning': 'shared'}))
+
+    def test_string_and_numeric_comparisons(self):
+        # == and != compare strings, the ordering operators compare numbers
+        equal = cc.Constraint('c', 'vcpus == 2', VARIABLES)
+        self.assertFalse(equal.excludes({'vcpus': '2.0', 'ram': '1', 'pinning': 'shared'}))
+        lower = cc.Constraint('c', 'vcpus < 10', VARIABLES)
+        self.assertTrue(lower.excludes({'vcpus': '9', 'ram': '1', 'pinning': 'shared'}))
+        self.assertTrue(cc.Constraint('c', 'vcpus <= 2', VARIABLES).excludes({'vcpus': '2.0'}))
+        self.assertTrue(cc.Constraint('c', 'vcpus >= 2', VARIABLES).excludes({'vcpus': '2'}))
+        self.assertFalse(cc.Constraint('c', 'vcpus > 2', VARIABLES).excludes({'vcpus': '2'}))
+        self.assertRaises(ValueError, cc.Constraint('c', 'pinning > 2', VARIABLES).excludes,
+                          {'pinning': 'shared'})
+
+    def test_quoted_values(self):
+        constraint = cc.Constraint('c', "pinning == 'shared' or pinning == \"isolate\"", VARIABLES)
+        self.assertTrue(constraint.excludes({'pinning': 'shared'}))
+        self.assertTrue(constraint.excludes({'pinning': 'isolate'}))
+        self.assertFalse(constraint.excludes({'pinning': 'none'}))
+        # A quoted variable name is a value
+        self.assertEqual(set(), cc.Constraint('c', '"vcpus" == 1', VARIABLES).variables)
+
+    def test_variable_names_are_case_insensitive(self):
+        # The names of the variables are lowercased by ConfigParser
+        constraint = cc.Constraint('c', 'VCPUS == 1 and Ram == 2', ['vCPUs', 'RAM'])
+        self.assertEqual(set(['vCPUs', 'RAM']), constraint.variables)
+        self.assertTrue(constraint.excludes({'vCPUs': '1', 'RAM': '2'}))
+
+    def test_syntax_errors(self):
+        for expression in ['vcpus ==', 'vcpus 1', '(vcpus == 1', 'vcpus == 1)', 'vcpus == 1 and',
+                           'vcpus == 1 ram == 2', 'vcpus = 1', '']:
+            self.assertRaises(ValueError, cc.Constraint, 'c', expression, VARIABLES)
+
+
+class TestConstraintSet(unittest.TestCase):
+
+    def test_get_constraints_by_position(self):
+        constraints = cc.ConstraintSet({'a': 'vcpus == 1', 'b': 'pinning == shared and vcpus == 2'}, VARIABLES)
+        positions = constraints.get_constraints_by_position(['vcpus', 'ram', 'pinning'])
+        self.assertEqual(['a'], [constraint.name for constraint in positions[0]])
+        self.assertEqual([], positions[1])
+        self.assertEqual(['b'], [constraint.name for constraint in positions[2]])
+
+    def test_unknown_variables(self):
+        # A word which is not a variable is a value: the constraint refers to no variable
+        constraints = cc.ConstraintSet({'a': 'cores == 1'}, VARIABLES)
+        self.assertRaises(ValueError, constraints.get_constraints_by_position, VARIABLES)
+        # A variable without values
+        constraints = cc.ConstraintSet({'a': 'ram == 1'}, VARIABLES)
+        self.assertRaises(ValueError, constraints.get_constraints_by_position, ['vcpus', 'pinning'])
+
+    def test_iter_configurations_pruned_count(self):
+        configuration = {'vcpus': ['1', '2', '4'], 'ram': ['1', '2'], 'pinning': ['shared', 'isolate']}
+        constraints = cc.ConstraintSet({'a': 'vcpus == 4', 'b': 'vcpus == 1 and pinning == isolate'},
+                                       configuration.keys())
+        generated = list(heat.iter_configurations(configuration, constraints))
+        # 12 configurations, 4 with vcpus == 4, 2 with vcpus == 1 and pinning == isolate
+        self.assertEqual(6, constraints.pruned)
+        self.assertEqual(6, len(generated))
+        for counter, values in generated:
+            self.assertFalse(constraints.excludes(values))
+        all_configurations = list(heat.iter_configurations(configuration))
+        self.assertEqual(12, len(all_configurations))
+        # The experiments keep the numbers they have without constraints
+        self.assertEqual([(counter, values) for counter, values in all_configurations
+                          if not constraints.excludes(values)], generated)
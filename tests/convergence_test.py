@@ -0,0 +1,121 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+import math
+import unittest
+
+from experimental_framework import convergence
+
+
+class TestRunningStatistics(unittest.TestCase):
+
+    def test_mean_and_variance_for_success(self):
+        statistics = convergence.RunningStatistics()
+        for value in [2, 4, 4, 4, 5, 5, 7, 9]:
+            statistics.add(value)
+        self.assertEqual(8, statistics.count)
+        self.assertAlmostEqual(5.0, statistics.mean)
+        self.assertAlmostEqual(32.0 / 7, statistics.get_variance())
+
+    def test_variance_is_stable_with_large_offset(self):
+        statistics = convergence.RunningStatistics()
+        for value in [1e9 + 4, 1e9 + 7, 1e9 + 13, 1e9 + 16]:
+            statistics.add(value)
+        self.assertAlmostEqual(30.0, statistics.get_variance())
+
+    def test_relative_ci_width_for_success(self):
+        statistics = convergence.RunningStatistics()
+        for value in [2, 4, 4, 4, 5, 5, 7, 9]:
+            statistics.add(value)
+        expected = 2 * 2.365 * math.sqrt(32.0 / 7 / 8) / 5
+        self.assertAlmostEqual(expected, statistics.get_relative_ci_width())
+
+    def test_relative_ci_width_uses_normal_quantile(self):
+        statistics = convergence.RunningStatistics()
+        for value in range(0, 41):
+            statistics.add(100 + value % 2)
+        expected = 2 * 1.960 * math.sqrt(statistics.get_variance() / 41) / statistics.mean
+        self.assertAlmostEqual(expected, statistics.get_relative_ci_width())
+
+    def test_relative_ci_width_limit_cases(self):
+        statistics = convergence.RunningStatistics()
+        self.assertEqual(float('inf'), statistics.get_relative_ci_width())
+        statistics.add(10)
+        self.assertEqual(float('inf'), statistics.get_relative_ci_width())
+        self.assertEqual(0.0, statistics.get_variance())
+        statistics.add(10)
+        self.assertEqual(0.0, statistics.get_relative_ci_width())
+        zero_mean = convergence.RunningStatistics()
+        zero_mean.add(-1)
+        zero_mean.add(1)
+        self.assertEqual(float('inf'), zero_mean.get_relative_ci_width())
+
+
+class TestConvergenceMonitor(unittest.TestCase):
+
+    def test_init_for_failure(self):
+        self.assertRaises(ValueError, convergence.ConvergenceMonitor, 0)
+
+    def test_is_converged_for_stable_results(self):
+        monitor = convergence.ConvergenceMonitor(0.01)
+        monitor.add_results('experiment_1', {'benchmark_0': {'throughput': 1000, 'packet_size': '64'}})
+        self.assertFalse(monitor.is_converged('experiment_1'))
+        monitor.add_results('experiment_1', {'benchmark_0': {'throughput': 1001, 'packet_size': '64'}})
+        # 2 * 12.706 * sqrt(0.5 / 2) / 1000.5 = 0.0127
+        self.assertFalse(monitor.is_converged('experiment_1'))
+        monitor.add_results('experiment_1', {'benchmark_0': {'throughput': 1000, 'packet_size': '64'}})
+        # 2 * 4.303 * sqrt(0.3333 / 3) / 1000.33 = 0.0029
+        self.assertTrue(monitor.is_converged('experiment_1'))
+        self.assertEqual(3, monitor.get_iterations('experiment_1'))
+        self.assertFalse(monitor.is_converged('experiment_2'))
+
+    def test_is_converged_for_noisy_results(self):
+        monitor = convergence.ConvergenceMonitor(0.01)
+        for value in [100, 150, 80, 120]:
+            monitor.add_results('experiment_1', {'benchmark_0': [{'throughput': value}]})
+        self.assertFalse(monitor.is_converged('experiment_1'))
+
+    def test_is_converged_requires_all_the_metrics(self):
+        monitor = convergence.ConvergenceMonitor(0.01)
+        for value in [100, 150, 80]:
+            monitor.add_results('experiment_1', {'benchmark_0': {'throughput': 100},
+                                                 'benchmark_1': {'latency': value}})
+        self.assertFalse(monitor.is_converged('experiment_1'))
+        metrics_monitor = convergence.ConvergenceMonitor(0.01, ['throughput'])
+        for value in [100, 150, 80]:
+            metrics_monitor.add_results('experiment_1', {'benchmark_0': {'throughput': 100},
+                                                         'benchmark_1': {'latency': value}})
+        self.assertTrue(metrics_monitor.is_converged('experiment_1'))
+
+    def test_is_converged_without_numeric_metrics(self):
+        monitor = convergence.ConvergenceMonitor(0.01)
+        for iteration in range(0, 3):
+            monitor.add_results('experiment_1', {'benchmark_0': {'status': 'SUCCESS', 'deployed': True}})
+        self.assertFalse(monitor.is_converged('experiment_1'))
+
+    def test_get_precision_for_success(self):
+        monitor = convergence.ConvergenceMonitor(0.01)
+        monitor.add_results('experiment_1', {'benchmark_0': {'throughput': 10}})
+        monitor.add_results('experiment_1', {'benchmark_0': {'throughput': 20}})
+        precision = monitor.get_precision('experiment_1')
+        self.assertEqual(1, len(precision))
+        self.assertEqual('benchmark_0', precision[0]['benchmark'])
+        self.assertEqual('throughput', precision[0]['metric'])
+        self.assertEqual(15.0, precision[0]['mean'])
+        self.assertEqual(50.0, precision[0]['variance'])
+        self.assertEqual(2, precision[0]['samples'])
+        self.assertAlmostEqual(2 * 12.706 * 5 / 15, precision[0]['relative_ci_width'])
@@ -0,0 +1,120 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+import csv
+import shutil
+import tempfile
+import unittest
+
+from experimental_framework import data_manager as data
+
+
+class TestDataManagerResultCsv(unittest.TestCase):
+
+    def setUp(self):
+        self.incremental_dir = tempfile.mkdtemp()
+        self.one_pass_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.incremental_dir)
+        shutil.rmtree(self.one_pass_dir)
+
+    @staticmethod
+    def add_experiments(data_manager):
+        for experiment_name in ['experiment_1', 'experiment_2']:
+            data_manager.create_new_experiment(experiment_name)
+            data_manager.add_benchmark(experiment_name, 'benchmark_0')
+
+    @staticmethod
+    def get_steps():
+        # Data points added at each step: (experiment, data points, configuration)
+        return [[('experiment_1', {'throughput': 10}, {'vcpus': '1'})],
+                [('experiment_2', [{'throughput': 20}, {'throughput': 21}], {'vcpus': '2'})],
+                # New column
+                [('experiment_1', {'throughput': 11, 'latency': 5}, {'vcpus': '1'})],
+                [('experiment_2', {'throughput': 22}, {'vcpus': '2'})]]
+
+    @staticmethod
+    def read(file_name):
+        with open(file_name) as csv_file:
+            return csv_file.read()
+
+    @staticmethod
+    def read_rows(file_name):
+        with open(file_name) as csv_file:
+            rows = list(csv.reader(csv_file, delimiter=';', quotechar='|'))
+        return sorted([tuple(sorted(zip(rows[0], row))) for row in rows[1:]])
+
+    def test_append_result_csv_file_for_success(self):
+        incremental = data.DataManager(self.incremental_dir)
+        TestDataManagerResultCsv.add_experiments(incremental)
+        result_file = self.incremental_dir + '/results_benchmark_0.csv'
+        for step in TestDataManagerResultCsv.get_steps():
+            for experiment_name, data_points, configuration in step:
+                incremental.add_data_points(experiment_name, 'benchmark_0', data_points)
+                incremental.add_configuration(experiment_name, configuration)
+            incremental.append_result_csv_file()
+        self.assertEqual(['vcpus', 'throughput', 'latency'], incremental.csv_titles['benchmark_0'])
+        self.assertEqual(5, len(TestDataManagerResultCsv.read_rows(result_file)))
+
+        # The rows written incrementally are the ones written in one pass
+        incremental.generate_result_csv_file()
+        one_pass = data.DataManager(self.one_pass_dir)
+        TestDataManagerResultCsv.add_experiments(one_pass)
+        for step in TestDataManagerResultCsv.get_steps():
+            for experiment_name, data_points, configuration in step:
+                one_pass.add_data_points(experiment_name, 'benchmark_0', data_points)
+                one_pass.add_configuration(experiment_name, configuration)
+        one_pass.generate_result_csv_file()
+        self.assertEqual(TestDataManagerResultCsv.read(self.one_pass_dir + '/results_benchmark_0.csv'),
+                         TestDataManagerResultCsv.read(result_file))
+
+    def test_append_result_csv_file_appends_only_new_rows(self):
+        data_manager = data.DataManager(self.incremental_dir)
+        TestDataManagerResultCsv.add_experiments(data_manager)
+        result_file = self.incremental_dir + '/results_benchmark_0.csv'
+        data_manager.add_data_points('experiment_1', 'benchmark_0', {'throughput': 10})
+        data_manager.append_result_csv_file()
+        data_manager.append_result_csv_file()
+        self.assertEqual('throughput\r\n10\r\n', TestDataManagerResultCsv.read(result_file))
+        data_manager.add_data_points('experiment_2', 'benchmark_0', {'throughput': 20})
+        data_manager.append_result_csv_file()
+        self.assertEqual(['throughput', '10', '20'], TestDataManagerResultCsv.read(result_file).split())
+
+    def test_append_result_csv_file_widening_fills_missing_values(self):
+        data_manager = data.DataManager(self.incremental_dir)
+        TestDataManagerResultCsv.add_experiments(data_manager)
+        result_file = self.incremental_dir + '/results_benchmark_0.csv'
+        data_manager.add_data_points('experiment_1', 'benchmark_0', {'throughput': 10})
+        data_manager.append_result_csv_file()
+        data_manager.add_data_points('experiment_1', 'benchmark_0', {'throughput': 11, 'latency': 5})
+        data_manager.append_result_csv_file()
+        self.assertEqual(['throughput;latency', '10;?', '11;5'], TestDataManagerResultCsv.read(result_file).split())
+
+    def test_append_result_csv_file_visits_only_new_data_points(self):
+        data_manager = data.DataManager(self.incremental_dir)
+        TestDataManagerResultCsv.add_experiments(data_manager)
+        data_manager.create_new_experiment('experiment_3')
+        data_manager.add_benchmark('experiment_3', 'benchmark_0')
+        data_manager.add_aliases('experiment_1', ['experiment_3'])
+        data_manager.add_data_points('experiment_1', 'benchmark_0', {'throughput': 10})
+        # The data points of an experiment are added to its aliases too
+        self.assertEqual({'benchmark_0': set(['experiment_1', 'experiment_3'])}, data_manager.csv_pending)
+        data_manager.append_result_csv_file()
+        self.assertEqual(dict(), data_manager.csv_pending)
+        self.assertEqual(['throughput', '10', '10'],
+                         TestDataManagerResultCsv.read(self.incremental_dir + '/results_benchmark_0.csv').split())
@@ -0,0 +1,140 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+import logging
+import os
+import tempfile
+import unittest
+
+from experimental_framework import common
+from experimental_framework import deployment_unit as deploy
+from experimental_framework.constants import framework_parameters as fp
+
+
+class DummyHeatManager:
+    """
+    Returns, for each stack, its states (status, update time) in order;
+    the last state is kept once the list is exhausted
+    """
+
+    def __init__(self, states):
+        self.states = states
+        self.polls = 0
+        self.updated = list()
+
+    def init_heat(self):
+        pass
+
+    def validate_heat_template(self, template_file):
+        pass
+
+    def check_stack_state(self, stack_name):
+        self.polls += 1
+        states = self.states[stack_name]
+        return states.pop(0) if len(states) > 1 else states[0]
+
+    def check_stacks_state(self, stack_names):
+        return dict([(stack_name, self.check_stack_state(stack_name)) for stack_name in stack_names])
+
+    def update_stack(self, template_file, stack_name, parameters):
+        self.updated.append(stack_name)
+        return True
+
+    def suspend_stack(self, stack_name):
+        return True
+
+    def resume_stack(self, stack_name):
+        return True
+
+
+class TestDeploymentUnit(unittest.TestCase):
+
+    def setUp(self):
+        common.LOG = logging.getLogger('experimental_framework')
+        self.poll_interval = fp.STACK_POLL_INTERVAL
+        fp.STACK_POLL_INTERVAL = 0.01
+        credentials = {'ip_controller': '', 'heat_url': '', 'user': '', 'password': '', 'auth_uri': '',
+                       'project': '', 'heat_backend': fp.HEAT_BACKEND_FAKE}
+        self.unit = deploy.DeploymentUnit(credentials, stack_timeout=5)
+        self.redeployed = list()
+        self.unit.redeploy_heat_template = \
+            lambda template_file, stack_name, parameters: self.redeployed.append(stack_name)
+        descriptor, self.template_file = tempfile.mkstemp()
+        os.close(descriptor)
+
+    def tearDown(self):
+        fp.STACK_POLL_INTERVAL = self.poll_interval
+        os.remove(self.template_file)
+
+    def test_update_heat_template_for_success(self):
+        # The first poll after the update still returns the previous update
+        states = [('UPDATE_COMPLETE', 't1'), ('UPDATE_COMPLETE', 't1'),
+                  ('UPDATE_IN_PROGRESS', 't2'), ('UPDATE_COMPLETE', 't2')]
+        self.unit.heat_manager = DummyHeatManager({'stack_1': states})
+        self.assertTrue(self.unit.update_heat_template(self.template_file, 'stack_1', dict()))
+        self.assertEqual(['stack_1'], self.unit.heat_manager.updated)
+        self.assertEqual(4, self.unit.heat_manager.polls)
+        self.assertEqual(list(), self.redeployed)
+
+    def test_update_heat_template_after_creation(self):
+        # The first poll after the update still returns the creation
+        states = [('CREATE_COMPLETE', None), ('CREATE_COMPLETE', None), ('UPDATE_COMPLETE', 't1')]
+        self.unit.heat_manager = DummyHeatManager({'stack_1': states})
+        self.assertTrue(self.unit.update_heat_template(self.template_file, 'stack_1', dict()))
+        self.assertEqual(list(), self.redeployed)
+
+    def test_update_heat_template_for_failure(self):
+        states = [('UPDATE_COMPLETE', 't1'), ('UPDATE_IN_PROGRESS', 't2'), ('UPDATE_FAILED', 't2')]
+        self.unit.heat_manager = DummyHeatManager({'stack_1': states})
+        self.unit.update_heat_template(self.template_file, 'stack_1', dict())
+        self.assertEqual(['stack_1'], self.redeployed)
+
+    def test_update_heat_template_not_started(self):
+        # The update is never seen before the deadline
+        self.unit.stack_timeout = 0.1
+        self.unit.heat_manager = DummyHeatManager({'stack_1': [('UPDATE_COMPLETE', 't1')]})
+        self.unit.update_heat_template(self.template_file, 'stack_1', dict())
+        self.assertEqual(['stack_1'], self.redeployed)
+
+    def test_suspend_heat_templates_for_success(self):
+        # The suspension is reported only after one poll
+        states = {'stack_1': [('CREATE_COMPLETE', None), ('CREATE_COMPLETE', None),
+                              ('SUSPEND_IN_PROGRESS', 't1'), ('SUSPEND_COMPLETE', 't1')],
+                  'stack_2': [('RESUME_COMPLETE', 't1'), ('RESUME_COMPLETE', 't1'), ('SUSPEND_COMPLETE', 't2')]}
+        self.unit.heat_manager = DummyHeatManager(states)
+        self.assertEqual({'stack_1': True, 'stack_2': True},
+                         self.unit.suspend_heat_templates(['stack_1', 'stack_2']))
+
+    def test_resume_heat_templates_for_success(self):
+        states = {'stack_1': [('SUSPEND_COMPLETE', 't1'), ('SUSPEND_COMPLETE', 't1'), ('RESUME_COMPLETE', 't2')]}
+        self.unit.heat_manager = DummyHeatManager(states)
+        self.assertEqual({'stack_1': True}, self.unit.resume_heat_templates(['stack_1']))
+
+    def test_resume_heat_templates_after_previous_resume(self):
+        # A previous resume is not taken for the new one
+        states = {'stack_1': [('RESUME_COMPLETE', 't1'), ('RESUME_COMPLETE', 't1'), ('RESUME_COMPLETE', 't2')]}
+        self.unit.heat_manager = DummyHeatManager(states)
+        self.assertEqual({'stack_1': True}, self.unit.resume_heat_templates(['stack_1']))
+        self.assertEqual(3, self.unit.heat_manager.polls)
+
+    def test_suspend_heat_templates_for_failure(self):
+        self.unit.stack_timeout = 0.1
+        states = {'stack_1': [('CREATE_COMPLETE', None)],
+                  'stack_2': [('CREATE_COMPLETE', None), ('SUSPEND_FAILED', 't1')]}
+        self.unit.heat_manager = DummyHeatManager(states)
+        self.assertEqual({'stack_1': False, 'stack_2': False},
+                         self.unit.suspend_heat_templates(['stack_1', 'stack_2']))
@@ -0,0 +1,141 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+import itertools
+import json
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from experimental_framework import common
+from experimental_framework import experiment_design as design
+from experimental_framework import heat_template_generation as heat
+from experimental_framework.constants import framework_parameters as fp
+
+
+class TestExperimentDesign(unittest.TestCase):
+
+    def test_get_index_and_get_digits(self):
+        radices = [3, 2, 4]
+        for index in range(0, design.get_number_of_configurations(radices)):
+            self.assertEqual(index, design.get_index(radices, design.get_digits(radices, index)))
+        self.assertEqual([1, 0, 3], design.get_digits(radices, 11))
+
+    def test_full_factorial_design(self):
+        self.assertEqual(range(0, 12), design.get_design_indexes(fp.DESIGN_FULL_FACTORIAL, [3, 2, 2]))
+
+    def test_fractional_factorial_resolution_and_aliasing(self):
+        # 2^(3-1) design: the third factor is aliased to the interaction of the first two (C = AB)
+        radices = [2, 2, 2]
+        indexes = design.fractional_factorial_design(radices)
+        self.assertEqual(4, len(indexes))
+        for index in indexes:
+            a, b, c = design.get_digits(radices, index)
+            self.assertEqual(a ^ b, c)
+        # Each pair of factors is a full factorial (resolution III: main effects are not aliased together)
+        for first, second in itertools.combinations(range(0, 3), 2):
+            pairs = set([(design.get_digits(radices, index)[first], design.get_digits(radices, index)[second])
+                         for index in indexes])
+            self.assertEqual(4, len(pairs))
+
+    def test_fractional_factorial_uses_extreme_values(self):
+        radices = [3, 1, 4, 2]
+        indexes = design.fractional_factorial_design(radices)
+        for index in indexes:
+            digits = design.get_digits(radices, index)
+            self.assertTrue(digits[0] in [0, 2])
+            self.assertEqual(0, digits[1])
+            self.assertTrue(digits[2] in [0, 3])
+        # 3 two level factors need 4 runs
+        self.assertEqual(4, len(indexes))
+
+    def test_fractional_factorial_minimum_runs(self):
+        self.assertEqual(8, len(design.fractional_factorial_design([2, 2, 2], 8)))
+        # 7 factors in 8 runs (2^(7-4))
+        indexes = design.fractional_factorial_design([2] * 7)
+        self.assertEqual(8, len(indexes))
+        for level in [0, 1]:
+            for factor in range(0, 7):
+                self.assertEqual(4, len([index for index in indexes
+                                         if design.get_digits([2] * 7, index)[factor] == level]))
+
+    def test_latin_hypercube_stratification(self):
+        radices = [10, 10, 5]
+        indexes = design.latin_hypercube_design(radices, 10, seed=3)
+        self.assertEqual(10, len(indexes))
+        digits = [design.get_digits(radices, index) for index in indexes]
+        # Each value of the variables with as many values as samples is used exactly once
+        self.assertEqual(range(0, 10), sorted([digit[0] for digit in digits]))
+        self.assertEqual(range(0, 10), sorted([digit[1] for digit in digits]))
+        # Each value of the variable with 5 values is used twice
+        for value in range(0, 5):
+            self.assertEqual(2, len([digit for digit in digits if digit[2] == value]))
+
+    def test_sampling_designs_are_reproducible_with_seed(self):
+        radices = [5, 5, 5, 5]
+        for design_name in [fp.DESIGN_LATIN_HYPERCUBE, fp.DESIGN_RANDOM]:
+            first = design.get_design_indexes(design_name, radices, 20, 7)
+            self.assertEqual(first, design.get_design_indexes(design_name, radices, 20, 7))
+            self.assertNotEqual(first, design.get_design_indexes(design_name, radices, 20, 8))
+
+    def test_random_design(self):
+        radices = [5, 5, 5]
+        indexes = design.random_design(radices, 30, 1)
+        self.assertEqual(30, len(set(indexes)))
+        self.assertTrue(max(indexes) < 125)
+        self.assertEqual(range(0, 125), design.random_design(radices, 200, 1))
+        self.assertEqual(100, len(design.random_design(radices, 100, 1)))
+
+    def test_get_design_indexes_for_failure(self):
+        self.assertRaises(ValueError, design.get_design_indexes, fp.DESIGN_RANDOM, [2, 2])
+        self.assertRaises(ValueError, design.get_design_indexes, fp.DESIGN_LATIN_HYPERCUBE, [2, 2], 0)
+        self.assertRaises(ValueError, design.get_design_indexes, 'unknown', [2, 2], 2)
+
+
+class TestDesignMetadata(unittest.TestCase):
+
+    def setUp(self):
+        common.LOG = logging.getLogger('experimental_framework')
+        self.template_dir = tempfile.mkdtemp() + '/'
+        with open(self.template_dir + 'base.yaml', 'w') as base_template:
+            base_template.write('vcpus: #vcpus\nram: #ram\n')
+        self.previous = common.TEMPLATE_DIR, common.DESIGN, common.DESIGN_SAMPLES, common.DESIGN_SEED
+        common.TEMPLATE_DIR = self.template_dir
+        common.DESIGN_SAMPLES = 2
+        common.DESIGN_SEED = 0
+
+    def tearDown(self):
+        common.TEMPLATE_DIR, common.DESIGN, common.DESIGN_SAMPLES, common.DESIGN_SEED = self.previous
+        shutil.rmtree(self.template_dir)
+
+    def get_designs(self):
+        designs = list()
+        for file_name in sorted(os.listdir(self.template_dir)):
+            if file_name.endswith('.yaml.json'):
+                with open(self.template_dir + file_name) as json_file:
+                    designs.append(json.load(json_file)[fp.DESIGN_METADATA_KEY])
+        return designs
+
+    def test_design_is_recorded_for_all_designs(self):
+        for design_name in [None, fp.DESIGN_FULL_FACTORIAL, fp.DESIGN_RANDOM]:
+            common.DESIGN = design_name
+            heat.generates_templates('base.yaml', {'vcpus': ['1', '2'], 'ram': ['1G', '2G']})
+            designs = self.get_designs()
+            self.assertTrue(designs)
+            self.assertEqual([design_name or fp.DESIGN_FULL_FACTORIAL] * len(designs), designs)
@@ -0,0 +1,51 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+import logging
+import unittest
+
+from experimental_framework import common
+from experimental_framework import experiment_scheduler as scheduler
+from experimental_framework.constants import framework_parameters as fp
+
+
+class TestExperimentScheduler(unittest.TestCase):
+
+    def setUp(self):
+        common.LOG = logging.getLogger('experimental_framework')
+        self.costs = {'vcpus': {'1': 1.0, '2': 2.0, '4': 4.0}}
+        self.experiments = [('template_0', {'vcpus': '4'}), ('template_1', {'vcpus': '1'}),
+                            ('template_2', {'vcpus': '2'})]
+
+    def test_schedule_for_success(self):
+        experiment_scheduler = scheduler.ExperimentScheduler(self.costs, fp.SCHEDULING_CHEAPEST_FIRST)
+        self.assertEqual([('template_1', 1.0), ('template_2', 2.0), ('template_0', 4.0)],
+                         experiment_scheduler.schedule(self.experiments))
+
+    def test_schedule_within_budget(self):
+        experiment_scheduler = scheduler.ExperimentScheduler(self.costs, fp.SCHEDULING_CHEAPEST_FIRST, 3.0)
+        self.assertEqual([('template_1', 1.0), ('template_2', 2.0)], experiment_scheduler.schedule(self.experiments))
+
+    def test_schedule_charges_every_iteration(self):
+        experiment_scheduler = scheduler.ExperimentScheduler(self.costs, fp.SCHEDULING_CHEAPEST_FIRST, 8.0)
+        self.assertEqual([('template_1', 1.0), ('template_2', 2.0)],
+                         experiment_scheduler.schedule(self.experiments, 2))
+        self.assertEqual([('template_1', 1.0)], experiment_scheduler.schedule(self.experiments, 3))
+        # An expensive experiment does not stop the cheaper ones which follow it
+        experiment_scheduler = scheduler.ExperimentScheduler(self.costs, fp.SCHEDULING_MOST_EXPENSIVE_FIRST, 6.0)
+        self.assertEqual([('template_2', 2.0), ('template_1', 1.0)],
+                         experiment_scheduler.schedule(self.experiments, 2))
@@ -0,0 +1,73 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+import json
+import logging
+import shutil
+import tempfile
+import unittest
+
+from experimental_framework import common
+from experimental_framework import heat_manager
+from experimental_framework.constants import framework_parameters as fp
+
+
+class TestValidationCache(unittest.TestCase):
+
+    def setUp(self):
+        common.LOG = logging.getLogger('experimental_framework')
+        self.directory = tempfile.mkdtemp()
+        self.cache_file = self.directory + '/validation_cache.json'
+        self.credentials = {'ip_controller': '', 'heat_url': 'http://heat', 'user': '', 'password': '',
+                            'auth_uri': '', 'project': '', 'heat_backend': fp.HEAT_BACKEND_FAKE}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_template(self, name, content):
+        template_file = self.directory + '/' + name
+        with open(template_file, 'w') as output_file:
+            output_file.write(content)
+        return template_file
+
+    def test_validate_heat_template_for_success(self):
+        template_file = self.write_template('template_1.yaml', 'heat_template_version: 2014-10-16\n')
+        manager = heat_manager.HeatManager(self.credentials, self.cache_file)
+        manager.validate_heat_template(template_file)
+        manager.validate_heat_template(template_file)
+        self.assertEqual({'validation_count': 1, 'validation_hits': 1}, manager.get_validation_statistics())
+        # The validation is reused across the runs
+        manager = heat_manager.HeatManager(self.credentials, self.cache_file)
+        manager.validate_heat_template(template_file)
+        self.assertEqual({'validation_count': 0, 'validation_hits': 1}, manager.get_validation_statistics())
+
+    def test_store_validated_templates_merges_other_processes(self):
+        # Two shards load the (empty) cache, then validate different templates
+        template_1 = self.write_template('template_1.yaml', 'heat_template_version: 2014-10-16\n')
+        template_2 = self.write_template('template_2.yaml', 'heat_template_version: 2015-04-30\n')
+        shard_1 = heat_manager.HeatManager(self.credentials, self.cache_file)
+        shard_2 = heat_manager.HeatManager(self.credentials, self.cache_file)
+        shard_1.get_validated_templates()
+        shard_2.get_validated_templates()
+        shard_1.validate_heat_template(template_1)
+        shard_2.validate_heat_template(template_2)
+        with open(self.cache_file) as cache_file:
+            self.assertEqual(2, len(json.load(cache_file)))
+        manager = heat_manager.HeatManager(self.credentials, self.cache_file)
+        manager.validate_heat_template(template_1)
+        manager.validate_heat_template(template_2)
+        self.assertEqual({'validation_count': 0, 'validation_hits': 2}, manager.get_validation_statistics())
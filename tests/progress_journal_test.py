@@ -0,0 +1,90 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from experimental_framework import common
+from experimental_framework import progress_journal as journal
+
+
+class TestProgressJournal(unittest.TestCase):
+
+    def setUp(self):
+        common.LOG = logging.getLogger('experimental_framework')
+        self.directory = tempfile.mkdtemp()
+        self.journal_file = os.path.join(self.directory, 'progress_journal.json')
+        self.journal = journal.ProgressJournal(self.journal_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_load_without_journal(self):
+        self.assertEqual([], self.journal.load())
+        self.assertEqual([], self.journal.get_deletions())
+
+    def test_record_and_load_for_success(self):
+        self.journal.record('experiment_1.yaml', 'benchmark_0', 0, {'benchmark_0': {'throughput': 10}}, 'digest')
+        self.journal.record('experiment_1.yaml', 'benchmark_0', 1, {'benchmark_0': [{'throughput': 12}]}, 'digest')
+        loaded = journal.ProgressJournal(self.journal_file)
+        units = loaded.load()
+        self.assertEqual(2, len(units))
+        self.assertEqual({'benchmark_0': [{'throughput': 12}]}, units[1]['data_points'])
+        unit = loaded.get_unit('experiment_1.yaml', 'benchmark_0', 0)
+        self.assertEqual({'benchmark_0': {'throughput': 10}}, unit['data_points'])
+        self.assertEqual('digest', unit['template_digest'])
+
+    def test_load_returns_str(self):
+        self.journal.record('experiment_1.yaml', 'benchmark_0', 0, {'benchmark_0': {'status': 'SUCCESS'}})
+        unit = journal.ProgressJournal(self.journal_file).load()[0]
+        self.assertTrue(isinstance(unit['template'], str))
+        self.assertTrue(isinstance(unit['data_points'].keys()[0], str))
+        self.assertTrue(isinstance(unit['data_points']['benchmark_0']['status'], str))
+
+    def test_get_unit_keys(self):
+        self.journal.record('experiment_1.yaml', 'benchmark_0', 0, dict())
+        loaded = journal.ProgressJournal(self.journal_file)
+        loaded.load()
+        self.assertNotEqual(None, loaded.get_unit('experiment_1.yaml', 'benchmark_0', 0))
+        self.assertEqual(None, loaded.get_unit('experiment_1.yaml', 'benchmark_0', 1))
+        self.assertEqual(None, loaded.get_unit('experiment_1.yaml', 'benchmark_1', 0))
+        self.assertEqual(None, loaded.get_unit('experiment_2.yaml', 'benchmark_0', 0))
+
+    def test_load_ignores_truncated_line(self):
+        self.journal.record('experiment_1.yaml', 'benchmark_0', 0, {'benchmark_0': {'throughput': 10}})
+        with open(self.journal_file, 'a') as journal_file:
+            journal_file.write('{"iteration": 1, "benchmark": "bench')
+        units = journal.ProgressJournal(self.journal_file).load()
+        self.assertEqual(1, len(units))
+        self.assertEqual(0, units[0]['iteration'])
+
+    def test_load_ignores_duplicate_units(self):
+        self.journal.record('experiment_1.yaml', 'benchmark_0', 0, {'benchmark_0': {'throughput': 10}})
+        self.journal.record('experiment_1.yaml', 'benchmark_0', 0, {'benchmark_0': {'throughput': 11}})
+        units = journal.ProgressJournal(self.journal_file).load()
+        self.assertEqual(1, len(units))
+        self.assertEqual({'throughput': 10}, units[0]['data_points']['benchmark_0'])
+
+    def test_record_deletions_for_success(self):
+        self.journal.record('experiment_1.yaml', 'benchmark_0', 0, dict())
+        self.journal.record_deletions([('experiment_1', {'operation': 'delete', 'deleted': True})])
+        loaded = journal.ProgressJournal(self.journal_file)
+        self.assertEqual(1, len(loaded.load()))
+        self.assertEqual([('experiment_1', {'operation': 'delete', 'deleted': True})], loaded.get_deletions())
@@ -0,0 +1,91 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+import unittest
+
+from experimental_framework import retry_policy as retry
+
+
+class HTTPError(Exception):
+
+    def __init__(self, code):
+        Exception.__init__(self, str(code))
+        self.code = code
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def test_init_for_failure(self):
+        self.assertRaises(ValueError, retry.RetryPolicy, -1)
+        self.assertRaises(ValueError, retry.RetryPolicy, 3, 5, 60, 1.5)
+
+    def test_get_delay_for_success(self):
+        policy = retry.RetryPolicy(5, 1, 5, 0.0)
+        self.assertEqual([0.0, 1, 2, 4, 5, 5], [policy.get_delay(attempt) for attempt in range(0, 6)])
+
+    def test_get_delay_with_jitter(self):
+        policy = retry.RetryPolicy(5, 4, 60, 0.5, seed=0)
+        for attempt in range(1, 5):
+            delay = policy.get_delay(attempt)
+            self.assertTrue(2 ** (attempt + 1) * 0.5 <= delay <= 2 ** (attempt + 1))
+
+    def test_get_delay_is_reproducible_with_seed(self):
+        first = retry.RetryPolicy(5, 4, 60, 0.5, seed=1)
+        second = retry.RetryPolicy(5, 4, 60, 0.5, seed=1)
+        self.assertEqual([first.get_delay(attempt) for attempt in range(0, 5)],
+                         [second.get_delay(attempt) for attempt in range(0, 5)])
+
+    def test_get_deadline_for_success(self):
+        policy = retry.RetryPolicy(deadlines={'create': 60, 'delete': 30})
+        self.assertEqual(60, policy.get_deadline('create'))
+        self.assertEqual(30, policy.get_deadline('delete'))
+        self.assertEqual(None, policy.get_deadline('update'))
+
+    def test_is_retryable_for_success(self):
+        self.assertTrue(retry.RetryPolicy.is_retryable(HTTPError(503)))
+        self.assertTrue(retry.RetryPolicy.is_retryable(HTTPError(409)))
+        self.assertTrue(retry.RetryPolicy.is_retryable(IOError('connection reset')))
+        self.assertFalse(retry.RetryPolicy.is_retryable(HTTPError(400)))
+        self.assertFalse(retry.RetryPolicy.is_retryable(ValueError('malformed template')))
+
+    def test_circuit_breaker_transitions(self):
+        policy = retry.RetryPolicy(breaker_threshold=2)
+        self.assertFalse(policy.is_open('template'))
+        policy.record('template', 'failures')
+        self.assertFalse(policy.is_open('template'))
+        # A success closes the breaker again
+        policy.record('template', 'successes')
+        policy.record('template', 'failures')
+        self.assertFalse(policy.is_open('template'))
+        policy.record('template', 'failures')
+        self.assertTrue(policy.is_open('template'))
+        self.assertFalse(policy.is_open('other_template'))
+
+    def test_circuit_breaker_disabled(self):
+        policy = retry.RetryPolicy(breaker_threshold=0)
+        for attempt in range(0, 5):
+            policy.record('template', 'failures')
+        self.assertFalse(policy.is_open('template'))
+
+    def test_get_statistics_for_success(self):
+        policy = retry.RetryPolicy()
+        policy.record('template_1', 'attempts', 3)
+        policy.record('template_1', 'retries', 2)
+        policy.record('template_2', 'attempts')
+        self.assertEqual({'attempts': 3, 'retries': 2}, policy.get_statistics('template_1'))
+        self.assertEqual({'attempts': 4, 'retries': 2}, policy.get_statistics())
+        self.assertEqual({}, policy.get_statistics('template_3'))
@@ -0,0 +1,180 @@
+# Copyright (c) 2015 Intel Research and Development Ireland Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+__author__ = 'vmriccox'
+
+
+import logging
+import threading
+import time
+import unittest
+
+from experimental_framework import common
+from experimental_framework import stack_reaper as reaper
+from experimental_framework import retry_policy as retry
+
+
+class DummyHeatManager:
+
+    def __init__(self):
+        self.deleted = list()
+        self.errors = dict()
+        self.authentications = 0
+        self.lock = threading.Lock()
+
+    def delete_stack(self, stack_name):
+        with self.lock:
+            self.deleted.append(stack_name)
+            errors = self.errors.get(stack_name)
+            if errors:
+                raise errors.pop(0)
+
+    def reset_authentication(self):
+        self.authentications += 1
+
+
+class DummyHTTPError(Exception):
+
+    def __init__(self, code):
+        Exception.__init__(self, 'HTTP ' + str(code))
+        self.code = code
+
+
+class DummyDeploymentUnit:
+    """
+    Returns, for each stack, the statuses of its deletions in order
+    (DELETE_COMPLETE once the list is exhausted)
+    """
+
+    def __init__(self, statuses=None, max_retries=2, delay=0.0):
+        self.heat_manager = DummyHeatManager()
+        self.retry_policy = retry.RetryPolicy(max_retries, delay, delay, 0.0)
+        self.statuses = statuses or dict()
+        self.slow_stacks = list()
+        self.timings = list()
+
+    @staticmethod
+    def run_concurrently(function, arguments):
+        return [function(argument) for argument in arguments]
+
+    def wait_for_stacks(self, stack_names, in_progress_status, timeout=None):
+        statuses = dict()
+        if [stack_name for stack_name in stack_names if stack_name in self.slow_stacks]:
+            time.sleep(0.2)
+        for stack_name in stack_names:
+            pending = self.statuses.get(stack_name, list())
+            statuses[stack_name] = pending.pop(0) if pending else 'DELETE_COMPLETE'
+        return statuses
+
+    def add_deletion_timing(self, stack_name, timings):
+        self.timings.append((stack_name, timings))
+
+
+class TestStackReaper(unittest.TestCase):
+
+    def setUp(self):
+        common.LOG = logging.getLogger('experimental_framework')
+        self.unit = DummyDeploymentUnit()
+        self.reaper = reaper.StackReaper(self.unit)
+
+    def test_destroy_for_success(self):
+        self.reaper.destroy('stack_1')
+        self.reaper.wait_for(['stack_1'])
+        self.assertEqual(['stack_1'], self.unit.heat_manager.deleted)
+        self.assertEqual(set(), self.reaper.deleting)
+        self.assertEqual([('stack_1', {'delete_time': self.unit.timings[0][1]['delete_time'],
+                                       'delete_retries': 0, 'deleted': True})], self.unit.timings)
+
+    def test_destroy_ignores_duplicate_requests(self):
+        with self.reaper.condition:
+            self.reaper.destroy('stack_1')
+            self.reaper.destroy('stack_1')
+            self.assertEqual(['stack_1'], self.reaper.queue)
+        self.reaper.drain()
+        self.assertEqual(['stack_1'], self.unit.heat_manager.deleted)
+
+    def test_delete_retries_the_failed_stacks(self):
+        self.unit.statuses = {'stack_1': ['DELETE_FAILED']}
+        self.reaper.destroy('stack_1')
+        self.reaper.drain()
+        self.assertEqual(['stack_1', 'stack_1'], self.unit.heat_manager.deleted)
+        self.assertEqual(1, self.unit.timings[0][1]['delete_retries'])
+        self.assertEqual([], self.reaper.failed)
+
+    def test_delete_for_failure(self):
+        self.unit.statuses = {'stack_1': ['DELETE_FAILED'] * 3}
+        self.reaper.destroy('stack_1')
+        self.reaper.drain()
+        self.assertEqual(['stack_1'] * 3, self.unit.heat_manager.deleted)
+        self.assertEqual(['stack_1'], self.reaper.failed)
+        self.assertFalse(self.unit.timings[0][1]['deleted'])
+        self.assertEqual(set(), self.reaper.deleting)
+
+    def test_drain_waits_for_all_the_deletions(self):
+        self.unit.statuses = {'stack_2': ['DELETE_FAILED']}
+        self.unit.retry_policy = retry.RetryPolicy(2, 0.05, 0.05, 0.0)
+        for stack_name in ['stack_1', 'stack_2', 'stack_3']:
+            self.reaper.destroy(stack_name)
+        self.reaper.drain()
+        self.assertEqual(set(), self.reaper.deleting)
+        self.assertEqual(['stack_1', 'stack_2', 'stack_3'],
+                         sorted(set(self.unit.heat_manager.deleted)))
+        self.assertEqual(4, len(self.unit.heat_manager.deleted))
+
+    def test_wait_for_stack_requested_again_during_batch(self):
+        # stack_1 is deleted at the first attempt while stack_2 is retried,
+        # in the meanwhile stack_1 is created and requested for deletion again
+        self.unit.statuses = {'stack_2': ['DELETE_FAILED']}
+        self.unit.retry_policy = retry.RetryPolicy(2, 0.3, 0.3, 0.0)
+        with self.reaper.condition:
+            self.reaper.destroy('stack_1')
+            self.reaper.destroy('stack_2')
+        self.reaper.wait_for(['stack_1'])
+        self.assertEqual(['stack_1', 'stack_2'], self.unit.heat_manager.deleted)
+        self.unit.slow_stacks = ['stack_1']
+        self.reaper.destroy('stack_1')
+        self.reaper.wait_for(['stack_1'])
+        self.assertEqual(2, len([timing for timing in self.unit.timings if timing[0] == 'stack_1']))
+        self.reaper.drain()
+        self.assertEqual(2, self.unit.heat_manager.deleted.count('stack_2'))
+        self.assertEqual(set(), self.reaper.deleting)
+
+    def test_release_ignores_previous_generations(self):
+        self.reaper.deleting.add('stack_1')
+        self.reaper.generations['stack_1'] = 2
+        self.reaper.release(['stack_1'], {'stack_1': 1})
+        self.assertEqual(set(['stack_1']), self.reaper.deleting)
+        self.reaper.release(['stack_1'], {'stack_1': 2})
+        self.assertEqual(set(), self.reaper.deleting)
+
+    def test_delete_retries_the_retryable_errors(self):
+        self.unit.heat_manager.errors = {'stack_1': [DummyHTTPError(503), DummyHTTPError(401)]}
+        self.unit.statuses = {'stack_1': ['CREATE_COMPLETE', 'CREATE_COMPLETE']}
+        self.reaper.destroy('stack_1')
+        self.reaper.drain()
+        self.assertEqual(['stack_1'] * 3, self.unit.heat_manager.deleted)
+        self.assertEqual(1, self.unit.heat_manager.authentications)
+        self.assertEqual([], self.reaper.failed)
+        self.assertTrue(self.unit.timings[0][1]['deleted'])
+
+    def test_delete_stops_at_fatal_errors(self):
+        self.unit.heat_manager.errors = {'stack_1': [DummyHTTPError(403)]}
+        self.reaper.destroy('stack_1')
+        self.reaper.destroy('stack_2')
+        self.reaper.drain()
+        self.assertEqual(1, self.unit.heat_manager.deleted.count('stack_1'))
+        self.assertEqual(['stack_1'], self.reaper.failed)
+        self.assertEqual([('stack_1', False), ('stack_2', True)],
+                         sorted([(timing[0], timing[1]['deleted']) for timing in self.unit.timings]))
+        self.assertEqual(set(), self.reaper.deleting)